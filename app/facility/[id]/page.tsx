@@ -7,6 +7,8 @@ import { getTypeLabel, getBadgeStyle } from '@/lib/facility-types'
 import { isValidRailroad } from '@/lib/railroads'
 import { FacilityCard } from '@/components/facility-card'
 import { StarRating } from '@/components/star-rating'
+import { AdvisoryBadge } from '@/components/industry/advisory-badge'
+import { getAdvisoriesForFacility } from '@/lib/industry/queries'
 
 const facilities = facilitiesData as Facility[]
 
@@ -82,6 +84,7 @@ export default async function FacilityPage({ params }: PageProps) {
   const storageOptions = facility.capabilities?.storage_options || []
   const hasHours = DAYS.some(d => facility.capabilities?.[d.key])
   const aboutText = facility.about || facility.description
+  const advisories = await getAdvisoriesForFacility(facility.id)
 
   const similarFacilities = facilities
     .filter(f =>
@@ -466,6 +469,25 @@ export default async function FacilityPage({ params }: PageProps) {
               </div>
             )}
 
+            {/* Active Advisories */}
+            {advisories.length > 0 && (
+              <div className="rounded-xl shadow-sm border p-6 md:col-span-2" style={cardStyle}>
+                <h2 className="text-xl font-semibold mb-4" style={{ color: 'var(--text-primary)' }}>
+                  <span aria-hidden="true">⚠️ </span>Active Advisories
+                </h2>
+                <ul className="space-y-2">
+                  {advisories.map(a => (
+                    <li key={a.slug} className="flex items-start gap-2">
+                      <AdvisoryBadge type={a.advisoryType} />
+                      <Link href={`/industry/advisories/${a.slug}`} className="text-sm hover:underline" style={{ color: 'var(--accent-text)' }}>
+                        {a.railroad}: {a.title}
+                      </Link>
+                    </li>
+                  ))}
+                </ul>
+              </div>
+            )}
+
             {/* About */}
             {aboutText && (
               <div className="rounded-xl shadow-sm border p-6 md:col-span-2" style={cardStyle}>
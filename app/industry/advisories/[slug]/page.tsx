@@ -1,7 +1,8 @@
 import type { Metadata } from 'next'
 import Link from 'next/link'
 import { notFound } from 'next/navigation'
-import { getAdvisoryBySlug } from '@/lib/industry/queries'
+import { getAdvisoryBySlug, getAffectedFacilities } from '@/lib/industry/queries'
+import { getTypeLabel } from '@/lib/facility-types'
 import { AdvisoryBadge } from '@/components/industry/advisory-badge'
 import { formatRelativeTime, formatReportWeek } from '@/lib/industry/format'
 
@@ -26,6 +27,8 @@ export default async function AdvisoryDetailPage({ params }: PageProps) {
 
   if (!advisory) notFound()
 
+  const affected = await getAffectedFacilities(slug)
+
   return (
     <main>
       <div className="max-w-4xl mx-auto px-4 py-8">
@@ -76,8 +79,53 @@ export default async function AdvisoryDetailPage({ params }: PageProps) {
           >
             {advisory.description}
           </div>
+          {advisory.sourceUrl && (
+            <a
+              href={advisory.sourceUrl}
+              target="_blank"
+              rel="noopener noreferrer"
+              className="inline-block mt-4 text-sm font-medium hover:underline"
+              style={{ color: 'var(--accent-text)' }}
+            >
+              View original notice &rarr;
+            </a>
+          )}
         </div>
 
+        {affected && (
+          <div
+            className="rounded-xl border p-6 mt-6"
+            style={{ backgroundColor: 'var(--bg-card)', borderColor: 'var(--border-default)' }}
+          >
+            <h2 className="text-lg font-semibold mb-1" style={{ color: 'var(--text-primary)' }}>
+              Affected Facilities ({affected.count})
+            </h2>
+            <p className="text-xs mb-3" style={{ color: 'var(--text-tertiary)' }}>
+              {affected.scope === 'radius'
+                ? 'Facilities near the locations named in this advisory'
+                : `${advisory.railroad}-served facilities in ${advisory.affectedArea}`}
+            </p>
+            <div className="flex flex-wrap gap-2 mb-3">
+              {Object.entries(affected.byType).map(([type, n]) => (
+                <span
+                  key={type}
+                  className="badge"
+                  style={{ background: 'var(--badge-gray-bg)', borderColor: 'var(--badge-gray-border)', color: 'var(--badge-gray-text)' }}
+                >
+                  {getTypeLabel(type)}: {n}
+                </span>
+              ))}
+            </div>
+            <div className="flex flex-wrap gap-x-3 gap-y-1 text-sm">
+              {affected.facilityIds.slice(0, 50).map(id => (
+                <Link key={id} href={`/facility/${id}`} className="hover:underline" style={{ color: 'var(--accent-text)' }}>
+                  {id}
+                </Link>
+              ))}
+            </div>
+          </div>
+        )}
+
         <div className="mt-6">
           <Link
             href="/industry/advisories"
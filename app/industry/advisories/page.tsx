@@ -1,9 +1,10 @@
 import type { Metadata } from 'next'
 import Link from 'next/link'
-import { getActiveAdvisories, getAllActiveAdvisories, ITEMS_PER_PAGE } from '@/lib/industry/queries'
+import { getActiveAdvisories, getAllActiveAdvisories, getSectionUpdatedAt, ITEMS_PER_PAGE } from '@/lib/industry/queries'
 import { AdvisoryCard } from '@/components/industry/advisory-card'
 import { AdvisoryMapSection } from '@/components/industry/advisory-map-section'
 import { Pagination } from '@/components/pagination'
+import { DataFreshness } from '@/components/industry/data-freshness'
 import type { AdvisoryType } from '@/lib/industry/types'
 
 export const revalidate = 1800
@@ -26,9 +27,10 @@ export default async function AdvisoriesPage({ searchParams }: PageProps) {
   const railroad = params.railroad || undefined
   const page = Math.max(1, parseInt(params.page || '1', 10) || 1)
 
-  const [{ advisories, total }, allAdvisories] = await Promise.all([
+  const [{ advisories, total }, allAdvisories, lastUpdated] = await Promise.all([
     getActiveAdvisories({ railroad, advisoryType, page }),
     getAllActiveAdvisories(),
+    getSectionUpdatedAt('advisories'),
   ])
   const totalPages = Math.ceil(total / ITEMS_PER_PAGE)
 
@@ -53,6 +55,9 @@ export default async function AdvisoriesPage({ searchParams }: PageProps) {
           <p className="text-lg" style={{ color: 'var(--text-secondary)' }}>
             Active embargoes, service alerts, and operational notices from Class I railroads.
           </p>
+          <div className="mt-2">
+            <DataFreshness lastUpdated={lastUpdated} />
+          </div>
         </div>
       </header>
 
@@ -1,6 +1,6 @@
 import type { Metadata } from 'next'
 import Link from 'next/link'
-import { getLatestFuelSurcharges } from '@/lib/industry/queries'
+import { getLatestFuelSurcharges, getFuelSurchargeHistory, getSectionUpdatedAt } from '@/lib/industry/queries'
 import { FuelSurchargeTable } from '@/components/industry/fuel-surcharge-table'
 import { DataFreshness } from '@/components/industry/data-freshness'
 
@@ -12,9 +12,13 @@ export const metadata: Metadata = {
 }
 
 export default async function FuelSurchargesPage() {
-  const surcharges = await getLatestFuelSurcharges()
-
-  const lastUpdated = surcharges.length > 0 ? new Date(surcharges[0].createdAt) : null
+  const [surcharges, lastUpdated] = await Promise.all([
+    getLatestFuelSurcharges(),
+    getSectionUpdatedAt('fuelSurcharges'),
+  ])
+  // One timeline per railroad + traffic type, for the table's trend column
+  const histories = await Promise.all(surcharges.map(s => getFuelSurchargeHistory(s.railroad, 12, s.trafficType)))
+  const history = Object.fromEntries(surcharges.map((s, i) => [`${s.railroad}-${s.trafficType}`, histories[i]]))
 
   return (
     <main>
@@ -29,7 +33,7 @@ export default async function FuelSurchargesPage() {
             Fuel Surcharges
           </h1>
           <p className="text-lg" style={{ color: 'var(--text-secondary)' }}>
-            Side-by-side comparison of current fuel surcharge rates across Class I railroads.
+            Side-by-side comparison of current fuel surcharge rates across Class I railroads, with the last 12 weeks of each.
           </p>
         </div>
       </header>
@@ -39,7 +43,7 @@ export default async function FuelSurchargesPage() {
           className="rounded-xl border overflow-hidden"
           style={{ backgroundColor: 'var(--bg-card)', borderColor: 'var(--border-default)' }}
         >
-          <FuelSurchargeTable surcharges={surcharges} />
+          <FuelSurchargeTable surcharges={surcharges} history={history} />
         </div>
 
         {lastUpdated && (
@@ -1,6 +1,6 @@
 import type { Metadata } from 'next'
 import Link from 'next/link'
-import { getLatestMetrics } from '@/lib/industry/queries'
+import { getLatestMetrics, getSectionUpdatedAt } from '@/lib/industry/queries'
 import { MetricTable } from '@/components/industry/metric-table'
 import { DataFreshness } from '@/components/industry/data-freshness'
 import { formatReportWeek } from '@/lib/industry/format'
@@ -13,7 +13,7 @@ export const metadata: Metadata = {
 }
 
 export default async function MetricsPage() {
-  const metrics = await getLatestMetrics()
+  const [metrics, lastUpdated] = await Promise.all([getLatestMetrics(), getSectionUpdatedAt('metrics')])
 
   const reportWeek = metrics.length > 0
     ? formatReportWeek(metrics[0].reportWeek)
@@ -47,7 +47,7 @@ export default async function MetricsPage() {
 
         {reportWeek && (
           <div className="mt-4">
-            <DataFreshness lastUpdated={metrics[0]?.createdAt || null} />
+            <DataFreshness lastUpdated={lastUpdated} />
           </div>
         )}
       </div>
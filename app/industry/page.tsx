@@ -1,10 +1,11 @@
 import type { Metadata } from 'next'
 import Link from 'next/link'
-import { getIndustryStats, getLatestMetrics, getActiveAdvisories, getLatestFuelSurcharges } from '@/lib/industry/queries'
+import { getIndustryStats, getLatestMetrics, getActiveAdvisories, getLatestFuelSurcharges, getFraTotals } from '@/lib/industry/queries'
 import { IndustryStatsBar } from '@/components/industry/industry-stats'
 import { DataFreshness } from '@/components/industry/data-freshness'
 import { MetricCard } from '@/components/industry/metric-card'
 import { AdvisoryCard } from '@/components/industry/advisory-card'
+import { FraIncidentTable } from '@/components/industry/fra-incident-table'
 
 export const revalidate = 3600
 
@@ -14,11 +15,12 @@ export const metadata: Metadata = {
 }
 
 export default async function IndustryPage() {
-  const [stats, metrics, { advisories }, fuelSurcharges] = await Promise.all([
+  const [stats, metrics, { advisories }, fuelSurcharges, fra] = await Promise.all([
     getIndustryStats(),
     getLatestMetrics(),
     getActiveAdvisories({ page: 1 }),
     getLatestFuelSurcharges(),
+    getFraTotals(),
   ])
 
   // Show top metrics (one per type, first railroad)
@@ -153,6 +155,22 @@ export default async function IndustryPage() {
           </section>
         )}
 
+        {/* FRA incident totals */}
+        {Object.keys(fra.byRailroad).length > 0 && (
+          <section className="mb-10">
+            <div className="mb-4">
+              <h2 className="text-xl font-semibold" style={{ color: 'var(--text-primary)' }}>FRA Safety Incidents</h2>
+              <p className="text-sm mt-1" style={{ color: 'var(--text-tertiary)' }}>
+                Reported accidents since {fra.since}
+              </p>
+            </div>
+            <div className="grid grid-cols-1 lg:grid-cols-2 gap-5">
+              <FraIncidentTable label="Railroad" totals={fra.byRailroad} />
+              <FraIncidentTable label="State" totals={fra.byState} />
+            </div>
+          </section>
+        )}
+
         {/* Empty state */}
         {topMetrics.length === 0 && topAdvisories.length === 0 && (
           <div className="text-center py-20">
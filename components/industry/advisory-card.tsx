@@ -1,5 +1,5 @@
 import Link from 'next/link'
-import type { ServiceAdvisory, AdvisoryType } from '@/lib/industry/types'
+import type { ServiceAdvisory, AdvisoryIndexEntry, AdvisoryType } from '@/lib/industry/types'
 import { AdvisoryBadge } from './advisory-badge'
 import { formatRelativeTime } from '@/lib/industry/format'
 
@@ -11,11 +11,14 @@ const TYPE_CARD_CLASS: Record<AdvisoryType, string> = {
 }
 
 interface AdvisoryCardProps {
-  advisory: ServiceAdvisory
+  /** A full advisory, or an index entry (active, no description) from the map's state filter */
+  advisory: ServiceAdvisory | AdvisoryIndexEntry
 }
 
 export function AdvisoryCard({ advisory }: AdvisoryCardProps) {
   const cardClass = TYPE_CARD_CLASS[advisory.advisoryType] || 'advisory-card-service-alert'
+  const full = 'description' in advisory ? advisory : null
+  const area = full ? full.affectedArea : (advisory as AdvisoryIndexEntry).states.join(', ')
 
   return (
     <Link href={`/industry/advisories/${advisory.slug}`} className="block">
@@ -30,7 +33,7 @@ export function AdvisoryCard({ advisory }: AdvisoryCardProps) {
               {advisory.railroad}
             </span>
           </div>
-          {!advisory.isActive && (
+          {full && !full.isActive && (
             <span className="text-xs font-medium px-2 py-0.5 rounded-full" style={{ color: 'var(--text-muted)', background: 'var(--bg-elevated)' }}>
               Expired
             </span>
@@ -41,13 +44,15 @@ export function AdvisoryCard({ advisory }: AdvisoryCardProps) {
           {advisory.title}
         </h3>
 
-        <p className="text-sm mt-1 line-clamp-2" style={{ color: 'var(--text-secondary)' }}>
-          {advisory.description}
-        </p>
+        {full && (
+          <p className="text-sm mt-1 line-clamp-2" style={{ color: 'var(--text-secondary)' }}>
+            {full.description}
+          </p>
+        )}
 
-        {advisory.affectedArea && (
+        {area && (
           <p className="text-sm mt-1" style={{ color: 'var(--text-tertiary)' }}>
-            {advisory.affectedArea}
+            {area}
           </p>
         )}
 
@@ -2,7 +2,7 @@
 
 import { useState, useMemo } from 'react'
 import dynamic from 'next/dynamic'
-import type { ServiceAdvisory, AdvisoryType } from '@/lib/industry/types'
+import type { ServiceAdvisory, AdvisoryIndexEntry, AdvisoryType } from '@/lib/industry/types'
 import { AdvisoryCard } from './advisory-card'
 import { STATE_NAMES } from '@/lib/industry/regions'
 
@@ -30,8 +30,8 @@ const AdvisoryMap = dynamic(
 )
 
 interface AdvisoryMapSectionProps {
-  /** All active advisories (unpaginated) for the map */
-  allAdvisories: ServiceAdvisory[]
+  /** All active advisories (unpaginated, index entries) for the map */
+  allAdvisories: AdvisoryIndexEntry[]
   /** Paginated advisories for the card grid (before state filter) */
   advisories: ServiceAdvisory[]
   /** Active type filter from URL */
@@ -58,11 +58,7 @@ export function AdvisoryMapSection({ allAdvisories, advisories, activeType, acti
   // When a state is selected, filter the card grid to only that state's advisories
   const filteredAdvisories = useMemo(() => {
     if (!selectedState) return advisories
-    return mapAdvisories.filter(a => {
-      if (!a.affectedArea) return false
-      const codes = a.affectedArea.split(',').map(s => s.trim().toUpperCase())
-      return codes.includes(selectedState)
-    })
+    return mapAdvisories.filter(a => a.states.includes(selectedState))
   }, [selectedState, advisories, mapAdvisories])
 
   const stateLabel = selectedState ? STATE_NAMES[selectedState] || selectedState : null
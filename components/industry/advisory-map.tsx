@@ -4,7 +4,7 @@ import { useEffect, useRef, useState, useCallback, useMemo } from 'react'
 import { MapContainer, TileLayer, GeoJSON, useMap } from 'react-leaflet'
 import L from 'leaflet'
 import 'leaflet/dist/leaflet.css'
-import type { ServiceAdvisory, AdvisoryType } from '@/lib/industry/types'
+import type { AdvisoryIndexEntry, AdvisoryType } from '@/lib/industry/types'
 import { NAME_TO_CODE, STATE_NAMES } from '@/lib/industry/regions'
 
 const US_CENTER: [number, number] = [39, -98]
@@ -40,14 +40,11 @@ interface StateAdvisoryData {
   byType: Partial<Record<AdvisoryType, number>>
 }
 
-function buildStateMap(advisories: ServiceAdvisory[]): Map<string, StateAdvisoryData> {
+function buildStateMap(advisories: AdvisoryIndexEntry[]): Map<string, StateAdvisoryData> {
   const map = new Map<string, StateAdvisoryData>()
 
   for (const a of advisories) {
-    if (!a.affectedArea) continue
-    // affectedArea can be a 2-letter code or a comma-separated list
-    const codes = a.affectedArea.split(',').map(s => s.trim().toUpperCase()).filter(s => s.length === 2)
-    for (const code of codes) {
+    for (const code of a.states) {
       if (!STATE_NAMES[code]) continue
       const existing = map.get(code) || { count: 0, highestSeverityType: null, byType: {} }
       existing.count++
@@ -80,7 +77,7 @@ function MapBounds() {
 }
 
 interface AdvisoryMapProps {
-  advisories: ServiceAdvisory[]
+  advisories: AdvisoryIndexEntry[]
   selectedState: string | null
   onStateSelect: (stateCode: string | null) => void
 }
@@ -92,7 +89,7 @@ export function AdvisoryMap({ advisories, selectedState, onStateSelect }: Adviso
   const stateMap = useMemo(() => buildStateMap(advisories), [advisories])
 
   const nationwideCount = useMemo(
-    () => advisories.filter(a => !a.affectedArea).length,
+    () => advisories.filter(a => a.states.length === 0).length,
     [advisories]
   )
 
@@ -0,0 +1,45 @@
+import type { FraIncidentTotals } from '@/lib/industry/types'
+
+interface FraIncidentTableProps {
+  label: string
+  totals: Record<string, FraIncidentTotals>
+  limit?: number
+}
+
+export function FraIncidentTable({ label, totals, limit = 8 }: FraIncidentTableProps) {
+  const rows = Object.entries(totals)
+    .sort(([, a], [, b]) => b.incidents - a.incidents || b.damage - a.damage)
+    .slice(0, limit)
+
+  return (
+    <div
+      className="rounded-xl border overflow-x-auto"
+      style={{ backgroundColor: 'var(--bg-card)', borderColor: 'var(--border-default)' }}
+    >
+      <table className="w-full text-sm">
+        <thead>
+          <tr>
+            <th className="text-left py-3 px-4 font-semibold" style={{ color: 'var(--text-tertiary)' }}>{label}</th>
+            <th className="text-right py-3 px-4 font-semibold" style={{ color: 'var(--text-tertiary)' }}>Incidents</th>
+            <th className="text-right py-3 px-4 font-semibold" style={{ color: 'var(--text-tertiary)' }}>Fatalities</th>
+            <th className="text-right py-3 px-4 font-semibold" style={{ color: 'var(--text-tertiary)' }}>Injuries</th>
+            <th className="text-right py-3 px-4 font-semibold" style={{ color: 'var(--text-tertiary)' }}>Damage</th>
+          </tr>
+        </thead>
+        <tbody>
+          {rows.map(([name, t]) => (
+            <tr key={name} className="border-t" style={{ borderColor: 'var(--border-subtle)' }}>
+              <td className="py-3 px-4 font-medium" style={{ color: 'var(--text-primary)' }}>{name}</td>
+              <td className="py-3 px-4 text-right" style={{ color: 'var(--text-secondary)' }}>{t.incidents.toLocaleString()}</td>
+              <td className="py-3 px-4 text-right" style={{ color: 'var(--text-secondary)' }}>{t.fatalities.toLocaleString()}</td>
+              <td className="py-3 px-4 text-right" style={{ color: 'var(--text-secondary)' }}>{t.injuries.toLocaleString()}</td>
+              <td className="py-3 px-4 text-right" style={{ color: 'var(--text-secondary)' }}>
+                ${Math.round(t.damage).toLocaleString()}
+              </td>
+            </tr>
+          ))}
+        </tbody>
+      </table>
+    </div>
+  )
+}
@@ -0,0 +1,30 @@
+import type { FuelSurcharge } from '@/lib/industry/types'
+
+interface FuelSurchargeSparklineProps {
+  /** Weekly rates for one railroad + traffic type, newest first (as getFuelSurchargeHistory returns them) */
+  history: FuelSurcharge[]
+  width?: number
+  height?: number
+}
+
+export function FuelSurchargeSparkline({ history, width = 120, height = 32 }: FuelSurchargeSparklineProps) {
+  if (history.length < 2) return null
+
+  const points = [...history].reverse()
+  const rates = points.map(s => s.surchargeRate)
+  const min = Math.min(...rates)
+  const max = Math.max(...rates)
+  const span = max - min || 1
+  const x = (i: number) => (i / (points.length - 1)) * width
+  const y = (v: number) => height - 2 - ((v - min) / span) * (height - 4)
+  const path = rates.map((v, i) => `${i === 0 ? 'M' : 'L'}${x(i).toFixed(1)},${y(v).toFixed(1)}`).join('')
+  const first = new Date(points[0].effectiveDate).toLocaleDateString('en-US', { month: 'short', day: 'numeric' })
+
+  return (
+    <svg width={width} height={height} viewBox={`0 0 ${width} ${height}`} role="img">
+      <title>{`${points.length} weeks since ${first}: ${min.toFixed(1)}%–${max.toFixed(1)}%`}</title>
+      <path d={path} fill="none" stroke="var(--accent-text)" strokeWidth={1.5} />
+      <circle cx={x(points.length - 1)} cy={y(rates[rates.length - 1])} r={2} fill="var(--accent-text)" />
+    </svg>
+  )
+}
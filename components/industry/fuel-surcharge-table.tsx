@@ -1,10 +1,13 @@
 import type { FuelSurcharge } from '@/lib/industry/types'
+import { FuelSurchargeSparkline } from './fuel-surcharge-sparkline'
 
 interface FuelSurchargeTableProps {
   surcharges: FuelSurcharge[]
+  /** Recent weeks per `${railroad}-${trafficType}`, newest first */
+  history?: Record<string, FuelSurcharge[]>
 }
 
-export function FuelSurchargeTable({ surcharges }: FuelSurchargeTableProps) {
+export function FuelSurchargeTable({ surcharges, history = {} }: FuelSurchargeTableProps) {
   if (surcharges.length === 0) {
     return (
       <div className="text-center py-12">
@@ -34,6 +37,7 @@ export function FuelSurchargeTable({ surcharges }: FuelSurchargeTableProps) {
             <th className="text-left py-3 px-4 font-semibold" style={{ color: 'var(--text-tertiary)' }}>Railroad</th>
             <th className="text-left py-3 px-4 font-semibold" style={{ color: 'var(--text-tertiary)' }}>Traffic Type</th>
             <th className="text-right py-3 px-4 font-semibold" style={{ color: 'var(--text-tertiary)' }}>Surcharge Rate</th>
+            <th className="text-right py-3 px-4 font-semibold" style={{ color: 'var(--text-tertiary)' }}>Trend</th>
             <th className="text-right py-3 px-4 font-semibold" style={{ color: 'var(--text-tertiary)' }}>Fuel Price</th>
             <th className="text-right py-3 px-4 font-semibold" style={{ color: 'var(--text-tertiary)' }}>Effective Date</th>
           </tr>
@@ -62,6 +66,11 @@ export function FuelSurchargeTable({ surcharges }: FuelSurchargeTableProps) {
                 <td className="text-right py-3 px-4 font-semibold" style={{ color: 'var(--text-primary)' }}>
                   {s.surchargeRate.toFixed(1)}%
                 </td>
+                <td className="py-3 px-4">
+                  <div className="flex justify-end">
+                    <FuelSurchargeSparkline history={history[`${s.railroad}-${s.trafficType}`] || []} />
+                  </div>
+                </td>
                 <td className="text-right py-3 px-4" style={{ color: 'var(--text-secondary)' }}>
                   {s.fuelPrice ? `$${s.fuelPrice.toFixed(2)}` : '—'}
                 </td>
@@ -1,5 +1,6 @@
 import type { MetricWithTrend } from '@/lib/industry/types'
 import { formatMetricType, formatMetricUnit } from '@/lib/industry/format'
+import { MetricSparkline } from './metric-sparkline'
 
 interface MetricCardProps {
   metric: MetricWithTrend
@@ -11,6 +12,8 @@ export function MetricCard({ metric }: MetricCardProps) {
     ? (isPositive ? 'var(--badge-red-text)' : 'var(--badge-green-text)')
     : (isPositive ? 'var(--badge-green-text)' : 'var(--badge-red-text)')
 
+  const analytics = metric.analytics
+
   return (
     <div
       className="rounded-xl border p-4 transition hover:shadow-md"
@@ -44,7 +47,29 @@ export function MetricCard({ metric }: MetricCardProps) {
       </div>
       <p className="text-sm mt-2" style={{ color: 'var(--text-secondary)' }}>
         {metric.railroad}
+        {analytics?.anomaly && (
+          <span
+            className="badge ml-2"
+            title={`z-score ${analytics.zScore?.toFixed(1)}`}
+            style={{ background: 'var(--badge-red-bg)', borderColor: 'var(--badge-red-border)', color: 'var(--badge-red-text)' }}
+          >
+            Unusual
+          </span>
+        )}
       </p>
+      {analytics && (
+        <div className="flex items-end justify-between mt-2">
+          <MetricSparkline analytics={analytics} />
+          <div className="text-right text-[10px]" style={{ color: 'var(--text-muted)' }}>
+            {analytics.rollingAvg != null && (
+              <p>4-wk avg {analytics.rollingAvg.toLocaleString(undefined, { maximumFractionDigits: 1 })}</p>
+            )}
+            {analytics.yoyPercent != null && (
+              <p>{analytics.yoyPercent >= 0 ? '+' : ''}{analytics.yoyPercent.toFixed(1)}% YoY</p>
+            )}
+          </div>
+        </div>
+      )}
     </div>
   )
 }
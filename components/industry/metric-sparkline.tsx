@@ -0,0 +1,43 @@
+import type { MetricSeriesAnalytics } from '@/lib/industry/types'
+
+interface MetricSparklineProps {
+  analytics: MetricSeriesAnalytics
+  width?: number
+  height?: number
+}
+
+function toPath(points: (number | null)[], x: (i: number) => number, y: (v: number) => number): string {
+  let path = ''
+  let pen = false
+  points.forEach((v, i) => {
+    if (v == null) {
+      pen = false
+      return
+    }
+    path += `${pen ? 'L' : 'M'}${x(i).toFixed(1)},${y(v).toFixed(1)}`
+    pen = true
+  })
+  return path
+}
+
+export function MetricSparkline({ analytics, width = 120, height = 32 }: MetricSparklineProps) {
+  const present = analytics.values.filter((v): v is number => v != null)
+  if (present.length < 2) return null
+
+  const min = Math.min(...present)
+  const max = Math.max(...present)
+  const span = max - min || 1
+  const x = (i: number) => (i / Math.max(analytics.values.length - 1, 1)) * width
+  const y = (v: number) => height - 2 - ((v - min) / span) * (height - 4)
+
+  return (
+    <svg width={width} height={height} viewBox={`0 0 ${width} ${height}`} aria-hidden="true">
+      <path d={toPath(analytics.rolling, x, y)} fill="none" stroke="var(--text-muted)" strokeWidth={1} strokeDasharray="2 2" />
+      <path d={toPath(analytics.values, x, y)} fill="none" stroke="var(--accent-text)" strokeWidth={1.5} />
+      {analytics.anomalyWeeks.map(i => {
+        const v = analytics.values[i]
+        return v == null ? null : <circle key={i} cx={x(i)} cy={y(v)} r={2.5} fill="var(--badge-red-text)" />
+      })}
+    </svg>
+  )
+}
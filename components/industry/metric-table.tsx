@@ -82,6 +82,20 @@ export function MetricTable({ metrics, reportWeek }: MetricTableProps) {
                           {metric.changePercent >= 0 ? '+' : ''}{metric.changePercent.toFixed(1)}%
                         </span>
                       )}
+                      {metric.analytics?.yoyPercent != null && (
+                        <span className="block text-[10px]" style={{ color: 'var(--text-muted)' }}>
+                          {metric.analytics.yoyPercent >= 0 ? '+' : ''}{metric.analytics.yoyPercent.toFixed(1)}% YoY
+                        </span>
+                      )}
+                      {metric.analytics?.anomaly && (
+                        <span
+                          className="block text-[10px] font-semibold"
+                          title={`z-score ${metric.analytics.zScore?.toFixed(1)} vs the trailing 26 weeks`}
+                          style={{ color: 'var(--badge-red-text)' }}
+                        >
+                          unusual week
+                        </span>
+                      )}
                     </td>
                   )
                 })}
@@ -1,55 +1,57 @@
-import industryData from '@/public/industry.json'
-import type { RailServiceMetric, FuelSurcharge, RegulatoryUpdate, ServiceAdvisory, MetricWithTrend, IndustryStats, FreightTrendPoint } from './types'
+import type { RailServiceMetric, FuelSurcharge, RegulatoryUpdate, ServiceAdvisory, AdvisoryIndexEntry, MetricWithTrend, IndustryStats, IndustryMeta, MetricTrendIndex, FreightTrendPoint, FraRollupIndex, AdvisoryFacilityImpact, MetricAnalyticsIndex, ColumnarSection, IndustrySection } from './types'
+
+// scripts/scrape-industry.py writes one file per section under public/industry/.
+// Each is imported on demand, so a page only loads the shards it renders.
+
+// Sections written with --columnar arrive as columns; rebuild the records once per module
+const decoded = new WeakMap<ColumnarSection, unknown[]>()
+
+function decodeColumns<T>(data: T[] | ColumnarSection): T[] {
+  if (Array.isArray(data)) return data
+  const cached = decoded.get(data)
+  if (cached) return cached as T[]
+  const columns = Object.entries(data.columns)
+  const rows = Array.from({ length: data.length }, (_, i) => {
+    const row: Record<string, unknown> = {}
+    for (const [key, column] of columns) {
+      row[key] = (Array.isArray(column) ? column[i] : column.dict[column.codes[i]]) ?? null
+    }
+    return row as T
+  })
+  decoded.set(data, rows)
+  return rows
+}
 
-const metrics = industryData.metrics as RailServiceMetric[]
-const fuelSurcharges = industryData.fuelSurcharges as FuelSurcharge[]
-const advisories = ((industryData as Record<string, unknown>).advisories || []) as ServiceAdvisory[]
-const regulatory = industryData.regulatory as RegulatoryUpdate[]
-const freightTrends = ((industryData as Record<string, unknown>).freightTrends || []) as FreightTrendPoint[]
+const loadMeta = () => import('@/public/industry/meta.json').then(m => m.default as IndustryMeta)
+const loadMetrics = () => import('@/public/industry/metrics.json').then(m => decodeColumns(m.default as unknown as RailServiceMetric[] | ColumnarSection))
+const loadMetricTrends = () => import('@/public/industry/metric-trends.json').then(m => m.default as unknown as MetricTrendIndex)
+const loadMetricAnalytics = () => import('@/public/industry/metric-analytics.json').then(m => m.default as unknown as MetricAnalyticsIndex)
+const loadFuelSurcharges = () => import('@/public/industry/fuel-surcharges.json').then(m => m.default as FuelSurcharge[])
+const loadAdvisoryIndex = () => import('@/public/industry/advisories-index.json').then(m => m.default as unknown as AdvisoryIndexEntry[])
+const loadRegulatoryIndex = () => import('@/public/industry/regulatory-index.json').then(m => m.default as unknown as RegulatoryUpdate[])
+const loadFreightTrends = () => import('@/public/industry/freight-trends.json').then(m => decodeColumns(m.default as unknown as FreightTrendPoint[] | ColumnarSection))
+const loadFraRollups = () => import('@/public/industry/fra-rollups.json').then(m => m.default as unknown as FraRollupIndex)
+const loadAdvisoryFacilities = () => import('@/public/industry/advisory-facilities.json').then(m => m.default as unknown as Record<string, AdvisoryFacilityImpact>)
+const loadFacilityAdvisories = () => import('@/public/industry/facility-advisories.json').then(m => m.default as unknown as Record<string, string[]>)
 
 export const ITEMS_PER_PAGE = 20
 
 // ── Rail Service Metrics ──────────────────────────────
 
-export async function getLatestMetrics(): Promise<MetricWithTrend[]> {
-  if (metrics.length === 0) return []
-
-  // Find latest report week per metric type (datasets report on slightly different days)
-  const latestWeekByType = new Map<string, string>()
-  for (const m of metrics) {
-    const prev = latestWeekByType.get(m.metricType)
-    if (!prev || m.reportWeek > prev) latestWeekByType.set(m.metricType, m.reportWeek)
-  }
-
-  // Get current metrics: latest week for each type
-  const current = metrics
-    .filter(m => m.reportWeek === latestWeekByType.get(m.metricType))
-    .sort((a, b) => a.railroad.localeCompare(b.railroad) || a.metricType.localeCompare(b.metricType))
-
-  // Build previous-week map for trend calculation
-  const prevMap = new Map<string, number>()
-  for (const [type, latestWeek] of latestWeekByType) {
-    const typeMetrics = metrics.filter(m => m.metricType === type && m.reportWeek < latestWeek)
-    const prevWeeks = [...new Set(typeMetrics.map(m => m.reportWeek))].sort().reverse()
-    if (prevWeeks.length > 0) {
-      for (const m of typeMetrics.filter(m => m.reportWeek === prevWeeks[0])) {
-        prevMap.set(`${m.railroad}-${m.metricType}-${m.commodity || ''}`, m.value)
-      }
-    }
-  }
+const metricKey = (m: { railroad: string; metricType: string; commodity?: string }) =>
+  `${m.railroad}-${m.metricType}-${m.commodity || ''}`
 
-  return current.map(m => {
-    const key = `${m.railroad}-${m.metricType}-${m.commodity || ''}`
-    const previousValue = prevMap.get(key)
-    const changePercent =
-      previousValue != null && previousValue !== 0
-        ? ((m.value - previousValue) / previousValue) * 100
-        : undefined
-    return { ...m, previousValue, changePercent }
+export async function getLatestMetrics(): Promise<MetricWithTrend[]> {
+  // Latest week per metric type, with previous-week trend and long-run analytics, precomputed by the scraper
+  const [{ latest }, { series }] = await Promise.all([loadMetricTrends(), loadMetricAnalytics()])
+  return latest.map(m => {
+    const analytics = series[metricKey(m)]
+    return analytics ? { ...m, analytics } : m
   })
 }
 
 export async function getMetricsByRailroad(railroad: string): Promise<MetricWithTrend[]> {
+  const metrics = await loadMetrics()
   return metrics
     .filter(m => m.railroad === railroad)
     .sort((a, b) => b.reportWeek.localeCompare(a.reportWeek) || a.metricType.localeCompare(b.metricType))
@@ -62,24 +64,28 @@ export async function getMetricHistory(
   metricType: string,
   weeks: number = 12
 ): Promise<{ reportWeek: string; value: number }[]> {
-  return metrics
-    .filter(m => m.railroad === railroad && m.metricType === metricType && (!m.commodity || m.commodity === ''))
-    .sort((a, b) => b.reportWeek.localeCompare(a.reportWeek))
-    .slice(0, weeks)
-    .map(m => ({ reportWeek: m.reportWeek, value: m.value }))
-    .reverse()
+  const { series } = await loadMetricTrends()
+  return (series[`${railroad}-${metricType}-`] || []).slice(-weeks)
 }
 
 // ── Fuel Surcharges ──────────────────────────────────
 
 export async function getLatestFuelSurcharges(): Promise<FuelSurcharge[]> {
-  // Already deduplicated in the scraper output
-  return [...fuelSurcharges].sort((a, b) => a.railroad.localeCompare(b.railroad))
+  const fuelSurcharges = await loadFuelSurcharges()
+  // The scraper emits a weekly timeline; keep the newest week per railroad + traffic type
+  const latest = new Map<string, FuelSurcharge>()
+  for (const s of fuelSurcharges) {
+    const key = `${s.railroad}-${s.trafficType}`
+    const prev = latest.get(key)
+    if (!prev || s.effectiveDate > prev.effectiveDate) latest.set(key, s)
+  }
+  return [...latest.values()].sort((a, b) => a.railroad.localeCompare(b.railroad) || a.trafficType.localeCompare(b.trafficType))
 }
 
-export async function getFuelSurchargeHistory(railroad: string, weeks: number = 12): Promise<FuelSurcharge[]> {
+export async function getFuelSurchargeHistory(railroad: string, weeks: number = 12, trafficType?: string): Promise<FuelSurcharge[]> {
+  const fuelSurcharges = await loadFuelSurcharges()
   return fuelSurcharges
-    .filter(s => s.railroad === railroad)
+    .filter(s => s.railroad === railroad && (trafficType === undefined || s.trafficType === trafficType))
     .sort((a, b) => b.effectiveDate.localeCompare(a.effectiveDate))
     .slice(0, weeks)
 }
@@ -91,7 +97,8 @@ export async function getActiveAdvisories(filters?: {
   advisoryType?: string
   page?: number
 }): Promise<{ advisories: ServiceAdvisory[]; total: number }> {
-  let filtered = advisories.filter(a => a.isActive)
+  // The index holds active advisories only
+  let filtered = [...(await loadAdvisoryIndex())]
 
   if (filters?.railroad) {
     filtered = filtered.filter(a => a.railroad === filters.railroad)
@@ -104,19 +111,21 @@ export async function getActiveAdvisories(filters?: {
 
   const page = Math.max(1, filters?.page || 1)
   const skip = (page - 1) * ITEMS_PER_PAGE
-  const paged = filtered.slice(skip, skip + ITEMS_PER_PAGE)
+  // Cards show descriptions, which only the per-slug files carry
+  const paged = await Promise.all(filtered.slice(skip, skip + ITEMS_PER_PAGE).map(a => getAdvisoryBySlug(a.slug)))
 
-  return { advisories: paged, total: filtered.length }
+  return { advisories: paged.filter((a): a is ServiceAdvisory => a !== null), total: filtered.length }
 }
 
-export async function getAllActiveAdvisories(): Promise<ServiceAdvisory[]> {
-  return advisories
-    .filter(a => a.isActive)
-    .sort((a, b) => b.issuedAt.localeCompare(a.issuedAt))
+export async function getAllActiveAdvisories(): Promise<AdvisoryIndexEntry[]> {
+  return [...(await loadAdvisoryIndex())].sort((a, b) => b.issuedAt.localeCompare(a.issuedAt))
 }
 
 export async function getAdvisoryBySlug(slug: string): Promise<ServiceAdvisory | null> {
-  return advisories.find(a => a.slug === slug) || null
+  if (!/^[a-z0-9-]+$/.test(slug)) return null
+  return import(`@/public/industry/advisories/${slug}.json`)
+    .then(m => m.default as ServiceAdvisory)
+    .catch(() => null)
 }
 
 // ── Regulatory Updates ────────────────────────────────
@@ -125,7 +134,7 @@ export async function getRegulatoryUpdates(filters?: {
   agency?: string
   page?: number
 }) {
-  let filtered = [...regulatory]
+  let filtered = [...(await loadRegulatoryIndex())]
   if (filters?.agency) {
     filtered = filtered.filter(u => u.agency === filters.agency)
   }
@@ -138,24 +147,59 @@ export async function getRegulatoryUpdates(filters?: {
   return { updates: paged, total: filtered.length }
 }
 
-export async function getRegulatoryBySlug(slug: string) {
-  return regulatory.find(u => u.slug === slug) || null
+export async function getRegulatoryBySlug(slug: string): Promise<RegulatoryUpdate | null> {
+  if (!/^[a-z0-9-]+$/.test(slug)) return null
+  return import(`@/public/industry/regulatory/${slug}.json`)
+    .then(m => m.default as RegulatoryUpdate)
+    .catch(() => null)
 }
 
 // ── Freight Trends ────────────────────────────────────
 
 export async function getFreightTrends(): Promise<FreightTrendPoint[]> {
-  return [...freightTrends].sort((a, b) => a.date.localeCompare(b.date))
+  return [...(await loadFreightTrends())].sort((a, b) => a.date.localeCompare(b.date))
+}
+
+// ── Advisory ↔ Facility Join ─────────────────────────
+
+export async function getAffectedFacilities(slug: string): Promise<AdvisoryFacilityImpact | null> {
+  const bySlug = await loadAdvisoryFacilities()
+  return bySlug[slug] ?? null
+}
+
+export async function getAdvisoriesForFacility(facilityId: string): Promise<AdvisoryIndexEntry[]> {
+  const slugs = (await loadFacilityAdvisories())[facilityId]
+  if (!slugs?.length) return []
+  const wanted = new Set(slugs)
+  const advisories = await loadAdvisoryIndex()
+  return advisories
+    .filter(a => wanted.has(a.slug))
+    .sort((a, b) => b.issuedAt.localeCompare(a.issuedAt))
+}
+
+// ── FRA Incident Rollups ──────────────────────────────
+
+export async function getFraTotals(): Promise<Omit<FraRollupIndex, 'rollups'>> {
+  // Per-state and per-railroad totals precomputed by the scraper; the monthly rollups stay unloaded
+  const { since, byState, byRailroad } = await loadFraRollups()
+  return { since, byState, byRailroad }
 }
 
 // ── Dashboard Stats ──────────────────────────────────
 
 export async function getIndustryStats(): Promise<IndustryStats> {
-  const active = advisories.filter(a => a.isActive)
+  const meta = await loadMeta()
   return {
-    totalMetrics: metrics.length,
-    totalAdvisories: active.length,
-    activeEmbargoes: active.filter(a => a.advisoryType === 'EMBARGO').length,
-    lastUpdated: industryData.scrapedAt ? new Date(industryData.scrapedAt) : null,
+    totalMetrics: meta.counts.metrics,
+    totalAdvisories: meta.counts.activeAdvisories,
+    activeEmbargoes: meta.counts.activeEmbargoes,
+    lastUpdated: meta.scrapedAt ? new Date(meta.scrapedAt) : null,
   }
 }
+
+// `scrape-industry.py --only` refreshes some sections and leaves the rest, so each carries its own time
+export async function getSectionUpdatedAt(section: IndustrySection): Promise<Date | null> {
+  const meta = await loadMeta()
+  const scrapedAt = meta.sectionScrapedAt?.[section] ?? meta.scrapedAt
+  return scrapedAt ? new Date(scrapedAt) : null
+}
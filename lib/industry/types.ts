@@ -33,14 +33,33 @@ export interface ServiceAdvisory {
   title: string
   description: string
   affectedArea?: string
+  locations?: AdvisoryLocation[]
   slug: string
   isActive: boolean
   issuedAt: string
   expiresAt?: string
+  sourceUrl?: string
   createdAt: string
   updatedAt: string
 }
 
+// public/industry/advisories-index.json: one active advisory as list pages see it.
+// The description lives in advisories/<slug>.json.
+export type AdvisoryIndexEntry = Pick<ServiceAdvisory, 'id' | 'slug' | 'title' | 'railroad' | 'advisoryType' | 'issuedAt'> & {
+  states: string[]
+}
+
+// A place the scraper's geotagger pinned in an advisory's title or description
+export interface AdvisoryLocation {
+  name: string
+  kind: 'city' | 'yard' | 'subdivision'
+  state: string
+  lat: number
+  lon: number
+  // "City, ST", yard or subdivision match: precise enough for the facility radius join
+  explicit?: boolean
+}
+
 export interface RegulatoryUpdate {
   id: string
   externalId: string
@@ -110,6 +129,45 @@ export type { RailServiceMetric as DataFeedLog }
 export interface MetricWithTrend extends RailServiceMetric {
   previousValue?: number
   changePercent?: number
+  analytics?: MetricSeriesAnalytics
+}
+
+// One series in public/industry/metric-analytics.json. values and rolling
+// are weekly from `start`; anomalyWeeks index into them.
+export interface MetricSeriesAnalytics {
+  start: string
+  values: (number | null)[]
+  rolling: (number | null)[]
+  anomalyWeeks: number[]
+  rollingAvg: number | null
+  yoyPercent: number | null
+  zScore: number | null
+  anomaly: boolean
+}
+
+export interface MetricAnomaly {
+  key: string
+  railroad: string
+  metricType: MetricType
+  commodity: string
+  reportWeek: string
+  value: number | null
+  zScore: number | null
+}
+
+// public/industry/metric-analytics.json; series keys match MetricTrendIndex
+export interface MetricAnalyticsIndex {
+  rollingWeeks: number
+  zWeeks: number
+  anomalyZ: number
+  series: Record<string, MetricSeriesAnalytics>
+  anomalies: MetricAnomaly[]
+}
+
+// public/industry/metric-trends.json; series keys are `${railroad}-${metricType}-${commodity}`
+export interface MetricTrendIndex {
+  latest: MetricWithTrend[]
+  series: Record<string, { reportWeek: string; value: number }[]>
 }
 
 export interface IndustryStats {
@@ -119,6 +177,34 @@ export interface IndustryStats {
   lastUpdated: Date | null
 }
 
+// metrics.json and freight-trends.json when the scraper runs with --columnar:
+// one array per field, string fields with few distinct values dictionary-encoded
+export type ColumnarColumn = unknown[] | { dict: unknown[]; codes: number[] }
+
+export interface ColumnarSection {
+  format: 'columns'
+  length: number
+  columns: Record<string, ColumnarColumn>
+}
+
+export type IndustrySection = 'metrics' | 'fuelSurcharges' | 'advisories' | 'regulatory' | 'freightTrends'
+
+// public/industry/meta.json, written alongside the section shards. A section is
+// missing from sectionScrapedAt until a run after per-section stamps refreshes it.
+export interface IndustryMeta {
+  scrapedAt: string
+  sectionScrapedAt?: Partial<Record<IndustrySection, string>>
+  counts: {
+    metrics: number
+    fuelSurcharges: number
+    advisories: number
+    activeAdvisories: number
+    activeEmbargoes: number
+    regulatory: number
+    freightTrends: number
+  }
+}
+
 export interface FreightTrendPoint {
   date: string
   carloads: number | null
@@ -129,3 +215,32 @@ export interface FreightTrendPoint {
   ppiRail: number | null
   cassFreight: number | null
 }
+
+export interface FraIncidentTotals {
+  incidents: number
+  fatalities: number
+  injuries: number
+  damage: number
+}
+
+export interface FraRollup extends FraIncidentTotals {
+  state: string
+  railroad: string
+  month: string
+}
+
+// public/industry/advisory-facilities.json: facilities each active advisory touches
+export interface AdvisoryFacilityImpact {
+  scope: 'radius' | 'state'
+  count: number
+  byType: Record<string, number>
+  facilityIds: string[]
+}
+
+// public/industry/fra-rollups.json: FRA incidents by state x railroad x month
+export interface FraRollupIndex {
+  since: string
+  rollups: FraRollup[]
+  byState: Record<string, FraIncidentTotals>
+  byRailroad: Record<string, FraIncidentTotals>
+}
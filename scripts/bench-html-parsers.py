@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Benchmark HTML parsing backends on saved advisory pages.
+
+For every page it times a full-tree parse and a subtree (SoupStrainer) parse
+on each available backend, and records peak memory with tracemalloc. STB
+pages compare the old DOTALL regex with the linear iter_elements() scan.
+The fastest variant per page is printed last; copy any that differ from
+the default into html_parsing.PAGE_BACKENDS.
+
+Pages are HTML files named after their PAGE_TARGETS key (bnsf.html,
+csx.html, ns.html, up_embargo.html, up_news.html, stb.html).
+
+Usage:
+    python3 scripts/bench-html-parsers.py pages/
+    python3 scripts/bench-html-parsers.py pages/ --repeat 20
+"""
+
+import re
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from html_parsing import PAGE_TARGETS, available_backends, iter_elements, parse_html  # noqa: E402
+
+STB_ARTICLE = re.compile(
+    r'<article[^>]+class="[^"]*stb-latest-news[^"]*"[^>]*>(.*?)</article>',
+    re.DOTALL | re.IGNORECASE,
+)
+
+
+def measure(fn, repeat: int) -> tuple[float, float]:
+    """Median wall time (ms) over repeat runs and peak traced memory (KB) of one run."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - start) * 1000)
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return statistics.median(times), peak / 1024
+
+
+def variants(page: str, html: str) -> dict:
+    if page == "stb":
+        return {
+            "regex": lambda: [m.group(1) for m in STB_ARTICLE.finditer(html)],
+            "linear scan": lambda: list(iter_elements(html, "article", "stb-latest-news")),
+        }
+    found = {}
+    for backend in available_backends():
+        found[f"{backend} full"] = lambda b=backend: parse_html(html, page, backend=b, subtree=False)
+        found[f"{backend} subtree"] = lambda b=backend: parse_html(html, page, backend=b)
+    return found
+
+
+def main() -> None:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark HTML parsing backends on saved pages")
+    parser.add_argument("pages", type=Path, help="Directory of <page>.html files")
+    parser.add_argument("--repeat", type=int, default=10, help="Timed runs per variant (default 10)")
+    args = parser.parse_args()
+
+    known = set(PAGE_TARGETS) | {"stb"}
+    files = sorted(p for p in args.pages.glob("*.html") if p.stem in known)
+    if not files:
+        print(f"No pages found in {args.pages} (expected one of: {', '.join(sorted(known))})")
+        sys.exit(1)
+
+    fastest = {}
+    for path in files:
+        html = path.read_text(encoding="utf-8", errors="replace")
+        print(f"\n=== {path.stem} ({len(html) / 1024:.0f} KB) ===")
+        for name, fn in variants(path.stem, html).items():
+            ms, peak_kb = measure(fn, args.repeat)
+            print(f"  {name:<22} {ms:8.2f} ms  {peak_kb:9.0f} KB peak")
+            if path.stem not in fastest or ms < fastest[path.stem][1]:
+                fastest[path.stem] = (name, ms)
+
+    print("\n=== Fastest ===")
+    for page, (name, ms) in fastest.items():
+        print(f"  {page:<12} {name} ({ms:.2f} ms)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Offline parser benchmark for scrape-industry.py and scrape-jobs.py.
+
+Runs each scraper function against a recorded cassette (see
+http_cassette.py), so the timings cover parsing and record building with no
+network. Reports pages/s, records/s and tracemalloc peak memory per
+function. Delays between requests (time.sleep) are disabled for the run.
+Per-page helpers (fetch_detail_description, fetch_bnsf_detail) are driven
+by every recorded page that the scrapers fetched through them.
+
+Record a corpus first:
+    python3 scripts/scrape-industry.py --record scripts/.cassettes/corpus
+    python3 scripts/scrape-jobs.py --direct-only --record scripts/.cassettes/corpus
+
+Usage:
+    python3 scripts/bench-scrapers.py scripts/.cassettes/corpus
+    python3 scripts/bench-scrapers.py scripts/.cassettes/corpus --save bench.json
+    python3 scripts/bench-scrapers.py scripts/.cassettes/corpus --baseline bench.json --tolerance 0.25
+"""
+
+import contextlib
+import importlib.util
+import io
+import json
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).parent
+sys.path.insert(0, str(SCRIPT_DIR))
+
+from http_cassette import Cassette  # noqa: E402
+
+# (script, function). USDA is left out: its cost is the SQLite sync, not parsing.
+LISTING_FUNCTIONS = [
+    ("scrape-industry.py", "fetch_eia_fuel_surcharges"),
+    ("scrape-industry.py", "fetch_bnsf_advisories"),
+    ("scrape-industry.py", "fetch_csx_advisories"),
+    ("scrape-industry.py", "fetch_ns_advisories"),
+    ("scrape-industry.py", "fetch_up_advisories"),
+    ("scrape-industry.py", "fetch_fra_incidents"),
+    ("scrape-industry.py", "fetch_stb_news"),
+    ("scrape-industry.py", "scrape_freight_trends"),
+    ("scrape-jobs.py", "scrape_csx"),
+    ("scrape-jobs.py", "scrape_bnsf"),
+    ("scrape-jobs.py", "scrape_union_pacific"),
+    ("scrape-jobs.py", "scrape_norfolk_southern"),
+    ("scrape-jobs.py", "scrape_amtrak"),
+]
+
+# Functions called once per detail page: how to call them for a recorded response
+PER_PAGE_FUNCTIONS = {
+    ("scrape-jobs.py", "fetch_detail_description"): lambda meta: ((meta["url"],), {"delay": 0}),
+    ("scrape-jobs.py", "fetch_bnsf_detail"): lambda meta: ((meta["url"].rstrip("/").rsplit("/", 1)[-1],), {}),
+}
+
+
+def load_script(filename: str):
+    """Import a hyphenated scraper script as a module."""
+    spec = importlib.util.spec_from_file_location(filename[:-3].replace("-", "_"), SCRIPT_DIR / filename)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    if hasattr(module, "use_scratch_dir"):
+        # Fetchers write through to the SQLite stores behind CACHE_DB
+        module.use_scratch_dir()
+    if hasattr(module, "http"):
+        # Keep the benchmark from rewriting the real validator cache, and
+        # from timing duplicate requests
+        module.http.cache_path = None
+        module.http.hedge = False
+    if hasattr(module, "health"):
+        # Cassette misses must not open circuits between timed passes
+        module.health.threshold = float("inf")
+        module.health.db_path = None
+    return module
+
+
+def count_records(result) -> int:
+    if isinstance(result, (list, tuple, dict)):
+        return len(result)
+    return 1 if result else 0
+
+
+def run_once(cassette: Cassette, calls: list) -> tuple[float, int, int]:
+    """Time one pass over calls; returns (seconds, pages served, records)."""
+    hits = cassette.hits
+    records = 0
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        for fn, args, kwargs in calls:
+            records += count_records(fn(*args, **kwargs))
+    return time.perf_counter() - start, cassette.hits - hits, records
+
+
+def benchmark(cassette: Cassette, calls: list, repeat: int) -> dict:
+    runs = [run_once(cassette, calls) for _ in range(repeat)]
+    seconds = statistics.median(r[0] for r in runs)
+    _, pages, records = runs[-1]
+    tracemalloc.start()
+    run_once(cassette, calls)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "seconds": seconds,
+        "pages": pages,
+        "records": records,
+        "pagesPerSecond": pages / seconds if seconds else 0.0,
+        "recordsPerSecond": records / seconds if seconds else 0.0,
+        "peakKB": peak / 1024,
+    }
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Functions whose pages/s dropped more than tolerance below the baseline."""
+    regressions = []
+    for name, r in results.items():
+        base = baseline.get(name)
+        if not base or not base.get("pagesPerSecond"):
+            continue
+        ratio = r["pagesPerSecond"] / base["pagesPerSecond"]
+        if ratio < 1 - tolerance:
+            regressions.append(f"{name}: {r['pagesPerSecond']:.1f} pages/s vs {base['pagesPerSecond']:.1f} baseline ({ratio:.0%})")
+    return regressions
+
+
+def main() -> None:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark scraper parsing against a recorded cassette")
+    parser.add_argument("cassette", type=Path, help="Cassette directory recorded with --record")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed passes per function (default 5)")
+    parser.add_argument("--only", help="Comma-separated function names to run")
+    parser.add_argument("--save", type=Path, help="Write results as JSON")
+    parser.add_argument("--baseline", type=Path, help="Compare with a saved JSON and exit 1 on regressions")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed pages/s drop vs baseline (default 0.25)")
+    args = parser.parse_args()
+
+    only = set(args.only.split(",")) if args.only else None
+    cassette = Cassette(args.cassette, "replay")
+    cassette.install()
+    time.sleep = lambda seconds: None
+
+    modules = {}
+    results = {}
+    print(f"{'function':<28} {'pages':>6} {'records':>8} {'pages/s':>9} {'records/s':>10} {'peak KB':>9}")
+    targets = [(key, None) for key in LISTING_FUNCTIONS] + list(PER_PAGE_FUNCTIONS.items())
+    for (script, name), make_args in targets:
+        if only and name not in only:
+            continue
+        if script not in modules:
+            try:
+                modules[script] = load_script(script)
+            except ImportError as exc:
+                print(f"  skipping {script}: {exc}")
+                modules[script] = None
+        module = modules[script]
+        if module is None:
+            continue
+
+        fn = getattr(module, name)
+        if make_args is None:
+            calls = [(fn, (), {})]
+        else:
+            calls = [(fn, *make_args(meta)) for meta in cassette.entries(caller=name)]
+            if not calls:
+                continue
+
+        r = benchmark(cassette, calls, args.repeat)
+        if not r["pages"]:
+            print(f"{name:<28} (no pages in cassette)")
+            continue
+        results[name] = r
+        print(
+            f"{name:<28} {r['pages']:>6} {r['records']:>8} {r['pagesPerSecond']:>9.1f}"
+            f" {r['recordsPerSecond']:>10.1f} {r['peakKB']:>9.0f}"
+        )
+
+    cassette.uninstall()
+    if cassette.misses:
+        print(f"\n{cassette.misses} requests were not in the cassette (scrapers saw connection errors)")
+
+    if args.save:
+        args.save.write_text(json.dumps(results, indent=2, sort_keys=True))
+        print(f"\nSaved {args.save}")
+
+    if args.baseline:
+        regressions = compare(results, json.loads(args.baseline.read_text()), args.tolerance)
+        if regressions:
+            print("\n=== Regressions ===")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print("\nNo regressions against baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,305 @@
+"""
+Gazetteer geotagger for advisory text.
+
+A Gazetteer is a token trie of place names: state names from
+public/data/us-states.geojson, plus cities, yards and subdivisions from
+public/facilities.json when that file is present. tag() scans a text once,
+left to right, taking the longest place name that starts at each word. It
+returns normalized two-letter states and points for the places it could pin
+down.
+
+Resolution rules:
+  - "City, ST" / "City, State" is resolved first and picks the city's entry
+    in that state; "near Morris, MN" still yields MN when Morris is not in
+    the gazetteer, and "Washington, IN" yields IN, not WA
+  - cities, yards and subdivisions match only capitalized words, so
+    "the industry" is not Industry, CA
+  - stop phrases (railroad names such as Norfolk Southern, and common words
+    such as Independence) never tag a place unless followed by ", ST"
+  - a name known in several states counts only when the text also names
+    one of them
+  - two-letter codes must be upper case; codes that are also common words
+    or abbreviations (IN, OR, ME, CO, LA...) count only after a comma
+  - region words (Midwest, Gulf...) are kept as a fallback area when no
+    state is found
+
+Usage:
+    gazetteer = load_gazetteer(Path("public/data/us-states.geojson"), Path("public/facilities.json"))
+    gazetteer.tag("Train Derailment near Argyle, IA (Marceline Subdivision)")
+    # {"states": ["IA"], "points": [...], "region": None}
+
+Each point carries explicit=True when it came from a "City, ST" match or is a
+yard or subdivision, i.e. when it is precise enough to draw a radius around.
+"""
+
+import json
+import re
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# Bump whenever a change to the tagging rules could change tag() output;
+# scrape-industry re-tags stored advisories when it changes
+TAGGER_VERSION = "2"
+
+STATE_NAMES = {
+    "AL": "Alabama", "AK": "Alaska", "AZ": "Arizona", "AR": "Arkansas", "CA": "California",
+    "CO": "Colorado", "CT": "Connecticut", "DE": "Delaware", "DC": "District of Columbia",
+    "FL": "Florida", "GA": "Georgia", "HI": "Hawaii", "ID": "Idaho", "IL": "Illinois",
+    "IN": "Indiana", "IA": "Iowa", "KS": "Kansas", "KY": "Kentucky", "LA": "Louisiana",
+    "ME": "Maine", "MD": "Maryland", "MA": "Massachusetts", "MI": "Michigan", "MN": "Minnesota",
+    "MS": "Mississippi", "MO": "Missouri", "MT": "Montana", "NE": "Nebraska", "NV": "Nevada",
+    "NH": "New Hampshire", "NJ": "New Jersey", "NM": "New Mexico", "NY": "New York",
+    "NC": "North Carolina", "ND": "North Dakota", "OH": "Ohio", "OK": "Oklahoma", "OR": "Oregon",
+    "PA": "Pennsylvania", "PR": "Puerto Rico", "RI": "Rhode Island", "SC": "South Carolina",
+    "SD": "South Dakota", "TN": "Tennessee", "TX": "Texas", "UT": "Utah", "VT": "Vermont",
+    "VA": "Virginia", "WA": "Washington", "WV": "West Virginia", "WI": "Wisconsin", "WY": "Wyoming",
+}
+NAME_TO_CODE = {name.lower(): code for code, name in STATE_NAMES.items()}
+
+# Codes that are also everyday words or abbreviations in upper-case titles
+COMMA_ONLY_CODES = {"IN", "OR", "ME", "OK", "HI", "CO", "LA", "AL", "ID", "DE", "MA", "PA", "OH"}
+
+# Railroad names and everyday title words that are also gazetteer places
+STOP_PHRASES = [
+    "Norfolk Southern", "Union Pacific", "Kansas City Southern", "Canadian Pacific Kansas City",
+    "Canadian Pacific", "Canadian National", "Florida East Coast", "Providence and Worcester",
+    "Independence", "Industry", "Commerce", "Enterprise", "Progress", "Liberty", "Union", "Energy",
+    "Opportunity", "Justice", "Security", "Harmony", "Freedom", "Victory", "Reserve", "Surprise",
+]
+
+REGIONS = ["Midwest", "Southwest", "Southeast", "Northeast", "Northwest", "Pacific", "Gulf", "Central"]
+
+_TOKEN = re.compile(r"[A-Za-z0-9]+")
+_PLACES = ""  # trie key holding the places that end at a node (never a token)
+_STOP = " "  # trie key marking the end of a stop phrase (never a token)
+_CONNECTORS = {"of", "de", "du", "la", "le", "the", "on", "and"}
+
+
+def _tokens(text: str) -> List[str]:
+    return [t.lower() for t in _TOKEN.findall(text)]
+
+
+def _ring_centroid(ring: list) -> tuple:
+    """Area-weighted centroid (lat, lon) and absolute area of a closed lon/lat ring."""
+    area = cx = cy = 0.0
+    for (x0, y0), (x1, y1) in zip(ring, ring[1:]):
+        cross = x0 * y1 - x1 * y0
+        area += cross
+        cx += (x0 + x1) * cross
+        cy += (y0 + y1) * cross
+    if not area:
+        xs, ys = zip(*ring)
+        return (sum(ys) / len(ys), sum(xs) / len(xs)), 0.0
+    return (cy / (3 * area), cx / (3 * area)), abs(area) / 2
+
+
+def _state_polygons(geojson_path: Path):
+    """(code, [polygon, ...]) for each state feature with a geometry."""
+    for feature in json.loads(geojson_path.read_text(encoding="utf-8"))["features"]:
+        code = NAME_TO_CODE.get(feature["properties"].get("name", "").lower())
+        geometry = feature.get("geometry") or {}
+        if code and geometry:
+            yield code, geometry["coordinates"] if geometry["type"] == "MultiPolygon" else [geometry["coordinates"]]
+
+
+def state_centroids(geojson_path: Path) -> Dict[str, tuple]:
+    """{code: (lat, lon)} from the largest polygon of each state feature."""
+    centroids = {}
+    for code, polygons in _state_polygons(geojson_path):
+        best = max((_ring_centroid(polygon[0]) for polygon in polygons), key=lambda c: c[1])
+        centroids[code] = tuple(round(v, 4) for v in best[0])
+    return centroids
+
+
+def state_bounds(geojson_path: Path, margin: float = 0.25) -> Dict[str, tuple]:
+    """{code: (min_lat, min_lon, max_lat, max_lon)} over every outer ring, padded by margin degrees."""
+    bounds = {}
+    for code, polygons in _state_polygons(geojson_path):
+        lons = [x for polygon in polygons for x, _ in polygon[0]]
+        lats = [y for polygon in polygons for _, y in polygon[0]]
+        bounds[code] = (min(lats) - margin, min(lons) - margin, max(lats) + margin, max(lons) + margin)
+    return bounds
+
+
+class Gazetteer:
+    def __init__(self) -> None:
+        self.root: dict = {}
+        self.centroids: Dict[str, tuple] = {}
+        self.size = 0
+
+    def add(self, phrase: str, kind: str, state: str, lat: Optional[float] = None, lon: Optional[float] = None) -> None:
+        tokens = _tokens(phrase)
+        if not tokens or state not in STATE_NAMES:
+            return
+        node = self.root
+        for token in tokens:
+            node = node.setdefault(token, {})
+        places = node.setdefault(_PLACES, [])
+        for place in places:
+            if place["kind"] == kind and place["state"] == state:
+                return
+        places.append({"name": phrase, "kind": kind, "state": state, "lat": lat, "lon": lon})
+        self.size += 1
+
+    def add_stop(self, phrase: str) -> None:
+        """Mark a phrase that must not tag a place on its own (railroad names, common words)."""
+        node = self.root
+        for token in _tokens(phrase):
+            node = node.setdefault(token, {})
+        node[_STOP] = True
+
+    def _longest(self, tokens: list, i: int) -> tuple:
+        """Longest phrase starting at token i: (end index exclusive, places, stop) or (i, None, False).
+
+        State names match in any case; cities, yards and subdivisions only when
+        the original words are capitalized (connectors like "of" aside).
+        """
+        node = self.root
+        end, places, stop = i, None, False
+        proper = True
+        j = i
+        while j < len(tokens):
+            node = node.get(tokens[j][0])
+            if node is None:
+                break
+            raw = tokens[j][1]
+            proper = proper and (raw[:1].isupper() or (j > i and raw.lower() in _CONNECTORS))
+            j += 1
+            found = [p for p in node.get(_PLACES, ()) if proper or p["kind"] == "state"]
+            if found or node.get(_STOP):
+                end, places, stop = j, found, bool(node.get(_STOP))
+        return end, places, stop
+
+    def tag(self, text: str) -> dict:
+        """States, pinned points and region fallback for one text, in one pass over its words."""
+        tokens = [(m.group().lower(), m.group(), m.start(), m.end()) for m in _TOKEN.finditer(text or "")]
+        matches = []  # (places, start, end, state, stop, is_code)
+        i = 0
+        while i < len(tokens):
+            lower, raw, start, end = tokens[i]
+            after_comma = i > 0 and "," in text[tokens[i - 1][3]:start]
+            if len(raw) == 2 and raw.isupper() and raw in STATE_NAMES and (after_comma or raw not in COMMA_ONLY_CODES):
+                matches.append(([], start, end, raw, False, True))
+                i += 1
+                continue
+            last, places, stop = self._longest(tokens, i)
+            if last > i:
+                state = next((p["state"] for p in places if p["kind"] == "state"), None)
+                others = [p for p in places if p["kind"] != "state"]
+                matches.append((others, start, tokens[last - 1][3], None if stop else state, stop, False))
+                i = last
+            else:
+                i += 1
+
+        # "Name, ST": the very next match is a state, separated only by a comma.
+        # Resolved before anything else, so the state named there wins. A state
+        # name before a comma is a list ("Iowa, Nebraska") unless a code follows
+        # or the gazetteer knows a place of that name in the second state.
+        comma_states = []
+        for k, (places, _, end, state, _, is_code) in enumerate(matches):
+            following = matches[k + 1] if k + 1 < len(matches) else None
+            comma = following[3] if following and following[3] and text[end:following[1]].strip() == "," else None
+            if is_code or (state and comma and not following[5] and all(p["state"] != comma for p in places)):
+                comma = None
+            comma_states.append(comma)
+        named = {m[3] for m, comma in zip(matches, comma_states) if m[3] and comma in (None, m[3])}
+        states: List[str] = []
+        points: List[dict] = []
+
+        def add_state(code: str) -> None:
+            if code not in states:
+                states.append(code)
+
+        for (places, _, _, state, stop, _), comma in zip(matches, comma_states):
+            if comma:
+                if state == comma:
+                    add_state(state)
+                    continue
+                chosen = [p for p in places if p["state"] == comma]
+            elif stop:
+                continue
+            elif state:
+                add_state(state)
+                continue
+            elif len({p["state"] for p in places}) == 1:
+                chosen = places
+            else:
+                chosen = [p for p in places if p["state"] in named]
+            if len({p["state"] for p in chosen}) != 1:
+                continue
+            place = chosen[0]
+            add_state(place["state"])
+            if place["lat"] is not None and not any(p["name"] == place["name"] and p["state"] == place["state"] for p in points):
+                points.append({"name": place["name"], "kind": place["kind"], "state": place["state"],
+                               "lat": place["lat"], "lon": place["lon"],
+                               "explicit": bool(comma) or place["kind"] != "city"})
+
+        region = None
+        if not states:
+            region = next((r for r in REGIONS if r in (text or "")), None)
+        return {"states": states, "points": points, "region": region}
+
+
+def load_gazetteer(states_geojson: Path, facilities_json: Optional[Path] = None) -> Gazetteer:
+    """Build the trie from state names and stop phrases, plus facility cities, yards and subdivisions if available.
+
+    Yards and subdivisions come from facility names ("Argentine Yard",
+    "Marceline Subdivision"). Facility coordinates at 0/0 or outside the
+    facility's state are dropped before city points are averaged.
+    """
+    gazetteer = Gazetteer()
+    gazetteer.centroids = state_centroids(states_geojson)
+    for code, name in STATE_NAMES.items():
+        lat, lon = gazetteer.centroids.get(code, (None, None))
+        gazetteer.add(name, "state", code, lat, lon)
+    for phrase in STOP_PHRASES:
+        gazetteer.add_stop(phrase)
+
+    if not facilities_json or not facilities_json.exists():
+        return gazetteer
+
+    bounds = state_bounds(states_geojson)
+
+    def in_state(lat, lon, state: str) -> bool:
+        if lat is None or lon is None or (not lat and not lon):
+            return False
+        box = bounds.get(state)
+        return not box or (box[0] <= lat <= box[2] and box[1] <= lon <= box[3])
+
+    cities: Dict[tuple, list] = {}
+    for facility in json.loads(facilities_json.read_text(encoding="utf-8")):
+        loc = facility.get("location") or {}
+        state = (loc.get("state") or "").strip().upper()
+        state = NAME_TO_CODE.get(state.lower(), state)
+        if state not in STATE_NAMES:
+            continue
+        lat, lon = loc.get("latitude"), loc.get("longitude")
+        if not in_state(lat, lon, state):
+            lat = lon = None
+        city = (loc.get("city") or "").strip()
+        if city:
+            cities.setdefault((city.title(), state), []).append((lat, lon))
+
+        name = facility.get("name") or ""
+        words = name.split()
+        lowered = [w.lower().strip(",.-()") for w in words]
+        for kind in ("yard", "subdivision"):
+            if kind not in lowered:
+                continue
+            # Full facility name, and the "<Name> Yard" / "<Name> Subdivision" form advisories use
+            k = lowered.index(kind)
+            gazetteer.add(name, kind, state, lat, lon)
+            if k > 0:
+                gazetteer.add(" ".join(w.strip(",.-()") for w in words[k - 1:k + 1]), kind, state, lat, lon)
+
+    for (city, state), coords in cities.items():
+        known = [(lat, lon) for lat, lon in coords if lat is not None]
+        if known:
+            lat = round(sum(c[0] for c in known) / len(known), 4)
+            lon = round(sum(c[1] for c in known) / len(known), 4)
+        else:
+            lat = lon = None
+        # "Washington", "New York": shares a node with the state entry, which
+        # wins unless the text says "Washington, IN"
+        gazetteer.add(city, "city", state, lat, lon)
+    return gazetteer
@@ -0,0 +1,143 @@
+"""
+HTML parsing backends for the advisory scrapers.
+
+The scrapers read a few anchors or table rows out of pages that are mostly
+navigation, scripts and footers. parse_html() builds a BeautifulSoup tree of
+only the target subtree (a SoupStrainer per page in PAGE_TARGETS), using lxml
+when it is installed and html.parser otherwise. iter_elements() scans raw
+HTML for non-nested blocks such as STB's <article class="stb-latest-news">
+in one linear pass, with no tree and no backtracking regex. main_text()
+pulls the readable body out of a notice's detail page.
+
+Usage:
+    soup = parse_html(html, "ns")              # only customer-alert links
+    soup = parse_html(html, "ns", backend="html.parser")
+    for body in iter_elements(html, "article", "stb-latest-news"):
+        ...
+    main_text(html, title="Embargo 12345")    # notice body without chrome
+
+scripts/bench-html-parsers.py times every backend on saved pages.
+"""
+
+import functools
+import re
+from typing import Iterator, Optional
+
+# Strainer arguments per scraped page: (tag name, attrs). None keeps the whole page.
+PAGE_TARGETS = {
+    "bnsf": ("div", {"class": "media-asset-copy"}),
+    "csx": (None, {"id": "content_main"}),
+    "ns": ("a", {"href": re.compile(r"/customer-alerts/")}),
+    "up_embargo": ("table", {}),
+    "up_news": ("a", {"href": re.compile(r"/customernews/")}),
+}
+
+BACKENDS = ("lxml", "html.parser")
+
+# Per-page backend overrides, set from bench-html-parsers.py results when the
+# fastest backend for a page differs from default_backend().
+PAGE_BACKENDS: dict[str, str] = {}
+
+# Containers tried in order for a detail page's body; the first present wins
+MAIN_CONTAINERS = [
+    ("main", {}),
+    (None, {"id": "content_main"}),
+    (None, {"role": "main"}),
+    ("article", {}),
+    (None, {"class": "notification"}),
+]
+CHROME_TAGS = ("script", "style", "noscript", "nav", "header", "footer", "form", "aside", "button")
+BLOCK_TAGS = ("p", "div", "li", "tr", "h1", "h2", "h3", "h4", "h5", "h6", "section", "table", "ul", "ol")
+
+_CLASS_ATTR = re.compile(r"""class\s*=\s*["']([^"']*)["']""", re.IGNORECASE)
+
+
+def available_backends() -> list[str]:
+    """Backends that can run here, fastest first."""
+    found = []
+    for backend in BACKENDS:
+        if backend == "lxml":
+            try:
+                import lxml  # noqa: F401
+            except ImportError:
+                continue
+        found.append(backend)
+    return found
+
+
+@functools.lru_cache(maxsize=None)
+def default_backend() -> str:
+    return available_backends()[0]
+
+
+def parse_html(html: str, page: Optional[str] = None, backend: Optional[str] = None, subtree: bool = True):
+    """Parse html with the page's SoupStrainer (if any) on the chosen backend."""
+    from bs4 import BeautifulSoup, SoupStrainer
+
+    backend = backend or PAGE_BACKENDS.get(page) or default_backend()
+    target = PAGE_TARGETS.get(page) if subtree else None
+    if target is None:
+        return BeautifulSoup(html, backend)
+    name, attrs = target
+    return BeautifulSoup(html, backend, parse_only=SoupStrainer(name, attrs))
+
+
+def main_text(html: str, title: Optional[str] = None, limit: int = 4000) -> str:
+    """Readable text of a detail page's main content, without navigation or scripts.
+
+    A leading line equal to title is dropped, since notice pages usually
+    repeat their heading. Text blocks are kept on separate lines.
+    """
+    soup = parse_html(html)
+    for tag in soup(CHROME_TAGS):
+        tag.decompose()
+    node = None
+    for name, attrs in MAIN_CONTAINERS:
+        node = soup.find(name, attrs) if name else soup.find(attrs=attrs)
+        if node is not None:
+            break
+    node = node or soup.body or soup
+    for br in node.find_all("br"):
+        br.replace_with("\n")
+    for block in node.find_all(BLOCK_TAGS):
+        block.append("\n")
+    lines = [" ".join(line.split()) for line in node.get_text().splitlines()]
+    lines = [line for line in lines if line]
+    if lines and title and lines[0].lower() == title.strip().lower():
+        lines = lines[1:]
+    return "\n".join(lines)[:limit].strip()
+
+
+def iter_elements(html: str, tag: str, class_name: Optional[str] = None) -> Iterator[str]:
+    """Yield the inner HTML of each <tag> (optionally with class_name) block.
+
+    Blocks must not nest, which holds for the listing pages this is used on.
+    Every character is scanned at most twice, so a missing close tag cannot
+    trigger the quadratic backtracking a lazy DOTALL regex would.
+    """
+    lower = html.lower()
+    open_tag = f"<{tag.lower()}"
+    close_tag = f"</{tag.lower()}>"
+    pos = 0
+    while True:
+        start = lower.find(open_tag, pos)
+        if start < 0:
+            return
+        head_end = lower.find(">", start)
+        if head_end < 0:
+            return
+        after = lower[start + len(open_tag):start + len(open_tag) + 1]
+        if not after.isspace() and after != ">":
+            # <articles>, <table-x> etc. — a different tag with the same prefix
+            pos = start + len(open_tag)
+            continue
+        if class_name is not None:
+            m = _CLASS_ATTR.search(html, start, head_end)
+            if not m or class_name.lower() not in m.group(1).lower():
+                pos = head_end + 1
+                continue
+        end = lower.find(close_tag, head_end + 1)
+        if end < 0:
+            return
+        yield html[head_end + 1:end]
+        pos = end + len(close_tag)
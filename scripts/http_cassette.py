@@ -0,0 +1,175 @@
+"""
+Record/replay HTTP cassettes for the scrapers.
+
+install() patches requests' HTTPAdapter.send, so every request made through
+requests goes through the cassette: the HttpClient sessions, bare
+requests.get, and cloudscraper sessions alike. Requests made by other HTTP
+stacks (JobSpy) are not captured.
+
+In record mode each response is saved as <key>.json (status, headers, url,
+and the scraper function that asked for it) plus <key>.body, with the key
+hashed from method, URL and request body. Conditional headers are stripped
+on the way out, so the cassette always holds full bodies. In replay mode
+responses are served from disk and nothing touches the network. A request
+with no exact match falls back to the last recording for the same method,
+host and path; this covers URLs that embed a watermark or today's date.
+A request with no match at all raises requests.ConnectionError, so
+scrapers take their normal offline-failure path.
+
+Usage:
+    cassette = Cassette(Path("scripts/.cassettes/2026-10-16"), "record")
+    cassette.install()
+    ...  # run scrapers
+    cassette.uninstall()
+"""
+
+import hashlib
+import json
+import sys
+import threading
+from pathlib import Path
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+CONDITIONAL_HEADERS = ("If-None-Match", "If-Modified-Since")
+
+
+def _body_bytes(request: requests.PreparedRequest) -> bytes:
+    body = request.body or b""
+    return body.encode() if isinstance(body, str) else body
+
+
+def request_key(request: requests.PreparedRequest) -> str:
+    digest = hashlib.sha1()
+    digest.update(request.method.encode())
+    digest.update(request.url.encode())
+    digest.update(_body_bytes(request))
+    return digest.hexdigest()[:16]
+
+
+def loose_key(request: requests.PreparedRequest) -> str:
+    parts = urlsplit(request.url)
+    return f"{request.method} {parts.netloc}{parts.path}"
+
+
+def _scraper_caller() -> Optional[str]:
+    """Innermost fetch_*/scrape_* function on the stack (the one that wants the page)."""
+    frame = sys._getframe(2)
+    while frame is not None:
+        code = frame.f_code
+        if code.co_name.startswith(("fetch_", "scrape_", "_fetch_")) and "scrape-" in code.co_filename:
+            return code.co_name
+        frame = frame.f_back
+    return None
+
+
+class Cassette:
+    def __init__(self, directory: Path, mode: str) -> None:
+        if mode not in ("record", "replay"):
+            raise ValueError(f"unknown cassette mode: {mode}")
+        self.directory = Path(directory)
+        self.mode = mode
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._original_send = None
+        self._loose: Dict[str, str] = {}
+        if mode == "record":
+            self.directory.mkdir(parents=True, exist_ok=True)
+        elif not self.directory.is_dir():
+            raise FileNotFoundError(f"cassette directory not found: {self.directory}")
+        index = self.directory / "index.json"
+        if index.exists():
+            self._loose = json.loads(index.read_text())
+
+    # --- Patching ---
+
+    def install(self) -> None:
+        cassette = self
+        original = HTTPAdapter.send
+        self._original_send = original
+
+        def send(adapter, request, **kwargs):
+            if cassette.mode == "record":
+                return cassette._record(adapter, original, request, **kwargs)
+            return cassette._replay(request)
+
+        HTTPAdapter.send = send
+
+    def uninstall(self) -> None:
+        if self._original_send is not None:
+            HTTPAdapter.send = self._original_send
+            self._original_send = None
+        if self.mode == "record":
+            self._write_index()
+
+    # --- Record ---
+
+    def _record(self, adapter, original, request, **kwargs):
+        for header in CONDITIONAL_HEADERS:
+            request.headers.pop(header, None)
+        resp = original(adapter, request, **kwargs)
+        key = request_key(request)
+        meta = {
+            "method": request.method,
+            "url": request.url,
+            "status": resp.status_code,
+            "reason": resp.reason,
+            "headers": dict(resp.headers),
+            "encoding": resp.encoding,
+            "caller": _scraper_caller(),
+        }
+        (self.directory / f"{key}.body").write_bytes(resp.content)
+        (self.directory / f"{key}.json").write_text(json.dumps(meta, indent=2))
+        with self._lock:
+            self._loose[loose_key(request)] = key
+            self.hits += 1
+        return resp
+
+    def _write_index(self) -> None:
+        with self._lock:
+            (self.directory / "index.json").write_text(json.dumps(self._loose, indent=2, sort_keys=True))
+
+    # --- Replay ---
+
+    def _replay(self, request: requests.PreparedRequest) -> requests.Response:
+        key = request_key(request)
+        if not (self.directory / f"{key}.json").exists():
+            key = self._loose.get(loose_key(request))
+        if key is None:
+            with self._lock:
+                self.misses += 1
+            raise requests.ConnectionError(f"not in cassette: {request.method} {request.url}", request=request)
+
+        meta = json.loads((self.directory / f"{key}.json").read_text())
+        resp = requests.Response()
+        resp.status_code = meta["status"]
+        resp.reason = meta.get("reason")
+        resp.headers = CaseInsensitiveDict(meta["headers"])
+        # Bodies are stored decoded; drop encodings that would make requests decode them again
+        resp.headers.pop("Content-Encoding", None)
+        resp.encoding = meta.get("encoding")
+        resp.url = request.url
+        resp.request = request
+        resp._content = (self.directory / f"{key}.body").read_bytes()
+        resp._content_consumed = True
+        with self._lock:
+            self.hits += 1
+        return resp
+
+    # --- Corpus ---
+
+    def entries(self, caller: Optional[str] = None) -> list[dict]:
+        """Recorded response metadata, optionally only those fetched by one scraper function."""
+        found = []
+        for path in sorted(self.directory.glob("*.json")):
+            if path.name == "index.json":
+                continue
+            meta = json.loads(path.read_text())
+            if caller is None or meta.get("caller") == caller:
+                found.append(meta)
+        return found
@@ -0,0 +1,93 @@
+"""
+Columnar weekly history for the USDA rail metrics, with vectorized analytics.
+
+MetricHistory holds one metric type as a dense float matrix of shape
+(series, weeks). A series is one railroad x commodity; weeks form a regular
+7-day grid, and missing weeks are NaN. Rows come from the append-only
+usda_history table in the scraper's SQLite cache, already folded to one
+value per railroad, commodity and week. Every statistic is
+computed for all series at once with cumulative sums along the week axis:
+
+  rolling_mean(w)   mean of the last w weeks (needs at least half present)
+  yoy_percent()     change against the same week 52 weeks earlier
+  zscores(w)        deviation from the trailing w weeks before each week,
+                    in standard deviations of that window
+
+Usage:
+    history = MetricHistory.from_rows("TRAIN_SPEED", rows)   # (week, railroad, commodity, value)
+    history.rolling_mean(4)[:, -1]    # latest 4-week average of every series
+"""
+
+from typing import Iterable, List, Tuple
+
+import numpy as np
+
+WEEKS_PER_YEAR = 52
+
+
+def _window_sums(values: np.ndarray, window: int, lag: int = 0) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Per-cell (count, sum, sum of squares) of the window ending lag weeks before each week."""
+    present = ~np.isnan(values)
+    x = np.where(present, values, 0.0)
+    pad = np.zeros((values.shape[0], 1))
+    cums = [np.concatenate([pad, np.cumsum(a, axis=1)], axis=1) for a in (present.astype(float), x, x * x)]
+    end = np.arange(values.shape[1]) + 1 - lag
+    start = np.clip(end - window, 0, None)
+    end = np.clip(end, 0, None)
+    return tuple(c[:, end] - c[:, start] for c in cums)
+
+
+class MetricHistory:
+    def __init__(self, metric_type: str, keys: List[Tuple[str, str]], weeks: np.ndarray, values: np.ndarray) -> None:
+        self.metric_type = metric_type
+        self.keys = keys          # [(railroad, commodity)] per row
+        self.weeks = weeks        # datetime64[D] per column, 7 days apart
+        self.values = values      # float (series, weeks), NaN where missing
+
+    @classmethod
+    def from_rows(cls, metric_type: str, rows: Iterable[tuple]) -> "MetricHistory":
+        """Pivot (week, railroad, commodity, value) rows, one per cell.
+
+        Fold duplicates before pivoting (the scraper reads through
+        usda_weekly_rows); a cell that still repeats keeps the mean.
+        """
+        rows = list(rows)
+        if not rows:
+            return cls(metric_type, [], np.array([], dtype="datetime64[D]"), np.empty((0, 0)))
+        weeks_raw, railroads, commodities, values = zip(*rows)
+        dates = np.array(weeks_raw, dtype="datetime64[D]")
+        start = dates.min()
+        col = ((dates - start) // np.timedelta64(7, "D")).astype(int)
+        n_weeks = int(col.max()) + 1
+
+        pairs = np.array([f"{r}\x1f{c or ''}" for r, c in zip(railroads, commodities)])
+        labels, row = np.unique(pairs, return_inverse=True)
+        sums = np.zeros((len(labels), n_weeks))
+        counts = np.zeros((len(labels), n_weeks))
+        np.add.at(sums, (row, col), np.asarray(values, dtype=float))
+        np.add.at(counts, (row, col), 1.0)
+        with np.errstate(invalid="ignore"):
+            matrix = np.where(counts > 0, sums / np.maximum(counts, 1), np.nan)
+
+        keys = [tuple(label.split("\x1f", 1)) for label in labels]
+        weeks = start + np.arange(n_weeks) * np.timedelta64(7, "D")
+        return cls(metric_type, keys, weeks, matrix)
+
+    def rolling_mean(self, window: int) -> np.ndarray:
+        count, total, _ = _window_sums(self.values, window)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(count >= (window // 2 + 1), total / count, np.nan)
+
+    def yoy_percent(self) -> np.ndarray:
+        prior = np.full_like(self.values, np.nan)
+        if self.values.shape[1] > WEEKS_PER_YEAR:
+            prior[:, WEEKS_PER_YEAR:] = self.values[:, :-WEEKS_PER_YEAR]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(prior != 0, (self.values - prior) / np.abs(prior) * 100, np.nan)
+
+    def zscores(self, window: int, min_weeks: int = 8) -> np.ndarray:
+        count, total, squares = _window_sums(self.values, window, lag=1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = total / count
+            std = np.sqrt(np.maximum(squares / count - mean * mean, 0.0))
+            return np.where((count >= min_weeks) & (std > 0), (self.values - mean) / std, np.nan)
@@ -2,24 +2,60 @@
 Rail industry data scraper.
 Fetches from USDA (Socrata), EIA, FRA, STB, BTS, and FRED.
 Writes to public/industry.json.
+
+Run once (the daily workflow) or with --daemon to poll each source on its
+own adaptive cadence and update the outputs incrementally. --only
+advisories,fuel runs just those sections (or named sources) and merges them
+into the existing file; every section records when it was last scraped.
 """
 
 import csv
+import functools
 import hashlib
 import io
 import json
+import queue
+import random
 import re
-import uuid
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
 import xml.etree.ElementTree as ET
 from datetime import datetime, timedelta, timezone
-from math import floor
+from pathlib import Path
+from urllib.parse import urljoin
 
-import requests
+from geotagger import NAME_TO_CODE, STATE_NAMES, TAGGER_VERSION, Gazetteer, load_gazetteer
+from html_parsing import iter_elements, main_text, parse_html
+from scraper_http import HttpClient, read_prefix, section_end
+from source_health import SourceHealth
+from spatial_index import GridIndex, StatePolygons
 
 # --- Constants ---
 
 NOW_ISO = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.000Z")
 
+SCRIPT_DIR = Path(__file__).parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+OUTPUT = PROJECT_ROOT / "public" / "industry.json"
+SHARD_DIR = PROJECT_ROOT / "public" / "industry"
+CACHE_DB = SCRIPT_DIR / ".industry_cache.db"
+MANIFEST = PROJECT_ROOT / "public" / "industry-manifest.json"
+RUN_HISTORY = SCRIPT_DIR / ".industry_runs.jsonl"
+STATES_GEOJSON = PROJECT_ROOT / "public" / "data" / "us-states.geojson"
+FACILITIES_JSON = PROJECT_ROOT / "public" / "facilities.json"
+
+# Circuit breakers per source and per host, persisted in CACHE_DB, so an
+# upstream that is down costs one probe per run instead of every timeout.
+health = SourceHealth(CACHE_DB)
+
+# One pooled client for every fetcher; validators and bodies for conditional
+# GETs, and the per-host latencies that decide when to hedge, persist in
+# CACHE_DB between runs.
+http = HttpClient(cache_path=CACHE_DB, headers={"User-Agent": "Mozilla/5.0 railhub-scraper"}, breaker=health, hedge=True)
+
 RAILROAD_MAP = {
     "BNSF": "BNSF",
     "BNSF Railway": "BNSF",
@@ -46,8 +82,13 @@ RAILROAD_MAP = {
     "Kansas City Southern": "CPKC",
 }
 
-USDA_BASE = "https://agtransport.usda.gov/resource/{id}.json"
+USDA_BASE = "https://agtransport.usda.gov/resource/{id}.csv"
 
+# Row filters are SoQL so Socrata drops unwanted rows server-side; "select"
+# projects only the columns we read (":id" keys the local history).
+# "aggregate" folds rows that share a week, railroad and commodity: cars on
+# line are reported per car type and summed into the railroad's total; the
+# other datasets have one row per key, so AVG only guards against repeats.
 USDA_DATASETS = [
     {
         "id": "2wy9-nmz4",
@@ -55,7 +96,9 @@ USDA_DATASETS = [
         "unit": "mph",
         "value_field": "mph",
         "commodity_field": "commodity",
-        "filter": None,
+        "select": ["date", "railroad", "mph", "commodity"],
+        "where": None,
+        "aggregate": "AVG",
     },
     {
         "id": "9z94-b4fw",
@@ -63,7 +106,9 @@ USDA_DATASETS = [
         "unit": "hours",
         "value_field": "value",
         "commodity_field": None,
-        "filter": lambda row: not row.get("yard") or row.get("yard") == "System Average",
+        "select": ["date", "railroad", "value"],
+        "where": "(yard IS NULL OR yard = 'System Average')",
+        "aggregate": "AVG",
     },
     {
         "id": "grdc-x6yk",
@@ -71,7 +116,9 @@ USDA_DATASETS = [
         "unit": "cars",
         "value_field": "cars",
         "commodity_field": None,
-        "filter": None,
+        "select": ["date", "railroad", "cars"],
+        "where": None,
+        "aggregate": "SUM",
     },
     {
         "id": "tb7q-kn5i",
@@ -79,15 +126,24 @@ USDA_DATASETS = [
         "unit": "carloads",
         "value_field": "carloads",
         "commodity_field": "commodity",
-        "filter": lambda row: not row.get("type") or row.get("type") == "Originated",
+        "select": ["date", "railroad", "carloads", "commodity"],
+        "where": "(type IS NULL OR type = 'Originated')",
+        "aggregate": "AVG",
     },
 ]
 
+USDA_PAGE_SIZE = 50000   # rows stream off the socket, so pages only bound a single request
+USDA_BATCH_SIZE = 5000   # rows per executemany while a page streams in
+USDA_BACKFILL_YEARS = 3   # first sync (no watermark) starts this far back
+USDA_OUTPUT_WEEKS = 8     # report weeks per dataset written to industry.json
+
 
 # --- Helpers ---
 
-def short_uuid() -> str:
-    return str(uuid.uuid4()).replace("-", "")[:12]
+def stable_id(prefix: str, *parts) -> str:
+    """Deterministic record id derived from the record's source identity."""
+    key = "|".join(str(p) for p in parts)
+    return f"{prefix}-{hashlib.sha1(key.encode()).hexdigest()[:12]}"
 
 
 def slugify(text: str) -> str:
@@ -117,156 +173,365 @@ def safe_float(val):
         return None
 
 
+def socrata_rows(resp, source: str):
+    """Yield the rows of a Socrata .csv response as {column: text} dicts, parsed as the body streams in.
+
+    Empty cells are dropped, so a row looks like the same row from the
+    .json endpoint (which omits nulls) and the `row.get(x) or ...`
+    fallbacks behave the same.
+    """
+    reader = csv.reader(http.iter_lines(resp, source=source))
+    header = next(reader, None)
+    for values in reader:
+        if values:
+            yield {k: v for k, v in zip(header, values) if v != ""}
+
+
+class SourceCancelled(BaseException):
+    """Raised in a source's thread once run_sources has given up on it.
+
+    A BaseException, so the fetchers' own `except Exception` handlers do
+    not swallow it and carry on writing.
+    """
+
+
+_source_thread = threading.local()
+
+
+def check_cancelled() -> None:
+    """Stop an abandoned source before it writes to a store; call ahead of every store write.
+
+    run_sources stops waiting for a source at its timeout but cannot kill
+    the thread, which would otherwise keep writing to CACHE_DB while the
+    main thread exports.
+    """
+    cancel = getattr(_source_thread, "cancel", None)
+    if cancel is not None and cancel.is_set():
+        raise SourceCancelled()
+
+
+def batched(rows, size: int):
+    """Group an iterable into lists of at most size items."""
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
 # --- Source 1: USDA Rail Metrics ---
 
-def fetch_usda_metrics() -> list[dict]:
-    print("[USDA] Fetching rail metrics from 4 datasets...")
-    records = []
+def init_usda_store(db_path: Path) -> sqlite3.Connection:
+    conn = sqlite3.connect(db_path)
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS usda_watermarks "
+        "(dataset TEXT PRIMARY KEY, max_date TEXT, synced_at TEXT)"
+    )
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS usda_history "
+        "(row_id TEXT, dataset TEXT, report_week TEXT, railroad TEXT, commodity TEXT, value REAL, "
+        "PRIMARY KEY (dataset, row_id))"
+    )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS usda_history_week ON usda_history (dataset, report_week)"
+    )
+    conn.commit()
+    return conn
 
-    for ds in USDA_DATASETS:
-        url = USDA_BASE.format(id=ds["id"])
-        params = {"$limit": 100, "$order": "date DESC"}
-        try:
-            resp = requests.get(url, params=params, timeout=30)
-            resp.raise_for_status()
-            rows = resp.json()
-        except Exception as exc:
-            print(f"  [USDA] ERROR fetching {ds['id']}: {exc}")
-            continue
 
-        kept = 0
-        for row in rows:
-            # Apply row-level filter
-            if ds["filter"] and not ds["filter"](row):
+def _usda_rows(ds: dict, since: str):
+    """Yield rows newer than or equal to `since`, filtered and projected server-side.
+
+    Pages are streamed as CSV and parsed row by row, so memory stays flat
+    however large the backfill. Falls back to unprojected rows if Socrata
+    rejects the $select (e.g. a renamed column), so a schema drift costs
+    bandwidth rather than data.
+    """
+    url = USDA_BASE.format(id=ds["id"])
+    where = f"date >= '{since}'"
+    if ds["where"]:
+        where += f" AND {ds['where']}"
+    params = {"$where": where, "$order": ":id", "$limit": USDA_PAGE_SIZE}
+    if ds["select"]:
+        params["$select"] = ",".join([":id"] + ds["select"])
+
+    offset = 0
+    while True:
+        params["$offset"] = offset
+        resp = http.get(url, source="usda", params=params, stream=True, timeout=60)
+        if resp.status_code == 400 and "$select" in params:
+            resp.close()
+            print(f"  [USDA] {ds['id']}: $select rejected, retrying unprojected")
+            del params["$select"]
+            params["$$exclude_system_fields"] = "false"
+            continue
+        resp.raise_for_status()
+        count = 0
+        for row in socrata_rows(resp, "usda"):
+            count += 1
+            yield row
+        if count < USDA_PAGE_SIZE:
+            return
+        offset += USDA_PAGE_SIZE
+
+
+def sync_usda_dataset(conn: sqlite3.Connection, ds: dict) -> tuple[int, int]:
+    """Append new weeks for one dataset to the local history. Returns (fetched, stored)."""
+    row = conn.execute(
+        "SELECT max_date FROM usda_watermarks WHERE dataset = ?", (ds["id"],)
+    ).fetchone()
+    if row and row[0]:
+        # Re-read the watermark week itself: Socrata can publish a week's rows in batches
+        since = row[0]
+    else:
+        start = datetime.now(timezone.utc).date().replace(month=1, day=1)
+        since = start.replace(year=start.year - USDA_BACKFILL_YEARS).isoformat() + "T00:00:00.000"
+
+    fetched = stored = 0
+    max_date = since
+    for rows in batched(_usda_rows(ds, since), USDA_BATCH_SIZE):
+        batch = []
+        for r in rows:
+            fetched += 1
+            value = safe_float(r.get(ds["value_field"]))
+            date_raw = r.get("date") or r.get("week_of") or ""
+            if value is None or not date_raw:
                 continue
+            railroad = normalize_railroad(r.get("railroad") or r.get("reporting_railroad") or "")
+            commodity = (r.get(ds["commodity_field"]) or "") if ds["commodity_field"] else ""
+            row_id = r.get(":id") or hash_string(json.dumps(r, sort_keys=True))
+            batch.append((row_id, ds["id"], date_raw[:10], railroad, commodity, value))
+            max_date = max(max_date, date_raw)
+        check_cancelled()
+        conn.executemany(
+            "INSERT OR REPLACE INTO usda_history (row_id, dataset, report_week, railroad, commodity, value) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            batch,
+        )
+        stored += len(batch)
+
+    check_cancelled()
+    conn.execute(
+        "INSERT OR REPLACE INTO usda_watermarks (dataset, max_date, synced_at) VALUES (?, ?, ?)",
+        (ds["id"], max_date, NOW_ISO),
+    )
+    conn.commit()
+    return fetched, stored
 
-            railroad_raw = row.get("railroad") or row.get("reporting_railroad") or ""
-            railroad = normalize_railroad(railroad_raw)
 
-            raw_value = row.get(ds["value_field"])
-            value = safe_float(raw_value)
-            if value is None:
-                continue
+def usda_weekly_rows(conn: sqlite3.Connection, ds: dict, since: str = "") -> list[tuple]:
+    """(report_week, railroad, commodity, value) for one dataset from `since` on, one row per key.
 
-            date_raw = row.get("date") or row.get("week_of") or ""
-            # Normalize to ISO 8601
-            if date_raw:
-                date_raw = date_raw[:10]  # take YYYY-MM-DD
-                report_week = f"{date_raw}T00:00:00.000Z"
-            else:
-                report_week = NOW_ISO
+    Rows sharing a week, railroad and commodity are folded with the
+    dataset's "aggregate", so every reader sees the same value per key.
+    """
+    return conn.execute(
+        f"SELECT report_week, railroad, commodity, {ds['aggregate']}(value) FROM usda_history "
+        "WHERE dataset = ? AND report_week >= ? GROUP BY report_week, railroad, commodity "
+        "ORDER BY report_week DESC, railroad, commodity",
+        (ds["id"], since),
+    ).fetchall()
 
-            commodity = ""
-            if ds["commodity_field"]:
-                commodity = row.get(ds["commodity_field"]) or ""
 
-            records.append({
-                "id": f"metric-{short_uuid()}",
-                "railroad": railroad,
-                "metricType": ds["metricType"],
-                "value": value,
-                "unit": ds["unit"],
-                "reportWeek": report_week,
-                "commodity": commodity,
-                "createdAt": NOW_ISO,
-            })
-            kept += 1
+def fetch_usda_metrics(full_sync: bool = False) -> list[dict]:
+    """Incrementally sync the USDA datasets into the local history, then emit recent weeks.
+
+    Each dataset keeps a high-watermark on `date`; a daily run only asks
+    Socrata for rows at or after it. full_sync drops the watermarks and
+    re-pulls the backfill window.
+    """
+    print(f"[USDA] Syncing rail metrics from {len(USDA_DATASETS)} datasets...")
+    conn = init_usda_store(CACHE_DB)
+    if full_sync:
+        conn.execute("DELETE FROM usda_watermarks")
+        conn.commit()
 
-        print(f"  [USDA] {ds['metricType']}: {kept} records from {len(rows)} rows")
+    records = []
+    try:
+        for ds in USDA_DATASETS:
+            try:
+                fetched, stored = sync_usda_dataset(conn, ds)
+            except Exception as exc:
+                print(f"  [USDA] ERROR syncing {ds['id']}: {exc}")
+            else:
+                print(f"  [USDA] {ds['metricType']}: {stored} rows stored from {fetched} fetched")
+
+            weeks = [w for (w,) in conn.execute(
+                "SELECT DISTINCT report_week FROM usda_history WHERE dataset = ? "
+                "ORDER BY report_week DESC LIMIT ?",
+                (ds["id"], USDA_OUTPUT_WEEKS),
+            )]
+            if not weeks:
+                continue
+            for report_week, railroad, commodity, value in usda_weekly_rows(conn, ds, weeks[-1]):
+                records.append({
+                    "id": stable_id("metric", ds["id"], report_week, railroad, commodity),
+                    "railroad": railroad,
+                    "metricType": ds["metricType"],
+                    "value": value,
+                    "unit": ds["unit"],
+                    "reportWeek": f"{report_week}T00:00:00.000Z",
+                    "commodity": commodity,
+                    "createdAt": NOW_ISO,
+                })
+    finally:
+        conn.close()
 
     print(f"[USDA] Total: {len(records)} metric records")
     return records
 
 
+# Analytics over the full USDA history (metric-analytics.json)
+METRIC_ROLLING_WEEKS = 4
+METRIC_Z_WEEKS = 26
+METRIC_ANOMALY_Z = 2.5
+METRIC_SPARK_WEEKS = 26
+
+
+def _compact(values) -> list:
+    return [None if v != v else round(float(v), 2) for v in values]
+
+
+def build_metric_analytics(db_path: Path = None) -> dict:
+    """Rolling averages, YoY deltas and z-score anomalies for every USDA series.
+
+    Each dataset's history is pivoted into a (series x week) matrix, and
+    every statistic is computed for all of its series at once. Per series
+    the output keeps the last METRIC_SPARK_WEEKS weeks of values and
+    rolling averages, plus the latest week's figures. Keys match
+    metric_key(). "anomalies" lists the latest-week outliers, largest first.
+    """
+    db_path = db_path or CACHE_DB
+    import numpy as np
+    from metric_history import MetricHistory
+
+    conn = init_usda_store(db_path)
+    try:
+        by_type = {
+            ds["metricType"]: MetricHistory.from_rows(ds["metricType"], usda_weekly_rows(conn, ds))
+            for ds in USDA_DATASETS
+        }
+    finally:
+        conn.close()
+
+    series, anomalies = {}, []
+    for metric_type, history in by_type.items():
+        if not history.keys:
+            continue
+        rolling = history.rolling_mean(METRIC_ROLLING_WEEKS)
+        yoy = history.yoy_percent()
+        z = history.zscores(METRIC_Z_WEEKS)
+        spark = slice(-METRIC_SPARK_WEEKS, None)
+        start = str(history.weeks[spark][0])
+        latest_week = str(history.weeks[-1])
+        flagged = np.abs(np.nan_to_num(z)) >= METRIC_ANOMALY_Z
+        for i, (railroad, commodity) in enumerate(history.keys):
+            key = metric_key({"railroad": railroad, "metricType": metric_type, "commodity": commodity})
+            latest_z = _compact(z[i, -1:])[0]
+            series[key] = {
+                "start": start,
+                "values": _compact(history.values[i, spark]),
+                "rolling": _compact(rolling[i, spark]),
+                "anomalyWeeks": [int(w) for w in np.flatnonzero(flagged[i, spark])],
+                "rollingAvg": _compact(rolling[i, -1:])[0],
+                "yoyPercent": _compact(yoy[i, -1:])[0],
+                "zScore": latest_z,
+                "anomaly": bool(flagged[i, -1]),
+            }
+            if flagged[i, -1]:
+                anomalies.append({
+                    "key": key, "railroad": railroad, "metricType": metric_type, "commodity": commodity,
+                    "reportWeek": latest_week, "value": _compact(history.values[i, -1:])[0], "zScore": latest_z,
+                })
+    anomalies.sort(key=lambda a: -abs(a["zScore"]))
+    return {
+        "rollingWeeks": METRIC_ROLLING_WEEKS,
+        "zWeeks": METRIC_Z_WEEKS,
+        "anomalyZ": METRIC_ANOMALY_Z,
+        "series": dict(sorted(series.items())),
+        "anomalies": anomalies,
+    }
+
+
+def write_metric_analytics(shard_dir: Path = None, db_path: Path = None) -> int:
+    """Write metric-analytics.json. Skipped while the history is empty or numpy is missing."""
+    shard_dir = shard_dir or SHARD_DIR
+    db_path = db_path or CACHE_DB
+    try:
+        analytics = build_metric_analytics(db_path)
+    except ImportError as exc:
+        print(f"  [USDA] analytics skipped: {exc}")
+        return 0
+    if not analytics["series"]:
+        return 0
+    return int(_write_json(shard_dir / "metric-analytics.json", analytics))
+
+
 # --- Source 2: EIA Fuel Surcharges ---
 
-def _ns_carload(diesel: float) -> float:
-    if diesel <= 2.00: return 0.0
-    if diesel <= 2.50: return 4.0
-    if diesel <= 3.00: return 8.0
-    if diesel <= 3.50: return 13.0
-    if diesel <= 4.00: return 18.0
-    if diesel <= 4.50: return 24.0
-    return 30.0
-
-def _ns_intermodal(diesel: float) -> float:
-    if diesel <= 2.00: return 0.0
-    if diesel <= 2.50: return 15.0
-    if diesel <= 3.00: return 25.0
-    if diesel <= 3.50: return 35.0
-    if diesel <= 4.00: return 40.0
-    return 45.0
-
-def _up_carload(diesel: float) -> float:
-    if diesel < 1.35: return 0.0
-    return 1.5 + floor((diesel - 1.35) / 0.05) * 0.5
-
-def _up_intermodal(diesel: float) -> float:
-    if diesel < 1.35: return 0.0
-    return 2.0 + floor((diesel - 1.35) / 0.05) * 0.6
-
-def _bnsf_carload(diesel: float) -> float:
-    if diesel <= 2.50: return 0.0
-    if diesel <= 3.00: return 6.0
-    if diesel <= 3.50: return 12.0
-    if diesel <= 4.00: return 18.0
-    if diesel <= 4.50: return 24.0
-    return 30.0
-
-def _bnsf_intermodal(diesel: float) -> float:
-    if diesel <= 2.50: return 0.0
-    if diesel <= 3.00: return 10.0
-    if diesel <= 3.50: return 20.0
-    if diesel <= 4.00: return 30.0
-    if diesel <= 4.50: return 38.0
-    return 44.0
-
-def _csx_carload(diesel: float) -> float:
-    if diesel <= 2.00: return 0.0
-    if diesel <= 2.50: return 5.0
-    if diesel <= 3.00: return 9.0
-    if diesel <= 3.50: return 13.0
-    if diesel <= 4.00: return 18.0
-    if diesel <= 4.50: return 24.0
-    return 30.0
-
-def _csx_intermodal(diesel: float) -> float:
-    if diesel <= 2.00: return 0.0
-    if diesel <= 2.50: return 12.0
-    if diesel <= 3.00: return 22.0
-    if diesel <= 3.50: return 32.0
-    if diesel <= 4.00: return 38.0
-    return 44.0
-
-SURCHARGE_FORMULAS = [
-    ("NS",   "Carload",    _ns_carload),
-    ("NS",   "Intermodal", _ns_intermodal),
-    ("UP",   "Carload",    _up_carload),
-    ("UP",   "Intermodal", _up_intermodal),
-    ("BNSF", "Carload",    _bnsf_carload),
-    ("BNSF", "Intermodal", _bnsf_intermodal),
-    ("CSX",  "Carload",    _csx_carload),
-    ("CSX",  "Intermodal", _csx_intermodal),
+# Each schedule is data, not code. "step" schedules charge rates[i] where i is
+# the number of breakpoints strictly below the price (upper bounds are
+# inclusive). "linear" schedules start at `base` once the price reaches
+# `threshold` and add `step` per full `increment` above it.
+SURCHARGE_SCHEDULES = [
+    {"railroad": "NS", "trafficType": "Carload", "kind": "step",
+     "breakpoints": [2.00, 2.50, 3.00, 3.50, 4.00, 4.50], "rates": [0.0, 4.0, 8.0, 13.0, 18.0, 24.0, 30.0]},
+    {"railroad": "NS", "trafficType": "Intermodal", "kind": "step",
+     "breakpoints": [2.00, 2.50, 3.00, 3.50, 4.00], "rates": [0.0, 15.0, 25.0, 35.0, 40.0, 45.0]},
+    {"railroad": "UP", "trafficType": "Carload", "kind": "linear",
+     "threshold": 1.35, "increment": 0.05, "base": 1.5, "step": 0.5},
+    {"railroad": "UP", "trafficType": "Intermodal", "kind": "linear",
+     "threshold": 1.35, "increment": 0.05, "base": 2.0, "step": 0.6},
+    {"railroad": "BNSF", "trafficType": "Carload", "kind": "step",
+     "breakpoints": [2.50, 3.00, 3.50, 4.00, 4.50], "rates": [0.0, 6.0, 12.0, 18.0, 24.0, 30.0]},
+    {"railroad": "BNSF", "trafficType": "Intermodal", "kind": "step",
+     "breakpoints": [2.50, 3.00, 3.50, 4.00, 4.50], "rates": [0.0, 10.0, 20.0, 30.0, 38.0, 44.0]},
+    {"railroad": "CSX", "trafficType": "Carload", "kind": "step",
+     "breakpoints": [2.00, 2.50, 3.00, 3.50, 4.00, 4.50], "rates": [0.0, 5.0, 9.0, 13.0, 18.0, 24.0, 30.0]},
+    {"railroad": "CSX", "trafficType": "Intermodal", "kind": "step",
+     "breakpoints": [2.00, 2.50, 3.00, 3.50, 4.00], "rates": [0.0, 12.0, 22.0, 32.0, 38.0, 44.0]},
 ]
 
+# Weekly U.S. on-highway diesel retail price (USD/gal), mirrored by FRED from EIA
+DIESEL_SERIES = "GASDESW"
+FUEL_HISTORY_YEARS = 2
 
-def fetch_eia_fuel_surcharges() -> list[dict]:
-    print("[EIA] Fetching diesel price from RSS feed...")
+
+def surcharge_rates(schedule: dict, prices):
+    """Evaluate one schedule over an array of diesel prices in a single vectorized pass."""
+    import numpy as np
+
+    prices = np.asarray(prices, dtype=float)
+    if schedule["kind"] == "step":
+        idx = np.searchsorted(schedule["breakpoints"], prices, side="left")
+        return np.asarray(schedule["rates"])[idx]
+    steps = np.floor((prices - schedule["threshold"]) / schedule["increment"])
+    return np.where(
+        prices < schedule["threshold"], 0.0, schedule["base"] + steps * schedule["step"]
+    )
+
+
+def _fetch_eia_rss_price():
+    """Current weekly U.S. diesel price from the EIA RSS feed, or None."""
     url = "https://www.eia.gov/petroleum/gasdiesel/includes/gas_diesel_rss.xml"
     try:
-        resp = requests.get(url, timeout=30)
+        resp = http.get(url, source="eia", conditional=True, timeout=30)
         resp.raise_for_status()
     except Exception as exc:
         print(f"  [EIA] ERROR fetching RSS: {exc}")
-        return []
+        return None
+    if resp.not_modified:
+        print("  [EIA] RSS unchanged since last run (304)")
 
     try:
         root = ET.fromstring(resp.text)
     except ET.ParseError as exc:
         print(f"  [EIA] XML parse error: {exc}")
-        return []
+        return None
 
-    diesel_price = None
     for item in root.iter("item"):
         desc_el = item.find("description")
         if desc_el is None or desc_el.text is None:
@@ -277,28 +542,48 @@ def fetch_eia_fuel_surcharges() -> list[dict]:
             if match:
                 candidate = float(match.group(1))
                 if 1.5 <= candidate <= 8.0:
-                    diesel_price = candidate
-                    break
+                    return candidate
+    return None
 
-    if diesel_price is None:
+
+def fetch_eia_fuel_surcharges() -> list[dict]:
+    """Weekly surcharge timeline per railroad and traffic type.
+
+    The historical diesel series comes from FRED; the current week is taken
+    from the EIA RSS feed, which publishes first. Every schedule is then
+    evaluated over the whole series at once. Historical weeks use today's
+    schedules, so they show what each carrier's current table would charge.
+    """
+    print("[EIA] Fetching diesel price series...")
+    start = datetime.now(timezone.utc).date().replace(month=1, day=1)
+    start = start.replace(year=start.year - FUEL_HISTORY_YEARS)
+    series = dict(_fetch_fred_rows(DIESEL_SERIES, start.isoformat(), source="eia"))
+
+    diesel_price = _fetch_eia_rss_price()
+    if diesel_price is not None:
+        print(f"  [EIA] Diesel price: ${diesel_price:.3f}")
+        series[current_monday_iso()[:10]] = diesel_price
+    elif not series:
         print("  [EIA] Could not extract a valid diesel price from RSS")
         return []
 
-    print(f"  [EIA] Diesel price: ${diesel_price:.3f}")
+    weeks = sorted(series)
+    prices = [series[w] for w in weeks]
+    print(f"  [EIA] {len(weeks)} weekly prices from {weeks[0]} to {weeks[-1]}")
 
-    effective_date = current_monday_iso()
     records = []
-    for railroad, traffic_type, formula in SURCHARGE_FORMULAS:
-        rate = formula(diesel_price)
-        records.append({
-            "id": f"fs-{short_uuid()}",
-            "railroad": railroad,
-            "effectiveDate": effective_date,
-            "fuelPrice": diesel_price,
-            "surchargeRate": round(rate, 4),
-            "trafficType": traffic_type,
-            "createdAt": NOW_ISO,
-        })
+    for schedule in SURCHARGE_SCHEDULES:
+        rates = surcharge_rates(schedule, prices)
+        for week, price, rate in zip(weeks, prices, rates):
+            records.append({
+                "id": stable_id("fs", schedule["railroad"], schedule["trafficType"], week),
+                "railroad": schedule["railroad"],
+                "effectiveDate": f"{week}T00:00:00.000Z",
+                "fuelPrice": price,
+                "surchargeRate": round(float(rate), 4),
+                "trafficType": schedule["trafficType"],
+                "createdAt": NOW_ISO,
+            })
 
     print(f"[EIA] Total: {len(records)} fuel surcharge records")
     return records
@@ -306,13 +591,6 @@ def fetch_eia_fuel_surcharges() -> list[dict]:
 
 # --- Source 3: Service Advisories (BNSF + CSX) ---
 
-US_STATES = {
-    'AL','AK','AZ','AR','CA','CO','CT','DE','FL','GA','HI','ID','IL','IN','IA',
-    'KS','KY','LA','ME','MD','MA','MI','MN','MS','MO','MT','NE','NV','NH','NJ',
-    'NM','NY','NC','ND','OH','OK','OR','PA','RI','SC','SD','TN','TX','UT','VT',
-    'VA','WA','WV','WI','WY',
-}
-
 ADVISORY_TYPE_KEYWORDS = {
     "EMBARGO": ["embargo"],
     "WEATHER_ADVISORY": ["weather", "storm", "flood", "hurricane", "winter", "ice", "tornado"],
@@ -328,17 +606,6 @@ def classify_advisory(title: str) -> str:
     return "SERVICE_ALERT"
 
 
-def extract_area(title: str):
-    import re as _re
-    m = _re.search(r'\b([A-Z]{2})\b', title)
-    if m and m.group(1) in US_STATES:
-        return m.group(1)
-    for region in ['Midwest', 'Southwest', 'Southeast', 'Northeast', 'Northwest', 'Pacific', 'Gulf', 'Central']:
-        if region in title:
-            return region
-    return None
-
-
 def hash_string(s: str) -> str:
     return hashlib.md5(s.encode()).hexdigest()[:12]
 
@@ -360,20 +627,133 @@ def _parse_date(text):
     return None
 
 
+# Detail pages: listing pages only carry titles, so a notice's own page
+# supplies its description. Parsed bodies are cached in CACHE_DB by URL,
+# together with the listing title they were fetched for and a hash of the raw
+# page. A notice is fetched only when it is new, when its listing entry
+# changed, or when its copy is older than DETAIL_REVALIDATE_DAYS. The last
+# case is a conditional GET, and a page whose hash is unchanged is not
+# parsed again. Requests run on a small pool with at most DETAIL_HOST_LIMIT
+# in flight per host.
+
+DETAIL_WORKERS = 6
+DETAIL_HOST_LIMIT = 2
+DETAIL_REVALIDATE_DAYS = 7
+DETAIL_MAX_FETCHES = 40   # per source and run; the rest keep their title until the next run
+
+
+def init_detail_store(db_path: Path) -> sqlite3.Connection:
+    conn = sqlite3.connect(db_path)
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS advisory_details "
+        "(url TEXT PRIMARY KEY, listing_hash TEXT, content_hash TEXT, text TEXT, fetched_at TEXT)"
+    )
+    conn.commit()
+    return conn
+
+
+def _fetch_detail(url: str, source: str) -> str:
+    resp = http.get(url, source=source, conditional=True, timeout=30)
+    resp.raise_for_status()
+    return resp.text
+
+
+def fill_descriptions(records: list[dict], source: str, fetch=None) -> None:
+    """Replace title-only descriptions with the body of each record's sourceUrl page.
+
+    fetch(url) -> html defaults to a conditional GET through http; CSX
+    passes its Cloudflare solver. Stale pages left out by DETAIL_MAX_FETCHES,
+    or whose refetch fails, keep their cached text. A cached entry whose
+    listing title changed is dropped instead, so until it is fetched again
+    the record falls back to its title, like a page never fetched.
+    """
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+    from urllib.parse import urlsplit
+
+    todo = [r for r in records if r.get("sourceUrl") and r["description"] == r["title"]]
+    if not todo:
+        return
+    fetch = fetch or (lambda url: _fetch_detail(url, source))
+    cutoff = (datetime.now(timezone.utc) - timedelta(days=DETAIL_REVALIDATE_DAYS)).strftime("%Y-%m-%dT%H:%M:%S.000Z")
+
+    conn = init_detail_store(CACHE_DB)
+    try:
+        urls = sorted({r["sourceUrl"] for r in todo})
+        cached = {}
+        for i in range(0, len(urls), 500):
+            chunk = urls[i:i + 500]
+            cached.update((row[0], row[1:]) for row in conn.execute(
+                f"SELECT url, listing_hash, content_hash, text, fetched_at FROM advisory_details "
+                f"WHERE url IN ({','.join('?' * len(chunk))})", chunk,
+            ))
+
+        texts, need, changed = {}, {}, set()
+        for r in todo:
+            url, listing_hash = r["sourceUrl"], hash_string(r["title"])
+            hit = cached.get(url)
+            if hit and hit[0] != listing_hash:
+                changed.add(url)
+            if hit and hit[0] == listing_hash and hit[3] >= cutoff:
+                texts[url] = hit[2]
+            elif url not in need and len(need) < DETAIL_MAX_FETCHES:
+                need[url] = (listing_hash, r["title"])
+
+        host_slots = {urlsplit(url).netloc: threading.BoundedSemaphore(DETAIL_HOST_LIMIT) for url in need}
+
+        def work(url: str) -> tuple:
+            with host_slots[urlsplit(url).netloc]:
+                html = fetch(url)
+            if not html:
+                raise ValueError("empty page")
+            digest = hashlib.sha1(html.encode("utf-8", "replace")).hexdigest()
+            hit = cached.get(url)
+            reuse = hit and url not in changed and hit[1] == digest
+            text = hit[2] if reuse else main_text(html, title=need[url][1])
+            return url, digest, text
+
+        rows, failed = [], 0
+        with ThreadPoolExecutor(max_workers=DETAIL_WORKERS) as pool:
+            for future in as_completed([pool.submit(work, url) for url in need]):
+                try:
+                    url, digest, text = future.result()
+                except Exception:
+                    failed += 1
+                    continue
+                texts[url] = text
+                rows.append((url, need[url][0], digest, text, NOW_ISO))
+        for url, hit in cached.items():
+            if url not in changed:
+                texts.setdefault(url, hit[2])
+        check_cancelled()
+        conn.executemany("DELETE FROM advisory_details WHERE url = ?", [(url,) for url in changed])
+        conn.executemany(
+            "INSERT OR REPLACE INTO advisory_details (url, listing_hash, content_hash, text, fetched_at) "
+            "VALUES (?, ?, ?, ?, ?)",
+            rows,
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+    for r in todo:
+        if texts.get(r["sourceUrl"]):
+            r["description"] = texts[r["sourceUrl"]]
+    print(f"  [{source.upper()}] details: {len(need) - failed} fetched, {len(todo) - len(need)} cached, {failed} failed")
+
+
 def fetch_bnsf_advisories() -> list[dict]:
     """Scrape BNSF customer notifications with dates from listing page."""
     print("[BNSF Advisory] Fetching customer notifications...")
     url = "https://www.bnsf.com/news-media/customer-notifications.html"
     try:
-        resp = requests.get(url, headers={"User-Agent": "Mozilla/5.0 railhub-scraper"}, timeout=30)
+        resp = http.get(url, source="bnsf", conditional=True, timeout=30)
         resp.raise_for_status()
         html = resp.text
     except Exception as exc:
         print(f"  [BNSF Advisory] ERROR: {exc}")
         return []
 
-    from bs4 import BeautifulSoup
-    soup = BeautifulSoup(html, "html.parser")
+    soup = parse_html(html, "bnsf")
 
     advisories = []
     seen = set()
@@ -411,82 +791,232 @@ def fetch_bnsf_advisories() -> list[dict]:
         date_str = _parse_date(date_el.get_text(strip=True)) if date_el else None
 
         advisories.append({
-            "id": f"adv-{short_uuid()}",
+            "id": stable_id("adv", f"bnsf-{key}"),
             "externalId": f"bnsf-{key}",
             "slug": slugify(f"bnsf-{title}"),
             "railroad": "BNSF",
-            "advisoryType": classify_advisory(title),
+            "advisoryType": None,
             "title": title,
             "description": title,
-            "affectedArea": extract_area(title),
+            "affectedArea": None,
             "isActive": True,
-            "issuedAt": f"{date_str}T00:00:00.000Z" if date_str else NOW_ISO,
+            "issuedAt": f"{date_str}T00:00:00.000Z" if date_str else None,
             "expiresAt": None,
-            "createdAt": NOW_ISO,
+            "sourceUrl": urljoin(url, href),
         })
 
+    fill_descriptions(advisories, "bnsf")
     print(f"[BNSF Advisory] Found {len(advisories)} notifications")
     return advisories
 
 
 
-def _fetch_csx_page(url: str) -> str:
-    """Fetch a CSX page, bypassing Cloudflare.
+# --- Cloudflare challenge solver (CSX, UP) ---
 
-    Strategy: cloudscraper first (works locally / residential IPs),
-    then FlareSolverr (works in CI / datacenter IPs).
+class ChallengeSolver:
+    """Shared Cloudflare bypass for every CSX and UP page in a run.
+
+    Per host it keeps one warmed cloudscraper session and one persistent
+    FlareSolverr browser session (sessions.create), so a challenge is solved
+    at most once. Clearance cookies and the user agent from a FlareSolverr
+    solve are copied into the host's scraper session, and later pages are
+    plain HTTP requests. Solve time and fetch time are tracked separately
+    per source. Each target host has a circuit in health. While it is open,
+    pages come back empty at once and no solve is attempted.
+
+    The FlareSolverr endpoint comes from FLARESOLVERR_URL, so a local
+    stand-in server can take its place.
     """
-    # --- Try cloudscraper ---
-    try:
-        import cloudscraper
-        scraper = cloudscraper.create_scraper(
-            browser={"browser": "chrome", "platform": "linux", "desktop": True},
-            delay=2,
-        )
-        resp = scraper.get(url, timeout=30)
-        resp.raise_for_status()
-        if "Attention Required" not in resp.text and len(resp.text) > 10000:
-            print(f"  [CSX] cloudscraper OK: {len(resp.text)} chars")
-            return resp.text
-        print("  [CSX] cloudscraper got Cloudflare challenge, trying FlareSolverr...")
-    except Exception as exc:
-        print(f"  [CSX] cloudscraper failed ({exc}), trying FlareSolverr...")
 
-    # --- Fallback: FlareSolverr ---
-    import os
-    flare_url = os.environ.get("FLARESOLVERR_URL", "http://localhost:8191/v1")
-    try:
-        resp = requests.post(
-            flare_url,
+    def __init__(self, flare_url: str = None) -> None:
+        import os
+
+        self.flare_url = flare_url or os.environ.get("FLARESOLVERR_URL", "http://localhost:8191/v1")
+        self._scrapers = {}
+        self._flare_sessions = {}
+        self._cleared = set()
+        self._host_locks = {}
+        self._lock = threading.Lock()
+        self._timings = {}
+        self._failures = {}
+
+    def _host_lock(self, host: str) -> threading.Lock:
+        with self._lock:
+            return self._host_locks.setdefault(host, threading.Lock())
+
+    def _time(self, source: str, kind: str, seconds: float) -> None:
+        with self._lock:
+            t = self._timings.setdefault(source, {"solveCount": 0, "solveSeconds": 0.0, "fetchCount": 0, "fetchSeconds": 0.0})
+            t[kind + "Count"] += 1
+            t[kind + "Seconds"] += seconds
+
+    def timings(self, source: str) -> dict:
+        with self._lock:
+            return dict(self._timings.get(source, {}))
+
+    def _failed(self, source: str) -> None:
+        with self._lock:
+            self._failures[source] = self._failures.get(source, 0) + 1
+
+    def failures(self, source: str) -> int:
+        """Pages this source could not get (solve failures and open circuits)."""
+        with self._lock:
+            return self._failures.get(source, 0)
+
+    def _scraper(self, host: str):
+        """The host's pooled cloudscraper session (plain requests if cloudscraper is missing)."""
+        scraper = self._scrapers.get(host)
+        if scraper is None:
+            try:
+                import cloudscraper
+                scraper = cloudscraper.create_scraper(
+                    browser={"browser": "chrome", "platform": "linux", "desktop": True},
+                    delay=2,
+                )
+            except ImportError:
+                import requests
+                scraper = requests.Session()
+            self._scrapers[host] = scraper
+        return scraper
+
+    def _flare(self, payload: dict, source: str, timeout: int = 120) -> dict:
+        resp = http.post(
+            self.flare_url,
+            source=source,
+            retries=0,
             headers={"Content-Type": "application/json"},
-            json={"cmd": "request.get", "url": url, "maxTimeout": 60000},
-            timeout=120,
+            json=payload,
+            timeout=timeout,
         )
-        data = resp.json()
-        if data.get("status") == "ok":
-            html = data["solution"]["response"]
-            print(f"  [CSX] FlareSolverr OK: {len(html)} chars")
-            return html
-        print(f"  [CSX] FlareSolverr error: {data.get('message', 'unknown')}")
-    except Exception as exc:
-        print(f"  [CSX] FlareSolverr unavailable ({exc})")
+        return resp.json()
+
+    def _flare_session(self, host: str, source: str):
+        session_id = self._flare_sessions.get(host)
+        if session_id is None:
+            data = self._flare({"cmd": "sessions.create"}, source, timeout=60)
+            if data.get("status") != "ok":
+                raise RuntimeError(data.get("message", "sessions.create failed"))
+            session_id = data["session"]
+            self._flare_sessions[host] = session_id
+        return session_id
+
+    def _solve_with_flaresolverr(self, url: str, host: str, source: str) -> str:
+        start = time.monotonic()
+        data = self._flare(
+            {"cmd": "request.get", "url": url, "session": self._flare_session(host, source), "maxTimeout": 60000},
+            source,
+        )
+        self._time(source, "solve", time.monotonic() - start)
+        if data.get("status") != "ok":
+            raise RuntimeError(data.get("message", "unknown"))
+
+        solution = data["solution"]
+        scraper = self._scraper(host)
+        for cookie in solution.get("cookies") or []:
+            scraper.cookies.set(cookie["name"], cookie["value"], domain=cookie.get("domain"), path=cookie.get("path", "/"))
+        if solution.get("userAgent"):
+            scraper.headers["User-Agent"] = solution["userAgent"]
+        self._cleared.add(host)
+        return solution["response"]
+
+    @staticmethod
+    def _passed(html: str, min_length: int) -> bool:
+        return "Attention Required" not in html and "Just a moment" not in html[:2000] and len(html) > min_length
+
+    def get(self, url: str, source: str, min_length: int = 10000, done=None) -> str:
+        """Fetch a Cloudflare-protected page, solving the challenge at most once per host.
+
+        With done (see scraper_http.section_end) a cleared session stops
+        downloading once done() holds; FlareSolverr always returns whole pages.
+        A prefix that reached done() has the region the caller wants, so it
+        is only checked for challenge markers, not against min_length.
+        """
+        from urllib.parse import urlsplit
+
+        host = urlsplit(url).netloc
+        circuit = f"host:{host}"
+        if not health.allow(circuit):
+            print(f"  [{source.upper()}] circuit open for {host}, skipping")
+            self._failed(source)
+            return ""
+        with self._host_lock(host):
+            scraper = self._scraper(host)
+            kind = "fetch" if host in self._cleared else "solve"
+            start = time.monotonic()
+            try:
+                resp = scraper.get(url, timeout=30, stream=done is not None)
+                truncated = done is not None and read_prefix(resp, done)
+                self._time(source, kind, time.monotonic() - start)
+                if resp.ok and self._passed(resp.text, 0 if truncated else min_length):
+                    self._cleared.add(host)
+                    health.success(circuit, time.monotonic() - start)
+                    via = "cleared session" if kind == "fetch" else "cloudscraper"
+                    print(f"  [{source.upper()}] {via} OK: {len(resp.text)} chars")
+                    return resp.text
+                print(f"  [{source.upper()}] Cloudflare challenge on {host}, trying FlareSolverr...")
+            except Exception as exc:
+                self._time(source, kind, time.monotonic() - start)
+                print(f"  [{source.upper()}] cloudscraper failed ({exc}), trying FlareSolverr...")
+
+            self._cleared.discard(host)
+            try:
+                html = self._solve_with_flaresolverr(url, host, source)
+                health.success(circuit, time.monotonic() - start)
+                print(f"  [{source.upper()}] FlareSolverr OK: {len(html)} chars")
+                return html
+            except Exception as exc:
+                health.failure(circuit, f"{type(exc).__name__}: {exc}", time.monotonic() - start)
+                self._failed(source)
+                print(f"  [{source.upper()}] FlareSolverr unavailable ({exc})")
+                return ""
+
+    def render(self, url: str, source: str) -> str:
+        """Fetch a JS-rendered page through the host's FlareSolverr browser session."""
+        from urllib.parse import urlsplit
+
+        host = urlsplit(url).netloc
+        with self._host_lock(host):
+            try:
+                return self._solve_with_flaresolverr(url, host, source)
+            except Exception as exc:
+                # FlareSolverr's own circuit (through http) covers its outages;
+                # the page's host may still answer the caller's static fallback
+                self._failed(source)
+                print(f"  [{source.upper()}] FlareSolverr unavailable ({exc})")
+                return ""
+
+    def close(self) -> None:
+        for host, session_id in list(self._flare_sessions.items()):
+            try:
+                self._flare({"cmd": "sessions.destroy", "session": session_id}, "flaresolverr", timeout=30)
+            except Exception:
+                pass
+        self._flare_sessions.clear()
+        for scraper in self._scrapers.values():
+            scraper.close()
+        self._scrapers.clear()
+        self._cleared.clear()
 
-    return ""
+
+solver = ChallengeSolver()
+
+
+def _csx_main_read():
+    # Every CSX page is parsed from #content_main only; the footer marks the end of what is needed
+    return section_end('id="content_main"', "</main>", "<footer")
 
 
 def fetch_csx_advisories() -> list[dict]:
     """Scrape CSX embargoes and service bulletins (Cloudflare-protected)."""
     print("[CSX Advisory] Fetching embargoes and bulletins...")
 
-    from bs4 import BeautifulSoup
-
     advisories = []
     seen = set()
 
     # --- Embargoes ---
-    html = _fetch_csx_page("https://www.csx.com/index.cfm/customers/news/embargoes/")
+    html = solver.get("https://www.csx.com/index.cfm/customers/news/embargoes/", source="csx", done=_csx_main_read())
     if html:
-        soup = BeautifulSoup(html, "html.parser")
+        soup = parse_html(html, "csx")
         main = soup.find(id="content_main")
         if main:
             blocks = re.split(r"(?=CSXT-CSX TRANSPORTATION)", main.get_text())
@@ -512,7 +1042,7 @@ def fetch_csx_advisories() -> list[dict]:
                 cause_detail = fields.get("Cause Detail", "")
                 commodities = fields.get("Commodities", "")
 
-                issued_iso = NOW_ISO
+                issued_iso = None
                 expires_iso = None
                 for raw, target in [(eff_date, "issued"), (exp_date, "expires")]:
                     if raw:
@@ -534,7 +1064,7 @@ def fetch_csx_advisories() -> list[dict]:
                     description += f" Commodities: {commodities}"
 
                 advisories.append({
-                    "id": f"adv-{short_uuid()}",
+                    "id": stable_id("adv", f"csx-{embargo_num}"),
                     "externalId": f"csx-{embargo_num}",
                     "slug": slugify(f"csx-embargo-{embargo_num}"),
                     "railroad": "CSX",
@@ -545,13 +1075,13 @@ def fetch_csx_advisories() -> list[dict]:
                     "isActive": status.lower() == "effective",
                     "issuedAt": issued_iso,
                     "expiresAt": expires_iso,
-                    "createdAt": NOW_ISO,
                 })
 
     # --- Service Bulletins ---
-    html2 = _fetch_csx_page("https://www.csx.com/index.cfm/customers/news/service-bulletins1/")
+    bulletins_url = "https://www.csx.com/index.cfm/customers/news/service-bulletins1/"
+    html2 = solver.get(bulletins_url, source="csx", done=_csx_main_read())
     if html2:
-        soup2 = BeautifulSoup(html2, "html.parser")
+        soup2 = parse_html(html2, "csx")
         main2 = soup2.find(id="content_main")
         if main2:
             for link in main2.find_all("a", href=True):
@@ -564,20 +1094,22 @@ def fetch_csx_advisories() -> list[dict]:
                 seen.add(title)
 
                 advisories.append({
-                    "id": f"adv-{short_uuid()}",
+                    "id": stable_id("adv", f"csx-{hash_string(title)}"),
                     "externalId": f"csx-{hash_string(title)}",
                     "slug": slugify(f"csx-{title}"),
                     "railroad": "CSX",
-                    "advisoryType": classify_advisory(title),
+                    "advisoryType": None,
                     "title": title,
                     "description": title,
-                    "affectedArea": extract_area(title),
+                    "affectedArea": None,
                     "isActive": True,
-                    "issuedAt": NOW_ISO,
+                    "issuedAt": None,
                     "expiresAt": None,
-                    "createdAt": NOW_ISO,
+                    "sourceUrl": urljoin(bulletins_url, href),
                 })
 
+    # Bulletin pages sit behind the same Cloudflare check as the listing
+    fill_descriptions(advisories, "csx", fetch=lambda page: solver.get(page, source="csx", min_length=2000, done=_csx_main_read()))
     print(f"[CSX Advisory] Found {len(advisories)} entries")
     return advisories
 
@@ -587,15 +1119,14 @@ def fetch_ns_advisories() -> list[dict]:
     print("[NS Advisory] Fetching customer alerts...")
     url = "https://www.norfolksouthern.com/en/customer-alerts"
     try:
-        resp = requests.get(url, headers={"User-Agent": "Mozilla/5.0 railhub-scraper"}, timeout=30)
+        resp = http.get(url, source="ns", conditional=True, timeout=30)
         resp.raise_for_status()
         html = resp.text
     except Exception as exc:
         print(f"  [NS Advisory] ERROR: {exc}")
         return []
 
-    from bs4 import BeautifulSoup
-    soup = BeautifulSoup(html, "html.parser")
+    soup = parse_html(html, "ns")
 
     advisories = []
     seen = set()
@@ -644,21 +1175,20 @@ def fetch_ns_advisories() -> list[dict]:
         elif "/facility-alerts/" in href:
             atype = "MAINTENANCE_NOTICE"
         else:
-            atype = classify_advisory(short_title)
+            atype = None  # classified from the title by the advisory store
 
         advisories.append({
-            "id": f"adv-{short_uuid()}",
+            "id": stable_id("adv", f"ns-{hash_string(href)}"),
             "externalId": f"ns-{hash_string(href)}",
             "slug": slugify(f"ns-{short_title}"),
             "railroad": "NS",
             "advisoryType": atype,
             "title": short_title,
             "description": description[:500],
-            "affectedArea": extract_area(short_title),
+            "affectedArea": None,
             "isActive": True,
-            "issuedAt": f"{date_str}T00:00:00.000Z" if date_str else NOW_ISO,
+            "issuedAt": f"{date_str}T00:00:00.000Z" if date_str else None,
             "expiresAt": None,
-            "createdAt": NOW_ISO,
         })
 
     print(f"[NS Advisory] Found {len(advisories)} entries")
@@ -669,42 +1199,23 @@ def fetch_up_advisories() -> list[dict]:
     """Scrape Union Pacific embargoes and customer news via FlareSolverr (JS-rendered)."""
     print("[UP Advisory] Fetching embargoes...")
 
-    import os
-    flare_url = os.environ.get("FLARESOLVERR_URL", "http://localhost:8191/v1")
-
-    from bs4 import BeautifulSoup
-
     advisories = []
     seen = set()
 
     # UP embargo list is JS-rendered — needs FlareSolverr
-    try:
-        resp = requests.post(
-            flare_url,
-            headers={"Content-Type": "application/json"},
-            json={"cmd": "request.get", "url": "https://www.up.com/customers/embargo/list/index.htm", "maxTimeout": 60000},
-            timeout=120,
-        )
-        data = resp.json()
-        if data.get("status") == "ok":
-            html = data["solution"]["response"]
-            print(f"  [UP Advisory] Embargo page: {len(html)} chars via FlareSolverr")
-        else:
-            print(f"  [UP Advisory] FlareSolverr error: {data.get('message', '')}")
-            html = ""
-    except Exception as exc:
-        print(f"  [UP Advisory] FlareSolverr unavailable ({exc}), trying static page...")
+    embargo_url = "https://www.up.com/customers/embargo/list/index.htm"
+    html = solver.render(embargo_url, source="up")
+    if html:
+        print(f"  [UP Advisory] Embargo page: {len(html)} chars via FlareSolverr")
+    else:
         # Fallback: try the static page — table will be empty but we can get any static content
         try:
-            html = requests.get(
-                "https://www.up.com/customers/embargo/list/index.htm",
-                headers={"User-Agent": "Mozilla/5.0 railhub-scraper"}, timeout=30,
-            ).text
+            html = http.get(embargo_url, source="up", timeout=30).text
         except Exception:
             html = ""
 
     if html:
-        soup = BeautifulSoup(html, "html.parser")
+        soup = parse_html(html, "up_embargo")
         # UP embargo table: headers = Dates, Customers, Commodities, Locations, Reason, Embargo Number, AAR Link
         for table in soup.find_all("table"):
             rows = table.find_all("tr")
@@ -733,7 +1244,7 @@ def fetch_up_advisories() -> list[dict]:
                     description += f" Commodities: {commodities}."
 
                 # Parse date
-                issued_iso = NOW_ISO
+                issued_iso = None
                 dm = re.search(r"(\d{1,2}[/-]\d{1,2}[/-]\d{2,4})", dates)
                 if dm:
                     for fmt in ("%m/%d/%Y", "%m-%d-%Y", "%m/%d/%y"):
@@ -744,33 +1255,30 @@ def fetch_up_advisories() -> list[dict]:
                             pass
 
                 advisories.append({
-                    "id": f"adv-{short_uuid()}",
+                    "id": stable_id("adv", f"up-{embargo_num}"),
                     "externalId": f"up-{embargo_num}",
                     "slug": slugify(f"up-embargo-{embargo_num}"),
                     "railroad": "UP",
                     "advisoryType": "EMBARGO",
                     "title": title,
                     "description": description,
-                    "affectedArea": extract_area(locations) if locations else None,
+                    "affectedArea": None,  # geotagged from the Locations text in the description
                     "isActive": True,
                     "issuedAt": issued_iso,
                     "expiresAt": None,
-                    "createdAt": NOW_ISO,
                 })
 
     # Also scrape UP customer news (static HTML, no JS needed)
+    news_url = "https://www.up.com/customers/announcements/customernews/index.htm"
     try:
-        news_resp = requests.get(
-            "https://www.up.com/customers/announcements/customernews/index.htm",
-            headers={"User-Agent": "Mozilla/5.0 railhub-scraper"}, timeout=30,
-        )
+        news_resp = http.get(news_url, source="up", conditional=True, timeout=30)
         news_resp.raise_for_status()
         news_html = news_resp.text
     except Exception:
         news_html = ""
 
     if news_html:
-        news_soup = BeautifulSoup(news_html, "html.parser")
+        news_soup = parse_html(news_html, "up_news")
         for link in news_soup.find_all("a", href=True):
             href = link["href"]
             if "/customernews/" not in href or href.rstrip("/").endswith("customernews"):
@@ -781,110 +1289,279 @@ def fetch_up_advisories() -> list[dict]:
             seen.add(title)
 
             advisories.append({
-                "id": f"adv-{short_uuid()}",
+                "id": stable_id("adv", f"up-{hash_string(title)}"),
                 "externalId": f"up-{hash_string(title)}",
                 "slug": slugify(f"up-{title}"),
                 "railroad": "UP",
-                "advisoryType": classify_advisory(title),
+                "advisoryType": None,
                 "title": title[:200],
-                "description": title[:500],
-                "affectedArea": extract_area(title),
+                "description": title[:200],
+                "affectedArea": None,
                 "isActive": True,
-                "issuedAt": NOW_ISO,
+                "issuedAt": None,
                 "expiresAt": None,
-                "createdAt": NOW_ISO,
+                "sourceUrl": urljoin(news_url, href),
             })
 
+    fill_descriptions(advisories, "up")
     print(f"[UP Advisory] Found {len(advisories)} entries")
     return advisories
 
 
 # --- Source 4: FRA Safety Incidents → Advisories ---
 
-def fetch_fra_incidents() -> list[dict]:
-    """FRA safety incidents are operational safety events — belong in advisories, not regulatory."""
-    print("[FRA] Fetching accident data...")
-    url = "https://data.transportation.gov/resource/85tf-25kj.json"
-    params = {
-        "$limit": 50,
-        "$order": "date DESC",
-        "$where": "date>'2024-01-01'",
-    }
-    try:
-        resp = requests.get(url, params=params, timeout=30)
-        resp.raise_for_status()
-        rows = resp.json()
-    except Exception as exc:
-        print(f"  [FRA] ERROR: {exc}")
-        return []
-
-    records = []
-    for row in rows:
-        incident_number = (
+FRA_URL = "https://data.transportation.gov/resource/85tf-25kj.csv"
+FRA_PAGE_SIZE = 50000
+FRA_BATCH_SIZE = 5000
+# The columns _fra_fields reads first; the other variants are only seen unprojected
+FRA_SELECT = [
+    ":id", "accidentnumber", "accidenttype", "reportingrailroadname", "station", "stateabbr",
+    "date", "totalpersonskilled", "totalpersonsinjured", "totaldamagecost",
+]
+FRA_DEFAULT_SINCE = "2024-01-01T00:00:00.000"   # first sync without --fra-backfill
+FRA_ADVISORY_SINCE = "2024-01-01"
+FRA_ADVISORY_LIMIT = 50
+FRA_ROLLUP_YEARS = 5
+
+
+def init_fra_store(db_path: Path) -> sqlite3.Connection:
+    conn = sqlite3.connect(db_path)
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS fra_incidents "
+        "(row_id TEXT PRIMARY KEY, report_date TEXT, state TEXT, railroad TEXT, "
+        "killed INTEGER, injured INTEGER, damage REAL, row TEXT)"
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS fra_incidents_date ON fra_incidents (report_date)")
+    conn.execute("CREATE TABLE IF NOT EXISTS fra_watermark (id INTEGER PRIMARY KEY CHECK (id = 1), max_date TEXT, synced_at TEXT)")
+    conn.commit()
+    return conn
+
+
+def _fra_fields(row: dict) -> dict:
+    """Normalize the FRA column variants into the fields the advisory and rollups use."""
+    railroad_name = (
+        row.get("reportingrailroadname")
+        or row.get("railroad_name")
+        or row.get("railroad")
+        or "Unknown Railroad"
+    )
+    return {
+        "incident_number": (
             row.get("accidentnumber")
             or row.get("incidentkey")
             or row.get("incident_number")
-            or short_uuid()
-        )
-        external_id = f"fra-{incident_number}"
-
-        incident_type = row.get("accidenttype") or row.get("type") or "Incident"
-        railroad_name = (
-            row.get("reportingrailroadname")
-            or row.get("railroad_name")
-            or row.get("railroad")
-            or "Unknown Railroad"
-        )
-        railroad_short = normalize_railroad(railroad_name) or railroad_name
-        city = row.get("station") or row.get("city_name") or row.get("city") or "Unknown City"
-        state = (
+            or hash_string(json.dumps(row, sort_keys=True))
+        ),
+        "incident_type": row.get("accidenttype") or row.get("type") or "Incident",
+        "railroad_name": railroad_name,
+        "railroad_short": normalize_railroad(railroad_name) or railroad_name,
+        "city": row.get("station") or row.get("city_name") or row.get("city") or "Unknown City",
+        "state": (
             row.get("stateabbr")
             or row.get("statename")
             or row.get("state_name")
             or row.get("state")
             or ""
-        )
-        date_raw = (row.get("date") or "")[:10]
+        ),
+        "date": (row.get("date") or "")[:10],
+        "killed": row.get("totalpersonskilled") or row.get("total_killed") or row.get("killed") or "0",
+        "injured": row.get("totalpersonsinjured") or row.get("total_injured") or row.get("injured") or "0",
+        "damage": row.get("totaldamagecost") or row.get("total_damage") or row.get("damage") or "0",
+    }
+
+
+def _fra_rows(since: str):
+    """Yield FRA rows dated at or after since (everything when since is None), oldest first.
+
+    Streams projected CSV pages like _usda_rows, and falls back to every
+    column if Socrata rejects FRA_SELECT.
+    """
+    params = {"$select": ",".join(FRA_SELECT), "$order": "date, :id", "$limit": FRA_PAGE_SIZE}
+    if since:
+        params["$where"] = f"date >= '{since}'"
+    offset = 0
+    while True:
+        params["$offset"] = offset
+        resp = http.get(FRA_URL, source="fra", params=params, stream=True, timeout=60)
+        if resp.status_code == 400 and "$select" in params:
+            resp.close()
+            print("  [FRA] $select rejected, retrying unprojected")
+            del params["$select"]
+            params["$$exclude_system_fields"] = "false"
+            continue
+        resp.raise_for_status()
+        count = 0
+        for row in socrata_rows(resp, "fra"):
+            count += 1
+            yield row
+        if count < FRA_PAGE_SIZE:
+            return
+        offset += FRA_PAGE_SIZE
 
-        title = f"{incident_type} - {railroad_name} near {city}, {state}"
 
-        killed = row.get("totalpersonskilled") or row.get("total_killed") or row.get("killed") or "0"
-        injured = row.get("totalpersonsinjured") or row.get("total_injured") or row.get("injured") or "0"
-        damage = row.get("totaldamagecost") or row.get("total_damage") or row.get("damage") or "0"
+def sync_fra_incidents(conn: sqlite3.Connection, backfill: bool = False) -> tuple[int, int]:
+    """Page new FRA rows into the local store. Returns (fetched, stored).
 
-        description = (
-            f"Incident on {date_raw}: {killed} fatalities, "
-            f"{injured} injuries. Estimated damage: ${damage}"
+    Rows come oldest first and the date watermark advances after each batch,
+    so an interrupted backfill leaves a consistent store that the next
+    incremental run continues from.
+    """
+    row = conn.execute("SELECT max_date FROM fra_watermark WHERE id = 1").fetchone()
+    since = None if backfill else (row[0] if row and row[0] else FRA_DEFAULT_SINCE)
+
+    fetched = stored = 0
+    for rows in batched(_fra_rows(since), FRA_BATCH_SIZE):
+        batch = []
+        max_date = None
+        for r in rows:
+            fetched += 1
+            row_id = r.get(":id")
+            # Drop Socrata system fields so the stored row (and any id hashed from it) matches the public columns
+            r = {k: v for k, v in r.items() if not k.startswith(":")}
+            row_id = row_id or hash_string(json.dumps(r, sort_keys=True))
+            f = _fra_fields(r)
+            state = f["state"].upper() if len(f["state"]) == 2 else f["state"]
+            batch.append((
+                row_id, f["date"], state, f["railroad_short"],
+                int(safe_float(f["killed"]) or 0), int(safe_float(f["injured"]) or 0),
+                safe_float(f["damage"]) or 0.0, json.dumps(r, sort_keys=True),
+            ))
+            max_date = max(max_date or "", r.get("date") or "")
+        check_cancelled()
+        conn.executemany(
+            "INSERT OR REPLACE INTO fra_incidents (row_id, report_date, state, railroad, killed, injured, damage, row) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            batch,
         )
+        if max_date:
+            conn.execute(
+                "INSERT OR REPLACE INTO fra_watermark (id, max_date, synced_at) VALUES (1, ?, ?)",
+                (max_date, NOW_ISO),
+            )
+        conn.commit()
+        stored += len(batch)
+    return fetched, stored
+
+
+def fra_incident_advisory(row: dict) -> dict:
+    f = _fra_fields(row)
+    external_id = f"fra-{f['incident_number']}"
+    state = f["state"]
+    date_raw = f["date"]
+
+    title = f"{f['incident_type']} - {f['railroad_name']} near {f['city']}, {state}"
+    description = (
+        f"Incident on {date_raw}: {f['killed']} fatalities, "
+        f"{f['injured']} injuries. Estimated damage: ${f['damage']}"
+    )
+    slug = slugify(f"fra-{f['incident_type']}-{f['railroad_short']}-{f['city']}-{state}-{date_raw}")
+
+    return {
+        "id": stable_id("adv", external_id),
+        "externalId": external_id,
+        "slug": slug,
+        "railroad": f["railroad_short"],
+        "advisoryType": "SERVICE_ALERT",
+        "title": title,
+        "description": description,
+        "affectedArea": state if state and len(state) == 2 else None,
+        "isActive": True,
+        "issuedAt": f"{date_raw}T00:00:00.000Z" if date_raw else None,
+        "expiresAt": None,
+    }
 
-        slug = slugify(f"fra-{incident_type}-{railroad_short}-{city}-{state}-{date_raw}")
 
-        records.append({
-            "id": f"adv-{short_uuid()}",
-            "externalId": external_id,
-            "slug": slug,
-            "railroad": railroad_short,
-            "advisoryType": "SERVICE_ALERT",
-            "title": title,
-            "description": description,
-            "affectedArea": state if state and len(state) == 2 else None,
-            "isActive": True,
-            "issuedAt": f"{date_raw}T00:00:00.000Z" if date_raw else NOW_ISO,
-            "expiresAt": None,
-            "createdAt": NOW_ISO,
-        })
+def fetch_fra_incidents(backfill: bool = False) -> list[dict]:
+    """FRA safety incidents are operational safety events — belong in advisories, not regulatory.
 
+    The full accident dataset syncs into a local store (everything with
+    backfill, otherwise rows since the watermark); the newest incidents
+    become advisories and the store feeds build_fra_rollups().
+    """
+    print(f"[FRA] {'Backfilling' if backfill else 'Syncing'} accident data...")
+    conn = init_fra_store(CACHE_DB)
+    try:
+        try:
+            fetched, stored = sync_fra_incidents(conn, backfill=backfill)
+        except Exception as exc:
+            print(f"  [FRA] ERROR: {exc}")
+        else:
+            print(f"  [FRA] {stored} rows stored from {fetched} fetched")
+        rows = conn.execute(
+            "SELECT row FROM fra_incidents WHERE report_date > ? ORDER BY report_date DESC, row_id LIMIT ?",
+            (FRA_ADVISORY_SINCE, FRA_ADVISORY_LIMIT),
+        ).fetchall()
+    finally:
+        conn.close()
+
+    records = [fra_incident_advisory(json.loads(row)) for (row,) in rows]
     print(f"[FRA] Total: {len(records)} incident records")
     return records
 
 
+def write_fra_rollups(shard_dir: Path = None, db_path: Path = None) -> int:
+    """Write fra-rollups.json from the local store. Skipped while the store is empty."""
+    shard_dir = shard_dir or SHARD_DIR
+    db_path = db_path or CACHE_DB
+    rollups = build_fra_rollups(db_path)
+    if not rollups["rollups"]:
+        return 0
+    return int(_write_json(shard_dir / "fra-rollups.json", rollups))
+
+
+def build_fra_rollups(db_path: Path = None) -> dict:
+    """Incidents, fatalities, injuries and damage by state x railroad x month for the trailing window.
+
+    Also totals per state and per railroad, which the industry overview
+    reads directly instead of aggregating incidents.
+    """
+    db_path = db_path or CACHE_DB
+    since = f"{datetime.now(timezone.utc).year - FRA_ROLLUP_YEARS}-01-01"
+    conn = init_fra_store(db_path)
+    try:
+        rows = conn.execute(
+            "SELECT state, railroad, substr(report_date, 1, 7) AS month, COUNT(*), SUM(killed), SUM(injured), SUM(damage) "
+            "FROM fra_incidents WHERE report_date >= ? GROUP BY state, railroad, month ORDER BY month DESC, state, railroad",
+            (since,),
+        ).fetchall()
+    finally:
+        conn.close()
+
+    def totals(key_index: int) -> dict:
+        out = {}
+        for row in rows:
+            t = out.setdefault(row[key_index], {"incidents": 0, "fatalities": 0, "injuries": 0, "damage": 0.0})
+            t["incidents"] += row[3]
+            t["fatalities"] += row[4]
+            t["injuries"] += row[5]
+            t["damage"] += row[6]
+        for t in out.values():
+            t["damage"] = round(t["damage"], 2)
+        return dict(sorted(out.items()))
+
+    return {
+        "since": since[:7],
+        "rollups": [
+            {"state": state, "railroad": railroad, "month": month, "incidents": incidents,
+             "fatalities": fatalities, "injuries": injuries, "damage": round(damage, 2)}
+            for state, railroad, month, incidents, fatalities, injuries, damage in rows
+        ],
+        "byState": totals(0),
+        "byRailroad": totals(1),
+    }
+
+
 # --- Source 4b: STB News ---
 
 def fetch_stb_news() -> list[dict]:
     print("[STB] Scraping latest news...")
     url = "https://www.stb.gov/news-communications/latest-news/"
     try:
-        resp = requests.get(url, timeout=30, headers={"User-Agent": "Mozilla/5.0 railhub-scraper"})
+        # Only the article list is parsed; stop downloading once the main region closes after it
+        resp = http.get_prefix(
+            url, source="stb", conditional=True, timeout=30,
+            done=section_end("stb-latest-news", "</main>", "<footer"),
+        )
         resp.raise_for_status()
         html = resp.text
     except Exception as exc:
@@ -893,10 +1570,6 @@ def fetch_stb_news() -> list[dict]:
 
     # STB uses class="stb-latest-news" on <article> elements with <h4> headings.
     # Each article contains a heading div and a content div with date + docket in a <p>.
-    article_pattern = re.compile(
-        r'<article[^>]+class="[^"]*stb-latest-news[^"]*"[^>]*>(.*?)</article>',
-        re.DOTALL | re.IGNORECASE,
-    )
     tag_pattern = re.compile(r"<[^>]+>")
     heading_pattern = re.compile(r"<h[2-6][^>]*>(.*?)</h[2-6]>", re.DOTALL | re.IGNORECASE)
     # Date format on STB: "02/06/2026 (Friday)"
@@ -908,8 +1581,7 @@ def fetch_stb_news() -> list[dict]:
     para_pattern = re.compile(r"<p[^>]*>(.*?)</p>", re.DOTALL | re.IGNORECASE)
 
     records = []
-    for match in article_pattern.finditer(html):
-        body = match.group(1)
+    for body in iter_elements(html, "article", "stb-latest-news"):
 
         # Title — from heading tag
         h_match = heading_pattern.search(body)
@@ -965,12 +1637,12 @@ def fetch_stb_news() -> list[dict]:
             # Fallback: use plain body excerpt
             summary = plain_body.strip()[:200]
 
-        external_id = f"stb-{docket or short_uuid()}"
+        external_id = f"stb-{docket or hash_string(title_raw)}"
         published_at = f"{date_str}T00:00:00.000Z" if date_str else NOW_ISO
         slug = slugify(f"{title_raw}-{external_id}")
 
         records.append({
-            "id": f"reg-{short_uuid()}",
+            "id": stable_id("reg", external_id),
             "externalId": external_id,
             "agency": "STB",
             "updateType": "Notice",
@@ -990,17 +1662,17 @@ def fetch_stb_news() -> list[dict]:
 
 # --- Source 5: Freight Trends (BTS + FRED) ---
 
-def _fetch_fred_csv(series_id: str, start_year: int) -> dict:
-    """Fetch a FRED CSV series and return {YYYY-MM: value} dict."""
-    url = f"https://fred.stlouisfed.org/graph/fredgraph.csv?id={series_id}&cosd={start_year}-01-01"
+def _fetch_fred_rows(series_id: str, start_date: str, source: str = "freight_trends") -> list[tuple[str, float]]:
+    """Fetch a FRED CSV series as [(YYYY-MM-DD, value)], skipping missing observations."""
+    url = f"https://fred.stlouisfed.org/graph/fredgraph.csv?id={series_id}&cosd={start_date}"
     try:
-        resp = requests.get(url, timeout=30)
+        resp = http.get(url, source=source, conditional=True, timeout=30)
         resp.raise_for_status()
     except Exception as exc:
         print(f"  [FRED] ERROR fetching {series_id}: {exc}")
-        return {}
+        return []
 
-    result = {}
+    result = []
     reader = csv.reader(io.StringIO(resp.text))
     next(reader, None)  # skip header
     for row in reader:
@@ -1009,150 +1681,1416 @@ def _fetch_fred_csv(series_id: str, start_year: int) -> dict:
         date_str, value_str = row[0], row[1]
         if value_str == ".":
             continue
-        # Normalize to YYYY-MM (both APIs have monthly data)
-        month_key = date_str[:7]
         try:
-            result[month_key] = float(value_str)
+            result.append((date_str[:10], float(value_str)))
         except ValueError:
             continue
     return result
 
 
+BTS_FREIGHT_URL = "https://data.bts.gov/resource/bw6n-ddqk.csv"
+FREIGHT_TREND_YEARS = 3
+FREIGHT_REVISION_MONTHS = 3   # re-read this many stored months; FRED and BTS revise recent values
+FREIGHT_FETCH_WORKERS = 4
+
+# Output field -> where its monthly values come from. BTS columns share one
+# Socrata query; each FRED series is its own CSV request. Adding a series is a
+# new entry here — the store is keyed (month, field), so no schema change.
+FREIGHT_SERIES = [
+    {"field": "carloads", "source": "bts", "column": "rail_frt_carloads"},
+    {"field": "carloadsSA", "source": "bts", "column": "rail_frt_carloads_d11"},
+    {"field": "intermodal", "source": "bts", "column": "rail_frt_intermodal"},
+    {"field": "intermodalSA", "source": "bts", "column": "rail_frt_intermodal_d11"},
+    {"field": "tsiFreight", "source": "bts", "column": "tsi_freight"},
+    {"field": "ppiRail", "source": "fred", "series": "PCU48214821"},
+    {"field": "cassFreight", "source": "fred", "series": "FRGSHPUSM649NCIS"},
+]
+
+
+def init_freight_store(db_path: Path) -> sqlite3.Connection:
+    conn = sqlite3.connect(db_path)
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS freight_trends "
+        "(month TEXT, field TEXT, value REAL, synced_at TEXT, PRIMARY KEY (month, field))"
+    )
+    conn.commit()
+    return conn
+
+
+def _freight_backfill_start() -> str:
+    return f"{datetime.now(timezone.utc).year - FREIGHT_TREND_YEARS}-01"
+
+
+def _freight_since(conn: sqlite3.Connection, fields: list[str]) -> str:
+    """First month (YYYY-MM) to request for fields: the last stored month, less the revision window."""
+    backfill = _freight_backfill_start()
+    marks = ",".join("?" * len(fields))
+    (latest,) = conn.execute(f"SELECT MAX(month) FROM freight_trends WHERE field IN ({marks})", fields).fetchone()
+    if not latest:
+        return backfill
+    year, mon = map(int, latest.split("-"))
+    mon -= FREIGHT_REVISION_MONTHS
+    while mon < 1:
+        year, mon = year - 1, mon + 12
+    return max(backfill, f"{year:04d}-{mon:02d}")
+
+
+def _fetch_bts_freight(series: list[dict], since: str) -> dict:
+    """{field: {YYYY-MM: value}} for the BTS columns in series, from month since onwards."""
+    columns = [s["column"] for s in series]
+    params = {
+        "$select": ",".join(["obs_date"] + columns),
+        "$where": f"obs_date >= '{since}-01T00:00:00.000'",
+        "$order": "obs_date",
+        "$limit": 1000,
+    }
+    # A few dozen monthly rows: the conditional cache is worth more here than streaming
+    resp = http.get(BTS_FREIGHT_URL, source="freight_trends", conditional=True, params=params, timeout=30)
+    resp.raise_for_status()
+    values = {s["field"]: {} for s in series}
+    for row in socrata_rows(resp, "freight_trends"):
+        month = (row.get("obs_date") or "")[:7]
+        if not month:
+            continue
+        for s in series:
+            value = safe_float(row.get(s["column"]))
+            if value is not None:
+                values[s["field"]][month] = value
+    return values
+
+
+def _fetch_fred_freight(spec: dict, since: str) -> dict:
+    rows = _fetch_fred_rows(spec["series"], f"{since}-01")
+    return {spec["field"]: {date_str[:7]: value for date_str, value in rows}}
+
+
+def sync_freight_trends(conn: sqlite3.Connection) -> dict:
+    """Fetch every registered series from its own last stored month, in parallel.
+
+    Returns {field: months stored}. A failed request leaves that series'
+    stored months untouched.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    bts = [s for s in FREIGHT_SERIES if s["source"] == "bts"]
+    jobs = []
+    if bts:
+        jobs.append(("BTS", _fetch_bts_freight, bts, _freight_since(conn, [s["field"] for s in bts])))
+    for spec in FREIGHT_SERIES:
+        if spec["source"] == "fred":
+            jobs.append((spec["series"], _fetch_fred_freight, spec, _freight_since(conn, [spec["field"]])))
+
+    stored = {}
+    with ThreadPoolExecutor(max_workers=FREIGHT_FETCH_WORKERS) as pool:
+        futures = [(label, since, pool.submit(fn, arg, since)) for label, fn, arg, since in jobs]
+        for label, since, future in futures:
+            try:
+                values = future.result()
+            except Exception as exc:
+                print(f"  [FreightTrends] ERROR fetching {label}: {exc}")
+                continue
+            check_cancelled()
+            for field, months in values.items():
+                conn.executemany(
+                    "INSERT OR REPLACE INTO freight_trends (month, field, value, synced_at) VALUES (?, ?, ?, ?)",
+                    [(month, field, value, NOW_ISO) for month, value in months.items()],
+                )
+                stored[field] = len(months)
+            print(f"  [FreightTrends] {label}: {sum(len(m) for m in values.values())} values since {since}")
+    conn.commit()
+    return stored
+
+
 def scrape_freight_trends() -> list:
-    """Merge BTS freight volume (Socrata) and FRED economic series into monthly records."""
-    print("[FreightTrends] Fetching BTS and FRED data...")
+    """Sync the BTS and FRED series into the monthly store, then emit the trailing window."""
+    print(f"[FreightTrends] Syncing {len(FREIGHT_SERIES)} series...")
+    conn = init_freight_store(CACHE_DB)
+    try:
+        sync_freight_trends(conn)
+        rows = conn.execute(
+            "SELECT month, field, value FROM freight_trends WHERE month >= ? ORDER BY month DESC",
+            (_freight_backfill_start(),),
+        ).fetchall()
+    finally:
+        conn.close()
+
+    fields = [s["field"] for s in FREIGHT_SERIES]
+    merged = {}
+    for month, field, value in rows:
+        if field not in fields:
+            continue  # dropped from the registry
+        record = merged.get(month)
+        if record is None:
+            record = merged[month] = {"date": f"{month}-01", **{f: None for f in fields}}
+        record[field] = value
+
+    trends = sorted(merged.values(), key=lambda r: r["date"], reverse=True)
+    print(f"  Freight trends: {len(trends)} months")
+    return trends
+
+
+# --- Advisory store ---
+#
+# Advisories persist in CACHE_DB keyed by externalId, so each run only does
+# work for what changed: records whose content hash is unchanged keep their
+# stored classification, new or edited ones are enriched again, and records
+# a source stops listing are marked inactive instead of vanishing. Undated
+# advisories are dated by when they were first seen. Enrichment (type, area,
+# locations) is stored in advisory_enrichment next to the content hash and
+# enrichment_version(), and redone only when either changes.
+
+ADVISORY_RETENTION_DAYS = 30  # inactive advisories stay in the export this long
+
+
+def init_advisory_store(db_path: Path) -> sqlite3.Connection:
+    conn = sqlite3.connect(db_path)
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS advisories "
+        "(external_id TEXT PRIMARY KEY, source TEXT, content_hash TEXT, record TEXT, "
+        "first_seen TEXT, last_seen TEXT, updated_at TEXT, is_active INTEGER)"
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS advisories_source ON advisories (source)")
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS advisory_enrichment "
+        "(external_id TEXT PRIMARY KEY, content_hash TEXT, version TEXT, enrichment TEXT)"
+    )
+    conn.commit()
+    return conn
+
+
+ENRICHED_FIELDS = ("advisoryType", "affectedArea", "locations")
+
+
+@functools.lru_cache(maxsize=None)
+def enrichment_version() -> str:
+    """Changes whenever enrich_advisory could: the tagger rules, the classifier keywords or facilities.json."""
+    parts = [TAGGER_VERSION, json.dumps(ADVISORY_TYPE_KEYWORDS, sort_keys=True)]
+    if FACILITIES_JSON.exists():
+        parts.append(hashlib.sha1(FACILITIES_JSON.read_bytes()).hexdigest())
+    return hashlib.sha1("|".join(parts).encode()).hexdigest()[:12]
+
+
+@functools.lru_cache(maxsize=None)
+def gazetteer() -> Gazetteer:
+    return load_gazetteer(STATES_GEOJSON, FACILITIES_JSON)
+
+
+def enrich_advisory(record: dict) -> dict:
+    """Fill in the fields fetchers leave to shared parsing (type, area, locations).
+
+    Title and description are geotagged in one pass; affectedArea becomes
+    the comma-separated states found (or a region word) unless the source
+    already gave one, and locations lists the pinned places.
+    """
+    record = dict(record)
+    if not record.get("advisoryType"):
+        record["advisoryType"] = classify_advisory(record["title"])
+    tag = gazetteer().tag(f"{record['title']}\n{record.get('description') or ''}")
+    if not record.get("affectedArea"):
+        record["affectedArea"] = ", ".join(tag["states"]) or tag["region"]
+    record["locations"] = tag["points"]
+    return record
 
-    start_year = datetime.now(timezone.utc).year - 3
 
-    # --- BTS Socrata ---
-    bts_url = "https://data.bts.gov/resource/bw6n-ddqk.json"
-    bts_params = {
-        "$select": "obs_date,rail_frt_carloads,rail_frt_carloads_d11,rail_frt_intermodal,rail_frt_intermodal_d11,tsi_freight",
-        "$order": "obs_date DESC",
-        "$limit": 36,
+def sync_advisories(conn: sqlite3.Connection, source: str, records: list[dict], previous: dict) -> dict:
+    """Merge one source's fresh listing into the store. Returns counts by outcome.
+
+    `previous` maps externalId -> record from the last industry.json, used
+    to seed first-seen dates for advisories the store has not met yet.
+    """
+    stored = {
+        ext_id: (content_hash, is_active)
+        for ext_id, content_hash, is_active in conn.execute(
+            "SELECT external_id, content_hash, is_active FROM advisories WHERE source = ?", (source,)
+        )
     }
+    counts = {"new": 0, "changed": 0, "unchanged": 0, "gone": 0}
+    seen = set()
+
+    for raw in records:
+        ext_id = raw["externalId"]
+        if ext_id in seen:
+            continue
+        seen.add(ext_id)
+        content_hash = hashlib.sha1(json.dumps(raw, sort_keys=True).encode()).hexdigest()
+        active = 1 if raw.get("isActive", True) else 0
+
+        if ext_id in stored and stored[ext_id][0] == content_hash:
+            counts["unchanged"] += 1
+            conn.execute(
+                "UPDATE advisories SET last_seen = ?, is_active = ? WHERE external_id = ?",
+                (NOW_ISO, active, ext_id),
+            )
+            continue
+
+        record = json.dumps(raw, ensure_ascii=False)
+        if ext_id in stored:
+            counts["changed"] += 1
+            conn.execute(
+                "UPDATE advisories SET content_hash = ?, record = ?, last_seen = ?, updated_at = ?, "
+                "is_active = ? WHERE external_id = ?",
+                (content_hash, record, NOW_ISO, NOW_ISO, active, ext_id),
+            )
+        else:
+            counts["new"] += 1
+            first_seen = (previous.get(ext_id) or {}).get("createdAt") or NOW_ISO
+            conn.execute(
+                "INSERT OR REPLACE INTO advisories (external_id, source, content_hash, record, first_seen, "
+                "last_seen, updated_at, is_active) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (ext_id, source, content_hash, record, first_seen, NOW_ISO, NOW_ISO, active),
+            )
+
+    gone = [ext_id for ext_id, (_, is_active) in stored.items() if ext_id not in seen and is_active]
+    counts["gone"] = len(gone)
+    conn.executemany(
+        "UPDATE advisories SET is_active = 0, updated_at = ? WHERE external_id = ?",
+        [(NOW_ISO, ext_id) for ext_id in gone],
+    )
+    conn.commit()
+    return counts
+
+
+def seed_advisories(conn: sqlite3.Connection, source: str, records: list[dict]) -> int:
+    """Load one source's advisories from the last industry.json into a store that has none of them.
+
+    CI restores CACHE_DB from a best-effort cache, so the first run, an
+    evicted cache or a fresh checkout starts empty; without this a source
+    that fails on such a run would drop out of the export entirely.
+    """
+    rows = []
+    for a in records:
+        raw = {k: v for k, v in a.items() if k not in ("createdAt", "updatedAt")}
+        content_hash = hashlib.sha1(json.dumps(raw, sort_keys=True).encode()).hexdigest()
+        first_seen = a.get("createdAt") or NOW_ISO
+        updated_at = a.get("updatedAt") or first_seen
+        rows.append((a["externalId"], source, content_hash, json.dumps(raw, ensure_ascii=False),
+                     first_seen, updated_at, updated_at, 1 if a.get("isActive", True) else 0))
+    conn.executemany(
+        "INSERT OR IGNORE INTO advisories (external_id, source, content_hash, record, first_seen, "
+        "last_seen, updated_at, is_active) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+        rows,
+    )
+    conn.commit()
+    return len(rows)
+
+
+def export_advisories(conn: sqlite3.Connection, sources: list[str]) -> list[dict]:
+    """Active advisories plus recently inactive ones, in source order."""
+    cutoff = (datetime.now(timezone.utc) - timedelta(days=ADVISORY_RETENTION_DAYS)).strftime(
+        "%Y-%m-%dT%H:%M:%S.000Z"
+    )
+    rank = {name: i for i, name in enumerate(sources)}
+    rows = conn.execute(
+        "SELECT external_id, source, content_hash, record, first_seen, updated_at, is_active FROM advisories "
+        "WHERE is_active = 1 OR updated_at >= ? ORDER BY first_seen, external_id",
+        (cutoff,),
+    ).fetchall()
+    version = enrichment_version()
+    stored = {
+        ext_id: json.loads(enrichment)
+        for ext_id, enrichment in conn.execute(
+            "SELECT external_id, enrichment FROM advisory_enrichment WHERE version = ? AND content_hash = "
+            "(SELECT content_hash FROM advisories WHERE advisories.external_id = advisory_enrichment.external_id)",
+            (version,),
+        )
+    }
+
+    advisories, enriched = [], []
+    for ext_id, source, content_hash, record, first_seen, updated_at, is_active in sorted(
+        rows, key=lambda r: rank.get(r[1], len(rank))
+    ):
+        a = json.loads(record)
+        if ext_id in stored:
+            a.update(stored[ext_id])
+        else:
+            # New or edited record, or the tagger / classifier changed since it was enriched
+            a = enrich_advisory(a)
+            enriched.append((ext_id, content_hash, version, json.dumps({k: a.get(k) for k in ENRICHED_FIELDS})))
+        expired = bool(a.get("expiresAt")) and a["expiresAt"] < NOW_ISO
+        a["isActive"] = bool(is_active) and not expired
+        a["issuedAt"] = a.get("issuedAt") or first_seen
+        a["createdAt"] = first_seen
+        a["updatedAt"] = updated_at
+        advisories.append(a)
+    conn.executemany(
+        "INSERT OR REPLACE INTO advisory_enrichment (external_id, content_hash, version, enrichment) VALUES (?, ?, ?, ?)",
+        enriched,
+    )
+    conn.commit()
+    if enriched:
+        print(f"  [Advisories] enriched {len(enriched)}, reused {len(advisories) - len(enriched)}")
+    return advisories
+
+
+def update_advisory_store(sources: list[dict], results: dict, previous: dict) -> list[dict]:
+    """Sync every advisory source that completed, then export the section from the store.
+
+    Sources that failed, timed out or did not run (daemon ticks poll only
+    the sources that are due) are left untouched, so their last known
+    advisories carry through to this run's output. When the store holds
+    nothing for such a source, it is seeded from the previous industry.json
+    (externalIds are prefixed with the source name).
+    """
+    by_ext_id = {a.get("externalId"): a for a in previous.get("advisories") or []}
+    names = [s["name"] for s in sources if s["section"] == "advisories"]
+    conn = init_advisory_store(CACHE_DB)
     try:
-        resp = requests.get(bts_url, params=bts_params, timeout=30)
-        resp.raise_for_status()
-        bts_rows = resp.json()
+        for name in names:
+            if name not in results or results[name]["status"] != "ok":
+                if conn.execute("SELECT 1 FROM advisories WHERE source = ? LIMIT 1", (name,)).fetchone():
+                    continue
+                carried = [a for ext_id, a in by_ext_id.items() if ext_id and ext_id.startswith(f"{name}-")]
+                if carried:
+                    seed_advisories(conn, name, carried)
+                    print(f"  [Advisories] {name}: store empty, kept {len(carried)} advisories from the last run")
+                continue
+            counts = sync_advisories(conn, name, results[name]["records"], by_ext_id)
+            print(
+                f"  [Advisories] {name}: {counts['new']} new, {counts['changed']} changed, "
+                f"{counts['unchanged']} unchanged, {counts['gone']} gone"
+            )
+        return export_advisories(conn, names)
+    finally:
+        conn.close()
+
+
+# --- Orchestration ---
+
+# Independent sources, in the order their records appear in industry.json.
+# "timeout" is per source (seconds from when it starts); the run as a whole
+# is bounded by RUN_DEADLINE so the workflow finishes inside its 15 minutes.
+SOURCES = [
+    {"name": "usda", "section": "metrics", "fetch": fetch_usda_metrics, "timeout": 180},
+    {"name": "eia", "section": "fuelSurcharges", "fetch": fetch_eia_fuel_surcharges, "timeout": 60},
+    {"name": "bnsf", "section": "advisories", "fetch": fetch_bnsf_advisories, "timeout": 60},
+    {"name": "csx", "section": "advisories", "fetch": fetch_csx_advisories, "timeout": 300},
+    {"name": "ns", "section": "advisories", "fetch": fetch_ns_advisories, "timeout": 60},
+    {"name": "up", "section": "advisories", "fetch": fetch_up_advisories, "timeout": 300},
+    {"name": "fra", "section": "advisories", "fetch": fetch_fra_incidents, "timeout": 60},
+    {"name": "stb", "section": "regulatory", "fetch": fetch_stb_news, "timeout": 60},
+    {"name": "freight_trends", "section": "freightTrends", "fetch": scrape_freight_trends, "timeout": 120},
+]
+
+SECTIONS = ["metrics", "fuelSurcharges", "advisories", "regulatory", "freightTrends"]
+
+# Short names --only accepts besides section and source names
+SECTION_ALIASES = {"fuel": "fuelSurcharges", "freight": "freightTrends"}
+
+RUN_DEADLINE = 600
+MAX_WORKERS = 6
+PROBE_TIMEOUT = 60  # a source whose circuit is half-open gets this long to prove itself
+
+
+def _source_worker(source: dict, done: queue.Queue, cancel: threading.Event) -> None:
+    _source_thread.cancel = cancel
+    try:
+        records = source["fetch"]()
+        done.put((source["name"], "ok", records, None, None))
+    except SourceCancelled:
+        print(f"  [{source['name']}] stopped before writing after it was abandoned")
     except Exception as exc:
-        print(f"  [BTS] ERROR: {exc}")
-        bts_rows = []
+        done.put((source["name"], "failed", [], f"{type(exc).__name__}: {exc}", type(exc).__name__))
 
-    print(f"  BTS rows: {len(bts_rows)}")
 
-    # --- FRED series ---
-    ppi_rail = _fetch_fred_csv("PCU48214821", start_year)
-    cass_freight = _fetch_fred_csv("FRGSHPUSM649NCIS", start_year)
-    print(f"  FRED PPI Rail: {len(ppi_rail)} months, Cass Freight: {len(cass_freight)} months")
+def _upstream_failed(name: str) -> bool:
+    """True if a source hit request errors, open circuits or failed solves this run."""
+    h = http.stats(name)
+    return h.get("errors", 0) + h.get("shortCircuits", 0) + solver.failures(name) > 0
+
+
+def _finish_source(name: str, result: dict) -> dict:
+    """Report a finished source to its circuit.
+
+    Fetchers catch their own errors and return nothing, so an empty result
+    from a source whose upstream failed counts as a failure as well. The
+    section then keeps its last good data, as for any other failure.
+    """
+    if result["status"] == "ok" and not result["records"] and _upstream_failed(name):
+        result.update(status="failed", error="upstream unavailable, no records", errorClass="UpstreamUnavailable")
+    if result["status"] == "ok":
+        health.success(f"source:{name}", result["elapsed"])
+    elif result["errorClass"] != "RunDeadline":
+        health.failure(f"source:{name}", result["error"] or result["status"], result["elapsed"])
+    return result
 
-    # --- Merge by month key (YYYY-MM) ---
-    merged = {}
 
-    for row in bts_rows:
-        raw_date = row.get("obs_date", "")
-        date = raw_date[:10]  # strip "T00:00:00.000" suffix
-        if not date:
+def run_sources(sources: list[dict], max_workers: int = MAX_WORKERS, deadline: float = RUN_DEADLINE) -> dict:
+    """Run sources concurrently, each with its own timeout, under an overall deadline.
+
+    Workers are daemon threads: a source that overruns is abandoned rather than
+    joined, so a hung upstream can never hold the process open. An abandoned
+    source is cancelled, so it raises SourceCancelled at its next store
+    write (see check_cancelled) instead of writing while the caller exports. A source
+    whose circuit is open is skipped without starting. A half-open source
+    runs as a probe with at most PROBE_TIMEOUT. Returns
+    {name: {"status", "records", "error", "errorClass", "elapsed"}} where
+    status is one of ok / failed / timeout / skipped.
+    """
+    done: queue.Queue = queue.Queue()
+    pending = list(sources)
+    running = {}  # name -> (source, started, cancel event)
+    results = {}
+    run_start = time.monotonic()
+
+    while pending or running:
+        now = time.monotonic()
+        if now - run_start >= deadline:
+            for name, (_, started, cancel) in running.items():
+                cancel.set()
+                results[name] = {"status": "timeout", "records": [], "error": "run deadline reached",
+                                 "errorClass": "RunDeadline", "elapsed": now - started}
+            for source in pending:
+                results[source["name"]] = {"status": "skipped", "records": [], "error": "run deadline reached",
+                                           "errorClass": "RunDeadline", "elapsed": 0.0}
+            break
+
+        while pending and len(running) < max_workers:
+            source = pending.pop(0)
+            circuit = f"source:{source['name']}"
+            if not health.allow(circuit):
+                failures = health.snapshot(circuit)["consecutiveFailures"]
+                results[source["name"]] = {"status": "skipped", "records": [], "errorClass": "CircuitOpen",
+                                           "error": f"circuit open after {failures} consecutive failures", "elapsed": 0.0}
+                print(f"  [{source['name']}] circuit open, skipped")
+                continue
+            if health.probing(circuit):
+                source = dict(source, timeout=min(source["timeout"], PROBE_TIMEOUT))
+                print(f"  [{source['name']}] circuit half-open, probing")
+            cancel = threading.Event()
+            running[source["name"]] = (source, time.monotonic(), cancel)
+            threading.Thread(target=_source_worker, args=(source, done, cancel), daemon=True).start()
+
+        try:
+            name, status, records, error, error_class = done.get(timeout=0.25)
+        except queue.Empty:
+            pass
+        else:
+            # Late results from sources already marked as timed out are dropped
+            if name in running:
+                _, started, _ = running.pop(name)
+                results[name] = _finish_source(name, {"status": status, "records": records or [], "error": error,
+                                                      "errorClass": error_class, "elapsed": time.monotonic() - started})
+
+        now = time.monotonic()
+        for name, (source, started, cancel) in list(running.items()):
+            if now - started > source["timeout"]:
+                cancel.set()
+                del running[name]
+                results[name] = _finish_source(name, {"status": "timeout", "records": [], "error": f"exceeded {source['timeout']}s",
+                                                      "errorClass": "SourceTimeout", "elapsed": now - started})
+                print(f"  [{name}] timed out after {source['timeout']}s")
+
+    return results
+
+
+def select_sources(sources: list[dict], spec: str) -> list[dict]:
+    """The sources named by an --only list: sections, SECTION_ALIASES or source names, comma-separated."""
+    def norm(name: str) -> str:
+        return name.lower().replace("-", "").replace("_", "")
+
+    sections = {norm(section): section for section in SECTIONS}
+    wanted = set()
+    for token in filter(None, (t.strip() for t in spec.split(","))):
+        section = SECTION_ALIASES.get(token.lower()) or sections.get(norm(token))
+        names = {s["name"] for s in sources if s["section"] == section or norm(s["name"]) == norm(token)}
+        if not names:
+            raise ValueError(f"unknown section or source: {token}")
+        wanted |= names
+    return [s for s in sources if s["name"] in wanted]
+
+
+def build_payload(sources: list[dict], results: dict) -> dict:
+    payload = {section: [] for section in SECTIONS}
+    for source in sources:
+        payload[source["section"]].extend(results[source["name"]]["records"])
+    payload["scrapedAt"] = NOW_ISO
+    return payload
+
+
+# --- Output ---
+
+def load_previous_payload(path: Path) -> dict:
+    try:
+        with open(path, encoding="utf-8") as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return {}
+
+
+def carry_forward(payload: dict, previous: dict) -> None:
+    """Keep createdAt (and run-time-defaulted issuedAt / publishedAt) from the previous file for records that persist."""
+    for section in SECTIONS:
+        prev_by_id = {r["id"]: r for r in previous.get(section) or [] if isinstance(r, dict) and "id" in r}
+        for record in payload[section]:
+            prev = prev_by_id.get(record.get("id"))
+            if not prev:
+                continue
+            if prev.get("createdAt"):
+                record["createdAt"] = prev["createdAt"]
+            # Undated advisories and STB items fall back to NOW_ISO; keep the date we first saw them
+            for field in ("issuedAt", "publishedAt"):
+                if record.get(field) == NOW_ISO and prev.get(field):
+                    record[field] = prev[field]
+
+
+def stamp_sections(payload: dict, previous: dict, sources: list[dict], results: dict) -> None:
+    """Set payload["sourceScrapedAt"] and payload["sectionScrapedAt"].
+
+    A source that succeeded this run is stamped NOW_ISO when its section's
+    records changed; any other keeps its previous stamp. An unchanged run
+    therefore leaves every stamp alone and write_outputs can skip the write.
+    A section's stamp is the oldest of its sources' stamps, so `--only csx`
+    does not make all of advisories look fresh. Pass every source, not just
+    the ones that ran, and call this after carry_forward. A file written
+    before sources had their own stamps falls back to its section stamp,
+    then its scrapedAt.
+    """
+    before = previous.get("sourceScrapedAt") or {}
+    before_sections = previous.get("sectionScrapedAt") or {}
+    current, last = semantic_view(payload), semantic_view(previous)
+    source_stamps, stamps = {}, {}
+    for section in SECTIONS:
+        names = [s["name"] for s in sources if s["section"] == section]
+        changed = current[section] != last[section]
+        for name in names:
+            if changed and name in results and results[name]["status"] == "ok":
+                source_stamps[name] = NOW_ISO
+            elif before.get(name) or before_sections.get(section) or previous.get("scrapedAt"):
+                source_stamps[name] = before.get(name) or before_sections.get(section) or previous["scrapedAt"]
+        known = [source_stamps[n] for n in names if n in source_stamps]
+        if known:
+            stamps[section] = min(known)
+    payload["sourceScrapedAt"] = source_stamps
+    payload["sectionScrapedAt"] = stamps
+
+
+def reuse_failed_sections(payload: dict, previous: dict, sources: list[dict], results: dict) -> list[str]:
+    """Keep the previous run's records for sections none of whose sources succeeded.
+
+    Advisories included: the store carries failed sources forward one by
+    one, but when every advisory source failed the previous section is
+    the safer answer, whatever state the store was restored in. Returns
+    the sections that were reused.
+    """
+    reused = []
+    for section in SECTIONS:
+        if not previous.get(section):
             continue
-        month_key = date[:7]
-        merged[month_key] = {
-            "date": date,
-            "carloads": safe_float(row.get("rail_frt_carloads")),
-            "carloadsSA": safe_float(row.get("rail_frt_carloads_d11")),
-            "intermodal": safe_float(row.get("rail_frt_intermodal")),
-            "intermodalSA": safe_float(row.get("rail_frt_intermodal_d11")),
-            "tsiFreight": safe_float(row.get("tsi_freight")),
-            "ppiRail": None,
-            "cassFreight": None,
-        }
+        names = [s["name"] for s in sources if s["section"] == section]
+        if names and all(results[n]["status"] != "ok" for n in names):
+            payload[section] = previous[section]
+            reused.append(section)
+            print(f"  [{section}] {', '.join(names)} unavailable; keeping {len(previous[section])} records from the last run")
+    return reused
+
+
+def semantic_view(payload: dict) -> dict:
+    """Payload sections without run metadata (scrapedAt and the stamps), in a canonical record order."""
+    return {
+        section: sorted(payload.get(section) or [], key=lambda r: json.dumps(r, sort_keys=True))
+        for section in SECTIONS
+    }
 
-    for month_key, value in ppi_rail.items():
-        if month_key in merged:
-            merged[month_key]["ppiRail"] = value
+
+STAMP_KEYS = ("sectionScrapedAt", "sourceScrapedAt")
+
+
+def write_outputs(payload: dict, previous: dict, shards_if_unchanged: bool = True) -> tuple[dict, bool, int]:
+    """Write industry.json unless it is semantically unchanged, then the shards.
+
+    An unchanged payload keeps the previous records and scrapedAt, so the
+    data shards stay byte-identical. stamp_sections only advances stamps
+    for changed sections, so its stamps normally match too; they differ
+    only when an older file without sourceScrapedAt is first restamped,
+    and then only industry.json and meta.json are rewritten.
+
+    Returns (the payload now on disk, whether it was unchanged, shard files
+    rewritten). Shards are rebuilt even for an unchanged payload unless
+    shards_if_unchanged is False.
+    """
+    unchanged = bool(previous) and semantic_view(payload) == semantic_view(previous)
+    if unchanged:
+        stamps = {key: payload.get(key) or {} for key in STAMP_KEYS}
+        restamped = any(previous.get(key) != value for key, value in stamps.items())
+        payload = dict(previous, **stamps)
+    if not unchanged or restamped:
+        OUTPUT.parent.mkdir(parents=True, exist_ok=True)
+        with open(OUTPUT, "w", encoding="utf-8") as fh:
+            json.dump(payload, fh, indent=2, ensure_ascii=False)
+    if unchanged and not shards_if_unchanged:
+        return payload, True, _write_json(SHARD_DIR / "meta.json", shard_meta(payload))
+    written = write_shards(payload)
+    written += write_fra_rollups()
+    written += write_metric_analytics()
+    written += write_facility_join(payload["advisories"])
+    return payload, unchanged, written
+
+
+# --- Derived indexes ---
+
+METRIC_SERIES_WEEKS = 12
+
+
+def metric_key(m: dict) -> str:
+    # Same key lib/industry/queries.ts uses for metric lookups
+    return f"{m['railroad']}-{m['metricType']}-{m.get('commodity') or ''}"
+
+
+def metric_series_from_history(db_path: Path = None) -> dict[str, dict[str, float]]:
+    """{metric key: {reportWeek: value}} over each dataset's last METRIC_SERIES_WEEKS weeks in usda_history."""
+    db_path = db_path or CACHE_DB
+    by_key: dict[str, dict[str, float]] = {}
+    if not db_path.exists():
+        return by_key
+    conn = init_usda_store(db_path)
+    try:
+        for ds in USDA_DATASETS:
+            weeks = [w for (w,) in conn.execute(
+                "SELECT DISTINCT report_week FROM usda_history WHERE dataset = ? "
+                "ORDER BY report_week DESC LIMIT ?",
+                (ds["id"], METRIC_SERIES_WEEKS),
+            )]
+            if not weeks:
+                continue
+            for report_week, railroad, commodity, value in usda_weekly_rows(conn, ds, weeks[-1]):
+                key = metric_key({"railroad": railroad, "metricType": ds["metricType"], "commodity": commodity})
+                by_key.setdefault(key, {})[f"{report_week}T00:00:00.000Z"] = value
+    finally:
+        conn.close()
+    return by_key
+
+
+def build_metric_trends(metrics: list[dict], db_path: Path = None) -> dict:
+    """Latest-week rows with previous value and % change, plus a series per key.
+
+    Mirrors what getLatestMetrics used to compute per request: each metric
+    type's latest report week (datasets report on different days), compared
+    against that type's previous report week. One pass groups rows by type
+    and week, so the cost is linear in the number of rows. industry.json
+    only holds USDA_OUTPUT_WEEKS weeks, so the METRIC_SERIES_WEEKS series
+    come from usda_history; the payload rows fill in when the history is
+    missing (e.g. --shards-only on a fresh checkout).
+    """
+    db_path = db_path or CACHE_DB
+    by_type_week: dict[str, dict[str, list[dict]]] = {}
+    for m in metrics:
+        by_type_week.setdefault(m["metricType"], {}).setdefault(m["reportWeek"], []).append(m)
+
+    latest = []
+    for weeks in by_type_week.values():
+        ordered = sorted(weeks, reverse=True)
+        prev_values = {}
+        if len(ordered) > 1:
+            prev_values = {metric_key(m): m["value"] for m in weeks[ordered[1]]}
+        for m in weeks[ordered[0]]:
+            previous = prev_values.get(metric_key(m))
+            entry = dict(m)
+            if previous is not None:
+                entry["previousValue"] = previous
+                if previous != 0:
+                    entry["changePercent"] = (m["value"] - previous) / previous * 100
+            latest.append(entry)
+    latest.sort(key=lambda m: (m["railroad"], m["metricType"]))
+
+    by_key = metric_series_from_history(db_path)
+    for m in metrics:
+        by_key.setdefault(metric_key(m), {}).setdefault(m["reportWeek"], m["value"])
+    series = {
+        key: [{"reportWeek": w, "value": values[w]} for w in sorted(values)[-METRIC_SERIES_WEEKS:]]
+        for key, values in by_key.items()
+    }
+    return {"latest": latest, "series": series}
+
+
+# --- Advisory → facility join ---
+#
+# Facilities are bucketed once into a lat/lon grid. An advisory with explicit
+# pinned locations ("City, ST", a yard or a subdivision) affects the
+# facilities within AFFECTED_RADIUS_MILES of any of them. A bare city name is
+# not trusted for a radius. An advisory without explicit points affects the
+# facilities in the states it names, but only when its railroad serves
+# facilities here. Otherwise a statewide FRA incident would mark every
+# plant in Texas. When the advisory's railroad appears among the facilities'
+# carriers, radius matches are also limited to facilities that railroad
+# serves. Facilities with coordinates but no usable state get one from the
+# state polygons.
+
+AFFECTED_RADIUS_MILES = 25.0
+# Advisory railroad → facility railroad names (lib/railroads.ts facilityNames)
+FACILITY_RAILROAD_NAMES = {"CPKC": {"CPKC", "CP", "KCS"}, "AMTRAK": {"AMTK"}}
+
+
+def load_facilities(path: Path = FACILITIES_JSON) -> list[dict]:
+    """Facilities reduced to what the join needs: id, type, state, lat, lon, railroads."""
+    if not path.exists():
+        return []
+    polygons = None
+    facilities = []
+    for f in json.loads(path.read_text(encoding="utf-8")):
+        loc = f.get("location") or {}
+        lat, lon = safe_float(loc.get("latitude")), safe_float(loc.get("longitude"))
+        if lat is None or lon is None or (lat == 0 and lon == 0):
+            lat = lon = None
+        state = (loc.get("state") or "").strip()
+        state = NAME_TO_CODE.get(state.lower(), state.upper())
+        if state not in STATE_NAMES and lat is not None:
+            if polygons is None:
+                polygons = StatePolygons(STATES_GEOJSON)
+            state = polygons.state_at(lat, lon)
+        facilities.append({
+            "id": str(f["id"]),
+            "type": f.get("type") or "unknown",
+            "state": state if state in STATE_NAMES else None,
+            "lat": lat,
+            "lon": lon,
+            "railroads": {(r.get("railroad") or {}).get("name") for r in f.get("railroads") or []} - {None},
+        })
+    return facilities
+
+
+def build_facility_join(advisories: list[dict], facilities: list[dict], radius: float = AFFECTED_RADIUS_MILES) -> tuple[dict, dict]:
+    """({advisory slug: {scope, count, byType, facilityIds}}, {facility id: [advisory slugs]}) for active advisories."""
+    grid = GridIndex()
+    by_state: dict[str, list[dict]] = {}
+    known_railroads = set()
+    for f in facilities:
+        if f["lat"] is not None:
+            grid.insert(f["id"], f["lat"], f["lon"])
+        if f["state"]:
+            by_state.setdefault(f["state"], []).append(f)
+        known_railroads |= f["railroads"]
+    by_id = {f["id"]: f for f in facilities}
+
+    by_advisory, by_facility = {}, {}
+    for a in advisories:
+        if not a.get("isActive") or not a.get("slug") or a["slug"] in by_advisory:
+            continue
+        railroad = a.get("railroad") or ""
+        names = FACILITY_RAILROAD_NAMES.get(railroad.upper(), {railroad})
+        served = names if names & known_railroads else None
+
+        points = [p for p in a.get("locations") or [] if p.get("lat") is not None and p.get("explicit")]
+        if points:
+            scope = "radius"
+            ids = {fid for p in points for fid, _ in grid.within(p["lat"], p["lon"], radius)}
+        elif served:
+            scope = "state"
+            states = {s.strip() for s in (a.get("affectedArea") or "").split(",")}
+            ids = {f["id"] for s in states for f in by_state.get(s, ())}
         else:
-            merged[month_key] = {
-                "date": f"{month_key}-01",
-                "carloads": None,
-                "carloadsSA": None,
-                "intermodal": None,
-                "intermodalSA": None,
-                "tsiFreight": None,
-                "ppiRail": value,
-                "cassFreight": None,
-            }
+            continue
+        if served:
+            ids = {fid for fid in ids if by_id[fid]["railroads"] & served}
+        if not ids:
+            continue
+
+        ordered = sorted(ids)
+        by_type: dict[str, int] = {}
+        for fid in ordered:
+            by_type[by_id[fid]["type"]] = by_type.get(by_id[fid]["type"], 0) + 1
+            by_facility.setdefault(fid, []).append(a["slug"])
+        by_advisory[a["slug"]] = {"scope": scope, "count": len(ordered), "byType": by_type, "facilityIds": ordered}
+    return by_advisory, dict(sorted(by_facility.items()))
+
+
+def write_facility_join(advisories: list[dict], shard_dir: Path = None) -> int:
+    """Write advisory-facilities.json and facility-advisories.json. Skipped without facilities.json."""
+    shard_dir = shard_dir or SHARD_DIR
+    facilities = load_facilities()
+    if not facilities:
+        print(f"  [JOIN] facility join skipped: no facilities in {FACILITIES_JSON}")
+        return 0
+    by_advisory, by_facility = build_facility_join(advisories, facilities)
+    return (
+        _write_json(shard_dir / "advisory-facilities.json", by_advisory)
+        + _write_json(shard_dir / "facility-advisories.json", by_facility)
+    )
+
+
+# --- Shards ---
+#
+# The site never loads industry.json whole. Each section is written to its
+# own file under public/industry/, list pages read a compact index, and
+# detail pages read one small file per slug:
+#
+#   meta.json                     scrapedAt (per section too) + headline counts
+#   metrics.json, fuel-surcharges.json, advisories.json,
+#   regulatory.json, freight-trends.json
+#   advisories-index.json         active advisories, list fields only (see advisory_index_entry)
+#   regulatory-index.json         regulatory items without body content
+#   metric-trends.json            latest metrics with trend + series per key
+#   metric-analytics.json         rolling avg, YoY and z-scores per key (see build_metric_analytics)
+#   advisory-facilities.json, facility-advisories.json   (see write_facility_join)
+#   advisories/<slug>.json, regulatory/<slug>.json
+#
+# With --columnar the sections in COLUMNAR_SECTIONS are written as columns
+# instead of records (see encode_columns); decodeColumns in
+# lib/industry/queries.ts reads either form.
+
+SECTION_FILES = {
+    "metrics": "metrics.json",
+    "fuelSurcharges": "fuel-surcharges.json",
+    "advisories": "advisories.json",
+    "regulatory": "regulatory.json",
+    "freightTrends": "freight-trends.json",
+}
+
+COLUMNAR_SECTIONS = ("metrics", "freightTrends")
+columnar_output = False   # set by --columnar
+
+INDEX_TEXT_LIMIT = 200
+
 
-    for month_key, value in cass_freight.items():
-        if month_key in merged:
-            merged[month_key]["cassFreight"] = value
+def _truncate(text, limit: int = INDEX_TEXT_LIMIT):
+    if not text or len(text) <= limit:
+        return text
+    return text[: limit - 3].rstrip() + "..."
+
+
+def advisory_index_entry(a: dict) -> dict:
+    """The fields list pages filter, sort and map on; cards load the description from advisories/<slug>.json."""
+    states = [s.strip() for s in (a.get("affectedArea") or "").split(",") if s.strip() in STATE_NAMES]
+    return {
+        "id": a["id"], "slug": a["slug"], "title": a["title"], "railroad": a["railroad"],
+        "advisoryType": a["advisoryType"], "issuedAt": a["issuedAt"], "states": states,
+    }
+
+
+def _write_json(path: Path, data, compact: bool = False) -> bool:
+    """Write data as JSON unless the file already holds exactly that. Returns True if written."""
+    if compact:
+        text = json.dumps(data, separators=(",", ":"), ensure_ascii=False)
+    else:
+        text = json.dumps(data, indent=2, ensure_ascii=False)
+    try:
+        if path.read_text(encoding="utf-8") == text:
+            return False
+    except OSError:
+        pass
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text, encoding="utf-8")
+    return True
+
+
+def encode_columns(records: list[dict]) -> dict:
+    """Struct-of-arrays form of a list of flat records.
+
+    {"format": "columns", "length": n, "columns": {key: column}}, where a
+    column is the plain list of values or, for a string column with few
+    distinct values, {"dict": [distinct values], "codes": [index per row]}.
+    Keys a record lacks decode as null.
+    """
+    keys = list(dict.fromkeys(k for r in records for k in r))
+    columns = {}
+    for key in keys:
+        values = [r.get(key) for r in records]
+        distinct = list(dict.fromkeys(values))
+        if all(isinstance(v, str) or v is None for v in distinct) and len(distinct) <= len(values) // 2:
+            index = {v: i for i, v in enumerate(distinct)}
+            columns[key] = {"dict": distinct, "codes": [index[v] for v in values]}
         else:
-            merged[month_key] = {
-                "date": f"{month_key}-01",
-                "carloads": None,
-                "carloadsSA": None,
-                "intermodal": None,
-                "intermodalSA": None,
-                "tsiFreight": None,
-                "ppiRail": None,
-                "cassFreight": value,
-            }
+            columns[key] = values
+    return {"format": "columns", "length": len(records), "columns": columns}
 
-    trends = sorted(merged.values(), key=lambda r: r["date"], reverse=True)
-    print(f"  Freight trends: {len(trends)} months")
-    return trends
 
+def _write_slug_files(directory: Path, records: list[dict]) -> int:
+    """One file per slug (first record wins on a collision); stale slug files are removed."""
+    written, keep = 0, set()
+    for record in records:
+        if not record.get("slug"):
+            continue
+        name = f"{record['slug']}.json"
+        if name in keep:
+            continue
+        keep.add(name)
+        written += _write_json(directory / name, record)
+    if directory.exists():
+        for path in directory.glob("*.json"):
+            if path.name not in keep:
+                path.unlink()
+    return written
+
+
+def shard_meta(payload: dict) -> dict:
+    """meta.json: run and section stamps plus headline counts."""
+    advisories = payload["advisories"]
+    active = [a for a in advisories if a.get("isActive")]
+    return {
+        "scrapedAt": payload["scrapedAt"],
+        "sectionScrapedAt": payload.get("sectionScrapedAt") or {},
+        "counts": {
+            "metrics": len(payload["metrics"]),
+            "fuelSurcharges": len(payload["fuelSurcharges"]),
+            "advisories": len(advisories),
+            "activeAdvisories": len(active),
+            "activeEmbargoes": sum(1 for a in active if a.get("advisoryType") == "EMBARGO"),
+            "regulatory": len(payload["regulatory"]),
+            "freightTrends": len(payload["freightTrends"]),
+        },
+    }
 
-# --- Main ---
 
-def main() -> None:
-    import os
+def write_shards(payload: dict, shard_dir: Path = None) -> int:
+    """Split a payload into the files listed above. Returns the number of files rewritten."""
+    shard_dir = shard_dir or SHARD_DIR
+    advisories = payload["advisories"]
+    written = _write_json(shard_dir / "meta.json", shard_meta(payload))
+    for section, filename in SECTION_FILES.items():
+        if columnar_output and section in COLUMNAR_SECTIONS:
+            written += _write_json(shard_dir / filename, encode_columns(payload[section]), compact=True)
+        else:
+            written += _write_json(shard_dir / filename, payload[section])
+
+    advisory_index = [advisory_index_entry(a) for a in advisories if a.get("isActive")]
+    regulatory_index = [
+        {k: v for k, v in dict(u, summary=_truncate(u.get("summary"))).items() if k not in ("content", "createdAt")}
+        for u in payload["regulatory"]
+    ]
+    written += _write_json(shard_dir / "metric-trends.json", build_metric_trends(payload["metrics"]))
+    written += _write_json(shard_dir / "advisories-index.json", advisory_index, compact=True)
+    written += _write_json(shard_dir / "regulatory-index.json", regulatory_index)
+
+    written += _write_slug_files(shard_dir / "advisories", advisories)
+    written += _write_slug_files(shard_dir / "regulatory", payload["regulatory"])
+    return written
+
+
+def print_run_report(sources: list[dict], results: dict) -> None:
+    print("\n=== Sources ===")
+    for source in sources:
+        r = results[source["name"]]
+        h = http.stats(source["name"])
+        line = f"  {source['name']:<15} {r['status']:<8} {r['elapsed']:6.1f}s  {len(r['records'])} records"
+        if h:
+            line += (
+                f"  [{h['requests']} req, {h['bytes'] / 1024:.0f} KB, {h['seconds']:.1f}s http"
+                f", {h['notModified']} not modified, {h['retries']} retries"
+                + (f", {h['hedges']} hedged ({h['hedgeWins']} won)" if h["hedges"] else "")
+                + "]"
+            )
+        cf = solver.timings(source["name"])
+        if cf:
+            line += f"  [cloudflare: {cf['solveCount']} solves {cf['solveSeconds']:.1f}s, {cf['fetchCount']} fetches {cf['fetchSeconds']:.1f}s]"
+        circuit = health.snapshot(f"source:{source['name']}")
+        if circuit["state"] != "closed" and r["errorClass"] != "CircuitOpen":
+            line += f"  [circuit {circuit['state']}, {circuit['consecutiveFailures']} consecutive failures]"
+        if r["error"]:
+            line += f"  ({r['error']})"
+        print(line)
+    down = {host: h for host, h in health.hosts().items() if h["state"] != "closed"}
+    for host, h in down.items():
+        print(f"  host {host}: circuit {h['state']}, {h['consecutiveFailures']} failures, {h['shortCircuits']} requests skipped ({h['lastError']})")
+
+
+# --- Run manifest ---
+
+HISTORY_RUNS = 90           # runs kept in RUN_HISTORY
+TREND_WINDOW = 10           # trailing runs the median is taken over
+LATENCY_REGRESSION = 1.5    # flag when wall time exceeds 1.5x the median...
+LATENCY_FLOOR = 5.0         # ...and by at least this many seconds
+YIELD_REGRESSION = 0.5      # flag when records fall below half the median
+
+
+def build_manifest(sources: list[dict], results: dict, wall_seconds: float) -> dict:
+    """Per-source telemetry for this run.
+
+    parseSeconds is the source's wall time not spent waiting on HTTP or
+    Cloudflare solves; each source runs on a single thread, so that is the
+    time spent parsing and building records.
+    """
+    entries = {}
+    for source in sources:
+        name = source["name"]
+        r = results[name]
+        h = http.stats(name)
+        cf = solver.timings(name)
+        network = h.get("seconds", 0.0) + cf.get("solveSeconds", 0.0) + cf.get("fetchSeconds", 0.0)
+        entries[name] = {
+            "status": r["status"],
+            "errorClass": r.get("errorClass"),
+            "error": r["error"],
+            "wallSeconds": round(r["elapsed"], 3),
+            "httpRequests": h.get("requests", 0),
+            "httpBytes": h.get("bytes", 0),
+            "httpSeconds": round(h.get("seconds", 0.0), 3),
+            "notModified": h.get("notModified", 0),
+            "retries": h.get("retries", 0),
+            "hedges": h.get("hedges", 0),
+            "cloudflareSeconds": round(cf.get("solveSeconds", 0.0) + cf.get("fetchSeconds", 0.0), 3),
+            "parseSeconds": round(max(0.0, r["elapsed"] - network), 3),
+            "records": len(r["records"]),
+            "shortCircuits": h.get("shortCircuits", 0),
+            "circuit": health.snapshot(f"source:{name}"),
+        }
+    return {"scrapedAt": NOW_ISO, "wallSeconds": round(wall_seconds, 3), "sources": entries,
+            "hosts": health.hosts(), "flags": []}
+
+
+def load_run_history(path: Path = RUN_HISTORY) -> list[dict]:
+    if not path.exists():
+        return []
+    runs = []
+    for line in path.read_text(encoding="utf-8").splitlines():
+        try:
+            runs.append(json.loads(line))
+        except ValueError:
+            continue
+    return runs
+
+
+def append_run_history(manifest: dict, path: Path = RUN_HISTORY) -> None:
+    runs = load_run_history(path)[-(HISTORY_RUNS - 1):] + [manifest]
+    path.write_text("".join(json.dumps(run, separators=(",", ":")) + "\n" for run in runs), encoding="utf-8")
 
-    output_path = os.path.join(
-        os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
-        "public",
-        "industry.json",
-    )
 
-    print("=== Rail Industry Scraper ===")
+def _median(values: list[float]) -> float:
+    ordered = sorted(values)
+    mid = len(ordered) // 2
+    return ordered[mid] if len(ordered) % 2 else (ordered[mid - 1] + ordered[mid]) / 2
 
-    metrics = fetch_usda_metrics()
-    fuel_surcharges = fetch_eia_fuel_surcharges()
 
-    bnsf_advisories = fetch_bnsf_advisories()
-    csx_advisories = fetch_csx_advisories()
-    ns_advisories = fetch_ns_advisories()
-    up_advisories = fetch_up_advisories()
-    fra_incidents = fetch_fra_incidents()
-    advisories = bnsf_advisories + csx_advisories + ns_advisories + up_advisories + fra_incidents
+def flag_regressions(manifest: dict, history: list[dict]) -> list[dict]:
+    """Sources whose latency or yield regressed against their trailing median.
 
-    stb_records = fetch_stb_news()
-    regulatory = stb_records
+    Only past runs where the source succeeded count towards its median.
+    """
+    flags = []
+    for name, entry in manifest["sources"].items():
+        past = [
+            run["sources"][name] for run in history[-TREND_WINDOW:]
+            if run.get("sources", {}).get(name, {}).get("status") == "ok"
+        ]
+        if not past:
+            continue
+
+        median_wall = _median([p["wallSeconds"] for p in past])
+        wall = entry["wallSeconds"]
+        if wall > median_wall * LATENCY_REGRESSION and wall - median_wall >= LATENCY_FLOOR:
+            flags.append({"source": name, "metric": "wallSeconds", "value": wall, "median": median_wall})
+
+        median_records = _median([p["records"] for p in past])
+        if entry["status"] == "ok" and entry["records"] < median_records * YIELD_REGRESSION:
+            flags.append({"source": name, "metric": "records", "value": entry["records"], "median": median_records})
+
+        if entry["status"] != "ok":
+            flags.append({"source": name, "metric": "status", "value": entry["status"], "median": None})
+    return flags
+
+
+def write_manifest(manifest: dict, path: Path = None) -> None:
+    path = path or MANIFEST
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(manifest, indent=2) + "\n", encoding="utf-8")
+
+
+def print_regressions(flags: list[dict]) -> None:
+    if not flags:
+        return
+    print("\n=== Regressions vs trailing median ===")
+    for flag in flags:
+        baseline = "usually ok" if flag["median"] is None else f"median {flag['median']}"
+        print(f"  {flag['source']:<15} {flag['metric']:<12} {flag['value']} ({baseline})")
+
+
+# --- Daemon ---
+#
+# --daemon keeps the process running and polls each source on its own
+# cadence instead of everything once a day. After every poll the interval
+# adapts: when the source's records changed it halves (down to the fastest
+# cadence), and when they did not it grows by half (up to the slowest). So
+# embargo listings are checked every few minutes while they move, and
+# weekly datasets settle near a daily check. Intervals, due times and the
+# last record digest persist in CACHE_DB, so a restart resumes the schedule.
+# Each tick runs only the due sources through run_sources (same timeouts
+# and circuit breakers), merges their sections into the existing
+# industry.json and rewrites only what changed.
+
+# (initial, fastest, slowest) seconds between polls
+POLL_CADENCE = {
+    "usda": (6 * 3600, 3600, 24 * 3600),
+    "eia": (6 * 3600, 3600, 24 * 3600),
+    "bnsf": (900, 300, 2 * 3600),
+    "csx": (1800, 600, 4 * 3600),   # every poll may cost a Cloudflare solve
+    "ns": (900, 300, 2 * 3600),
+    "up": (1800, 600, 4 * 3600),
+    "fra": (6 * 3600, 2 * 3600, 24 * 3600),
+    "stb": (3600, 900, 6 * 3600),
+    "freight_trends": (12 * 3600, 6 * 3600, 7 * 24 * 3600),
+}
+POLL_TIGHTEN = 0.5
+POLL_BACKOFF = 1.5
+POLL_JITTER = 0.1     # +/- fraction of the interval, so sources drift apart
+POLL_IDLE_MAX = 60    # longest sleep between checks for due sources
+
+
+def init_poll_store(db_path: Path) -> sqlite3.Connection:
+    conn = sqlite3.connect(db_path)
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS poll_schedule "
+        "(source TEXT PRIMARY KEY, interval REAL, next_run REAL, digest TEXT, "
+        "last_change TEXT, polls INTEGER, changes INTEGER)"
+    )
+    conn.commit()
+    return conn
 
-    freight_trends = scrape_freight_trends()
 
-    payload = {
-        "metrics": metrics,
-        "fuelSurcharges": fuel_surcharges,
-        "advisories": advisories,
-        "regulatory": regulatory,
-        "freightTrends": freight_trends,
-        "scrapedAt": NOW_ISO,
+def load_schedule(conn: sqlite3.Connection, sources: list[dict]) -> dict:
+    """{source: row} for every source; new sources are due at once at their initial cadence."""
+    rows = {
+        r[0]: {"interval": r[1], "next_run": r[2], "digest": r[3], "last_change": r[4], "polls": r[5], "changes": r[6]}
+        for r in conn.execute(
+            "SELECT source, interval, next_run, digest, last_change, polls, changes FROM poll_schedule"
+        )
     }
+    for source in sources:
+        rows.setdefault(source["name"], {
+            "interval": float(POLL_CADENCE[source["name"]][0]), "next_run": 0.0, "digest": None,
+            "last_change": None, "polls": 0, "changes": 0,
+        })
+    return rows
+
+
+def save_schedule(conn: sqlite3.Connection, schedule: dict) -> None:
+    conn.executemany(
+        "INSERT OR REPLACE INTO poll_schedule (source, interval, next_run, digest, last_change, polls, changes) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+        [(name, r["interval"], r["next_run"], r["digest"], r["last_change"], r["polls"], r["changes"])
+         for name, r in schedule.items()],
+    )
+    conn.commit()
+
+
+def records_digest(records: list[dict]) -> str:
+    """Order-independent hash of a source's records, ignoring run timestamps."""
+    stamped = ("createdAt", "updatedAt")
+    rows = sorted(
+        json.dumps({k: v for k, v in r.items() if k not in stamped and v != NOW_ISO}, sort_keys=True)
+        for r in records
+    )
+    return hashlib.sha1("\n".join(rows).encode()).hexdigest()
+
+
+def reschedule(row: dict, name: str, result: dict, now: float) -> bool:
+    """Adapt one source's interval to this poll's outcome. Returns True if its records changed."""
+    _, fastest, slowest = POLL_CADENCE[name]
+    changed = False
+    row["polls"] += 1
+    if result["status"] == "ok":
+        digest = records_digest(result["records"])
+        changed = row["digest"] is not None and digest != row["digest"]
+        if changed:
+            row["changes"] += 1
+            row["last_change"] = NOW_ISO
+            row["interval"] = max(fastest, row["interval"] * POLL_TIGHTEN)
+        elif row["digest"] is not None:
+            row["interval"] = min(slowest, row["interval"] * POLL_BACKOFF)
+        row["digest"] = digest
+    # Failures keep their interval; the circuit breaker decides when to probe
+    row["next_run"] = now + row["interval"] * random.uniform(1 - POLL_JITTER, 1 + POLL_JITTER)
+    return changed
+
+
+def merge_payload(previous: dict, sources: list[dict], results: dict) -> dict:
+    """The previous payload with every section whose sources all ran this tick rebuilt.
+
+    Sections whose sources all failed keep their previous records, as in a
+    full run. Advisories come from the store (update_advisory_store).
+    """
+    payload = {section: list(previous.get(section) or []) for section in SECTIONS}
+    for section in SECTIONS:
+        names = [s["name"] for s in sources if s["section"] == section]
+        if section == "advisories" or not names or not all(n in results for n in names):
+            continue
+        if any(results[n]["status"] == "ok" for n in names):
+            payload[section] = [r for n in names for r in results[n]["records"]]
+    payload["advisories"] = update_advisory_store(sources, results, previous)
+    payload["scrapedAt"] = NOW_ISO
+    return payload
+
+
+def run_daemon(
+    max_workers: int = MAX_WORKERS, deadline: float = RUN_DEADLINE, max_ticks: int = None, sources: list[dict] = SOURCES,
+) -> None:
+    global NOW_ISO
+
+    conn = init_poll_store(CACHE_DB)
+    schedule = load_schedule(conn, sources)
+    ticks = 0
+    try:
+        while max_ticks is None or ticks < max_ticks:
+            now = time.time()
+            due = [s for s in sources if schedule[s["name"]]["next_run"] <= now]
+            if not due:
+                wake = min(schedule[s["name"]]["next_run"] for s in sources)
+                time.sleep(min(max(wake - now, 1), POLL_IDLE_MAX))
+                continue
+
+            ticks += 1
+            NOW_ISO = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.000Z")
+            print(f"\n=== Tick {ticks} at {NOW_ISO}: {', '.join(s['name'] for s in due)} ===")
+            results = run_sources(due, max_workers=max_workers, deadline=deadline)
+            changed = [s["name"] for s in due if reschedule(schedule[s["name"]], s["name"], results[s["name"]], time.time())]
+            save_schedule(conn, schedule)
+            health.save()
+
+            previous = load_previous_payload(OUTPUT)
+            payload = merge_payload(previous, SOURCES, results)
+            carry_forward(payload, previous)
+            stamp_sections(payload, previous, SOURCES, results)
+            _, unchanged, written = write_outputs(payload, previous, shards_if_unchanged=False)
+
+            for s in due:
+                r, row = results[s["name"]], schedule[s["name"]]
+                print(
+                    f"  {s['name']:<15} {r['status']:<8} {len(r['records'])} records"
+                    f"{'  changed' if s['name'] in changed else ''}  next in {row['interval'] / 60:.0f} min"
+                )
+            print(f"  output: {'unchanged' if unchanged else f'{written} shard files rewritten'}")
+    except KeyboardInterrupt:
+        print("\nStopping daemon")
+    finally:
+        save_schedule(conn, schedule)
+        conn.close()
+        health.save()
+        solver.close()
+        http.close()
+
+
+# --- Main ---
 
-    os.makedirs(os.path.dirname(output_path), exist_ok=True)
-    with open(output_path, "w", encoding="utf-8") as fh:
-        json.dump(payload, fh, indent=2, ensure_ascii=False)
+def use_scratch_dir(directory: Path = None) -> Path:
+    """Send every file a run writes into a scratch directory, leaving the real ones alone.
+
+    Cassette runs and the parser benchmark use this so they never touch
+    public/industry.json, the shards, the manifest or the SQLite stores
+    behind CACHE_DB (watermarks, advisory and detail caches). The current
+    industry.json is copied in as the previous payload; the stores start
+    empty, so every page is fetched in full. Returns the directory.
+    """
+    global OUTPUT, SHARD_DIR, CACHE_DB, MANIFEST
+    directory = directory or Path(tempfile.mkdtemp(prefix="industry-scratch-"))
+    if OUTPUT.exists():
+        shutil.copyfile(OUTPUT, directory / OUTPUT.name)
+    OUTPUT = directory / OUTPUT.name
+    SHARD_DIR = directory / SHARD_DIR.name
+    CACHE_DB = directory / CACHE_DB.name
+    MANIFEST = directory / MANIFEST.name
+    http.cache_path = CACHE_DB
+    health.db_path = None
+    return directory
+
+
+def main() -> None:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Scrape rail industry data into public/industry.json")
+    parser.add_argument("--workers", type=int, default=MAX_WORKERS, help=f"Concurrent sources (default {MAX_WORKERS})")
+    parser.add_argument("--deadline", type=float, default=RUN_DEADLINE, help=f"Overall run deadline in seconds (default {RUN_DEADLINE})")
+    parser.add_argument("--full-sync", action="store_true", help="Drop USDA watermarks and re-pull the backfill window")
+    parser.add_argument("--fra-backfill", action="store_true", help="Page the full FRA accident dataset into the local store")
+    parser.add_argument("--shards-only", action="store_true", help="Rebuild public/industry/ from the existing industry.json without scraping")
+    parser.add_argument("--daemon", action="store_true", help="Keep running and poll each source on its own adaptive cadence")
+    parser.add_argument("--only", metavar="SECTIONS", help="Run only these sections or sources (e.g. advisories,fuel) and merge them into the existing industry.json")
+    parser.add_argument("--columnar", action="store_true", help=f"Write the {', '.join(COLUMNAR_SECTIONS)} shards as dictionary-encoded columns")
+    cassette_group = parser.add_mutually_exclusive_group()
+    cassette_group.add_argument("--record", type=Path, metavar="DIR", help="Save every HTTP response to a cassette directory")
+    cassette_group.add_argument("--replay", type=Path, metavar="DIR", help="Serve HTTP responses from a cassette directory (offline)")
+    args = parser.parse_args()
+
+    global columnar_output
+    columnar_output = args.columnar
+    selected = SOURCES
+    if args.only:
+        try:
+            selected = select_sources(SOURCES, args.only)
+        except ValueError as exc:
+            parser.error(str(exc))
+
+    if args.shards_only:
+        previous = load_previous_payload(OUTPUT)
+        written = write_shards(previous) + write_fra_rollups() + write_metric_analytics()
+        written += write_facility_join(previous.get("advisories", []))
+        print(f"Rewrote {written} shard files in {SHARD_DIR}")
+        return
+
+    if args.daemon:
+        print("=== Rail Industry Scraper (daemon) ===")
+        run_daemon(max_workers=args.workers, deadline=args.deadline, sources=selected)
+        return
+
+    sources = selected
+    if args.full_sync:
+        sources = [
+            dict(s, fetch=functools.partial(fetch_usda_metrics, full_sync=True)) if s["name"] == "usda" else s
+            for s in sources
+        ]
+    if args.fra_backfill:
+        # The full dataset is far more than the daily timeout allows; give it the whole run
+        sources = [
+            dict(s, fetch=functools.partial(fetch_fra_incidents, backfill=True), timeout=args.deadline)
+            if s["name"] == "fra" else s
+            for s in sources
+        ]
+
+    print(f"=== Rail Industry Scraper{' (only ' + ', '.join(s['name'] for s in sources) + ')' if args.only else ''} ===")
+
+    cassette = None
+    if args.record or args.replay:
+        from http_cassette import Cassette
+        cassette = Cassette(args.record or args.replay, "record" if args.record else "replay")
+        cassette.install()
+        # Recorded or replayed runs must not rewrite the site data or the real stores,
+        # trip the real circuits, or skew the latency windows
+        scratch = use_scratch_dir()
+        http.hedge = False
+        print(f"  cassette: {cassette.mode} {cassette.directory}, writing to {scratch}")
+
+    run_start = time.monotonic()
+    results = run_sources(sources, max_workers=args.workers, deadline=args.deadline)
+    wall_seconds = time.monotonic() - run_start
+    previous = load_previous_payload(OUTPUT)
+    if args.only:
+        # Sections outside the selection keep the records already on disk
+        payload = merge_payload(previous, SOURCES, results)
+    else:
+        payload = build_payload(sources, results)
+        payload["advisories"] = update_advisory_store(sources, results, previous)
+        reuse_failed_sections(payload, previous, sources, results)
+    carry_forward(payload, previous)
+    stamp_sections(payload, previous, SOURCES, results)
+    payload, unchanged, shards_written = write_outputs(payload, previous)
+
+    print_run_report(sources, results)
+    manifest = build_manifest(sources, results, wall_seconds)
+    manifest["flags"] = flag_regressions(manifest, load_run_history())
+    write_manifest(manifest)
+    if not cassette:
+        # Replayed or recorded runs would skew the latency baseline
+        append_run_history(manifest)
+    print_regressions(manifest["flags"])
+    solver.close()
+    http.close()
+    health.save()
+    if cassette:
+        cassette.uninstall()
+        print(f"  cassette: {cassette.hits} responses {cassette.mode}ed, {cassette.misses} misses")
+
+    def count(name):
+        return len(results[name]["records"]) if name in results else "-"
 
     counts = (
-        f"{len(bnsf_advisories)} BNSF + {len(csx_advisories)} CSX + "
-        f"{len(ns_advisories)} NS + {len(up_advisories)} UP + {len(fra_incidents)} FRA"
+        f"{count('bnsf')} BNSF + {count('csx')} CSX + "
+        f"{count('ns')} NS + {count('up')} UP + {count('fra')} FRA"
     )
     print(f"\n=== Done ===")
-    print(f"  metrics:       {len(metrics)}")
-    print(f"  fuelSurcharges:{len(fuel_surcharges)}")
-    print(f"  advisories:    {len(advisories)} ({counts})")
-    print(f"  regulatory:    {len(regulatory)} ({len(stb_records)} STB)")
-    print(f"  freightTrends: {len(freight_trends)} months")
-    print(f"  output:        {output_path}")
+    print(f"  metrics:       {len(payload['metrics'])}")
+    print(f"  fuelSurcharges:{len(payload['fuelSurcharges'])}")
+    print(f"  advisories:    {len(payload['advisories'])} ({counts})")
+    print(f"  regulatory:    {len(payload['regulatory'])} ({count('stb')} STB)")
+    print(f"  freightTrends: {len(payload['freightTrends'])} months")
+    print(f"  output:        {OUTPUT}{' (data unchanged, stamps only)' if unchanged else ''}")
+    print(f"  shards:        {shards_written} files rewritten in {SHARD_DIR}")
+    print(f"  manifest:      {MANIFEST} ({len(manifest['flags'])} regression flags)")
 
 
 if __name__ == "__main__":
@@ -14,19 +14,41 @@ Usage:
 
   # Career pages only (no job board scraping)
   scripts/.venv-jobspy/bin/python3 scripts/scrape-jobs.py --direct-only
+
+  # Record career page responses, then re-run offline from the recording
+  scripts/.venv-jobspy/bin/python3 scripts/scrape-jobs.py --direct-only --record scripts/.cassettes/jobs
+  scripts/.venv-jobspy/bin/python3 scripts/scrape-jobs.py --direct-only --replay scripts/.cassettes/jobs
+
+Each career page scraper, and each host they request, has a circuit in
+scripts/.jobs_cache.db (see source_health.py). A site that fails three runs
+in a row is skipped until its cooldown passes, then probed once under
+PROBE_TIMEOUT; a dead host fails at once for every site that uses it.
+Whenever a site is skipped or fails, its jobs from the previous jobs.json
+are kept.
 """
 
-import json, re, hashlib, time, sys, uuid, argparse, math
+import json, re, hashlib, time, sys, uuid, argparse, math, threading
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
 
-import requests
 import pandas as pd
 from bs4 import BeautifulSoup
 from jobspy import scrape_jobs
 
+from scraper_http import HttpClient, section_end
+from source_health import SourceHealth
+
 SCRIPT_DIR = Path(__file__).parent
 OUTPUT = SCRIPT_DIR.parent / 'public' / 'jobs.json'
+HEALTH_DB = SCRIPT_DIR / '.jobs_cache.db'
+PROBE_TIMEOUT = 120  # seconds a half-open career site gets before it counts as down
+
+# Career sites go through a hedging client: a listing or detail page that
+# outlives its host's p95 gets one duplicate request, and a host whose
+# circuit is open is short-circuited across sites and runs. Latencies and
+# circuits persist in HEALTH_DB; no retries, as before.
+health = SourceHealth(HEALTH_DB)
+http = HttpClient(cache_path=HEALTH_DB, retries=0, breaker=health, hedge=True)
 
 HEADERS = {
     'User-Agent': 'Mozilla/5.0 (compatible; RailHub-JobBot/1.0; +https://railhub.io/bot)',
@@ -152,7 +174,7 @@ def fetch_detail_description(url, delay=0.5):
     try:
         if delay:
             time.sleep(delay)
-        resp = requests.get(url, headers=HEADERS, timeout=20)
+        resp = http.get(url, source='details', headers=HEADERS, timeout=20)
         if resp.status_code != 200:
             return None
         soup = BeautifulSoup(resp.text, 'html.parser')
@@ -205,7 +227,7 @@ def fetch_bnsf_detail(job_seq):
     try:
         url = 'https://jobs.bnsf.com/us/en/job/%s' % job_seq
         time.sleep(0.5)
-        resp = requests.get(url, headers=HEADERS, timeout=20)
+        resp = http.get(url, source='bnsf', headers=HEADERS, timeout=20)
         if resp.status_code != 200:
             return None
         soup = BeautifulSoup(resp.text, 'html.parser')
@@ -475,7 +497,7 @@ def scrape_csx():
         'sortBy=POSTING_DATES_DESC'
     )
     try:
-        resp = requests.get(url, timeout=30)
+        resp = http.get(url, source='csx', timeout=30)
         resp.raise_for_status()
         data = resp.json()
     except Exception as e:
@@ -523,16 +545,19 @@ def scrape_csx():
 def scrape_bnsf():
     print('[BNSF] Fetching jobs...')
 
+    marker = '"eagerLoadRefineSearch":'
+
     def fetch_page(offset):
         url = 'https://jobs.bnsf.com/us/en/search-results?keywords=&from=%d&s=1' % offset
         try:
-            resp = requests.get(url, headers=HEADERS, timeout=30)
+            # The jobs JSON sits in an inline script; nothing after it is needed
+            resp = http.get_prefix(url, source='bnsf', headers=HEADERS, timeout=30,
+                                   done=section_end(marker, '</script>'))
             resp.raise_for_status()
             html = resp.text
         except Exception as e:
             print('[BNSF] Error at offset=%d: %s' % (offset, e))
             return None
-        marker = '"eagerLoadRefineSearch":'
         idx = html.find(marker)
         if idx == -1:
             return None
@@ -610,7 +635,7 @@ def scrape_union_pacific():
     for i, offset in enumerate([0, 25, 50]):
         url = '%s%s' % (base_url, search_path) + ('&startrow=%d' % offset if offset > 0 else '')
         try:
-            resp = requests.get(url, headers=HEADERS, timeout=30)
+            resp = http.get(url, source='up', headers=HEADERS, timeout=30)
             resp.raise_for_status()
         except Exception as e:
             print('[UP] Error page %d: %s' % (i + 1, e))
@@ -669,7 +694,7 @@ def scrape_norfolk_southern():
         if i > 0:
             time.sleep(1)
         try:
-            resp = requests.get(url, headers={
+            resp = http.get(url, source='ns', headers={
                 'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36',
                 'Accept': 'text/html,application/xhtml+xml',
             }, timeout=30)
@@ -721,7 +746,7 @@ def scrape_amtrak():
     print('[Amtrak] Fetching jobs...')
     base_url = 'https://careers.amtrak.com'
     try:
-        resp = requests.get('%s/go/All-Jobs/8336500/?q=&sortColumn=referencedate&sortDirection=desc' % base_url, headers=HEADERS, timeout=30)
+        resp = http.get('%s/go/All-Jobs/8336500/?q=&sortColumn=referencedate&sortDirection=desc' % base_url, source='amtrak', headers=HEADERS, timeout=30)
         resp.raise_for_status()
     except Exception as e:
         print('[Amtrak] Error: %s' % e)
@@ -770,12 +795,54 @@ def scrape_amtrak():
 # Main
 # ═══════════════════════════════════════════════════════════════════════════════
 
+def run_with_timeout(fn, seconds):
+    """Call fn on a daemon thread; raise TimeoutError if it has not returned in time."""
+    outcome = {}
+
+    def target():
+        try:
+            outcome['result'] = fn()
+        except Exception as e:
+            outcome['error'] = e
+
+    worker = threading.Thread(target=target, daemon=True)
+    worker.start()
+    worker.join(seconds)
+    if worker.is_alive():
+        raise TimeoutError('no answer within %ds' % seconds)
+    if 'error' in outcome:
+        raise outcome['error']
+    return outcome['result']
+
+
+def load_previous_jobs():
+    try:
+        return json.loads(OUTPUT.read_text())
+    except (OSError, ValueError):
+        return []
+
+
 def main():
     parser = argparse.ArgumentParser(description='Scrape railroad jobs')
     parser.add_argument('--jobspy-only', action='store_true', help='Only scrape via JobSpy (skip career pages)')
     parser.add_argument('--direct-only', action='store_true', help='Only scrape career pages (skip JobSpy)')
+    cassette_group = parser.add_mutually_exclusive_group()
+    cassette_group.add_argument('--record', type=Path, metavar='DIR', help='Save every HTTP response to a cassette directory')
+    cassette_group.add_argument('--replay', type=Path, metavar='DIR', help='Serve HTTP responses from a cassette directory (offline)')
     args = parser.parse_args()
 
+    cassette = None
+    if args.record or args.replay:
+        from http_cassette import Cassette
+        cassette = Cassette(args.record or args.replay, 'record' if args.record else 'replay')
+        cassette.install()
+        print('Cassette: %s %s' % (cassette.mode, cassette.directory))
+
+    # Recorded or replayed outcomes must not trip the real circuits or skew the latency windows
+    if cassette:
+        health.db_path = None
+        http.hedge = False
+    previous_jobs = load_previous_jobs()
     all_jobs = []
     hashes = set()
 
@@ -794,20 +861,41 @@ def main():
 
     # Phase 1: Direct career page scrapers
     if not args.jobspy_only:
+        # (label, scraper, the 'source' its jobs carry in jobs.json)
         direct_scrapers = [
-            ('CSX', scrape_csx),
-            ('BNSF', scrape_bnsf),
-            ('Union Pacific', scrape_union_pacific),
-            ('Norfolk Southern', scrape_norfolk_southern),
-            ('Amtrak', scrape_amtrak),
+            ('CSX', scrape_csx, 'CSX Careers'),
+            ('BNSF', scrape_bnsf, 'BNSF Careers'),
+            ('Union Pacific', scrape_union_pacific, 'Union Pacific Careers'),
+            ('Norfolk Southern', scrape_norfolk_southern, 'Norfolk Southern Careers'),
+            ('Amtrak', scrape_amtrak, 'Amtrak Careers'),
         ]
         print('\n--- Phase 1: Direct career page scrapers ---')
-        for name, scraper in direct_scrapers:
+        for name, scraper, source in direct_scrapers:
+            circuit = 'source:%s' % source
+            if not health.allow(circuit):
+                kept = [j for j in previous_jobs if j.get('source') == source]
+                print('[%s] circuit open, skipped; keeping %d jobs from the last run' % (name, len(kept)))
+                add_jobs(kept, name)
+                continue
+
+            start = time.monotonic()
             try:
-                jobs = scraper()
-                add_jobs(jobs, name)
+                if health.probing(circuit):
+                    print('[%s] circuit half-open, probing' % name)
+                    jobs = run_with_timeout(scraper, PROBE_TIMEOUT)
+                else:
+                    jobs = scraper()
+                if not jobs:
+                    raise RuntimeError('no jobs found')
             except Exception as e:
-                print('[%s] FAILED: %s' % (name, e))
+                health.failure(circuit, '%s: %s' % (type(e).__name__, e), time.monotonic() - start)
+                kept = [j for j in previous_jobs if j.get('source') == source]
+                print('[%s] FAILED: %s; keeping %d jobs from the last run' % (name, e, len(kept)))
+                add_jobs(kept, name)
+                continue
+            health.success(circuit, time.monotonic() - start)
+            add_jobs(jobs, name)
+        health.save()
 
     # Phase 2: JobSpy (job board aggregation)
     if not args.direct_only:
@@ -827,6 +915,11 @@ def main():
             if job[key] is None:
                 del job[key]
 
+    http.close()
+    if cassette:
+        cassette.uninstall()
+        print('Cassette: %d responses %sed, %d misses' % (cassette.hits, cassette.mode, cassette.misses))
+
     OUTPUT.write_text(json.dumps(all_jobs, indent=2, ensure_ascii=False))
 
     # Summary
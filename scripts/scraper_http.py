@@ -0,0 +1,485 @@
+"""
+Shared HTTP client for the scrapers.
+
+Keeps one keep-alive session per host, retries transient failures with
+jittered exponential backoff, and remembers ETag / Last-Modified validators
+(together with the last body) in a SQLite cache so unchanged pages come back
+as cheap 304s. Per-source request, byte and latency counters feed the run
+report. With a breaker (source_health.SourceHealth) every host gets a
+circuit: requests to a host that keeps failing raise CircuitOpenError at
+once instead of waiting out their timeouts, and the first request after the
+cooldown is sent as a single probe without retries. With stream=True the
+body is left on the socket; iter_lines() decodes it line by line and
+counts its bytes as they arrive. get_prefix() reads a page only until an
+extractor has what it needs (see section_end) and then drops the
+connection.
+
+With hedge=True the client keeps a window of recent latencies per host
+(persisted next to the validators). A GET that outlives its host's p95 gets
+one duplicate request, and whichever answers first wins. Streamed GETs are
+timed and hedged on time-to-headers, in a window of their own. Hedges come
+from a per-host token bucket: each host starts a run empty, earns
+HEDGE_BUDGET per completed primary request and banks at most
+HEDGE_BUDGET x its known latencies (one token at least), so hedges never
+add more than HEDGE_BUDGET extra load to any host.
+
+Usage:
+    http = HttpClient(cache_path=Path("scripts/.industry_cache.db"))
+    resp = http.get(url, source="eia", conditional=True, timeout=30)
+    if resp.not_modified:
+        ...  # body is the cached copy from the previous run
+"""
+
+import codecs
+import json
+import random
+import sqlite3
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, Iterator, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from source_health import CircuitOpenError
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+MAX_RETRY_AFTER = 30
+
+HEDGE_PERCENTILE = 95
+HEDGE_MIN_SAMPLES = 20    # latencies seen for a host before it is hedged at all
+HEDGE_WINDOW = 200        # latencies kept per host
+HEDGE_BUDGET = 0.05       # hedge tokens a host earns per completed request
+HEDGE_MIN_DELAY = 0.25    # never hedge sooner than this, however fast the host
+HEDGE_WORKERS = 32
+
+
+def init_cache(db_path: Path) -> sqlite3.Connection:
+    conn = sqlite3.connect(db_path, check_same_thread=False)
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS http_cache "
+        "(url TEXT PRIMARY KEY, etag TEXT, last_modified TEXT, body BLOB, "
+        "encoding TEXT, fetched_at TEXT)"
+    )
+    conn.execute("CREATE TABLE IF NOT EXISTS http_latency (host TEXT PRIMARY KEY, samples TEXT)")
+    conn.commit()
+    return conn
+
+
+def section_end(start: str, *ends: str) -> Callable[[str], bool]:
+    """A done() for get_prefix: true once one of ends follows the last start seen so far.
+
+    If the markers never show up the whole body is read, as without streaming.
+    """
+    state = {"scanned": 0, "last": -1}
+
+    def done(text: str) -> bool:
+        found = text.rfind(start, max(state["scanned"] - len(start), 0))
+        if found != -1:
+            state["last"] = found
+        state["scanned"] = len(text)
+        if state["last"] == -1:
+            return False
+        after = state["last"] + len(start)
+        return any(text.find(end, after) != -1 for end in ends)
+
+    return done
+
+
+def read_prefix(resp: requests.Response, done: Callable[[str], bool], chunk_size: int = 1 << 15) -> bool:
+    """Read a stream=True body chunk by chunk until done(text so far), then close the connection.
+
+    The bytes read become resp.content. Returns True if done() cut the body short.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    chunks, text, stopped = [], "", False
+    try:
+        for chunk in resp.iter_content(chunk_size):
+            chunks.append(chunk)
+            text += decoder.decode(chunk)
+            if done(text):
+                stopped = True
+                break
+    finally:
+        resp.close()
+    resp._content = b"".join(chunks)
+    resp._content_consumed = True
+    return stopped
+
+
+def _close_response(future) -> None:
+    """Release the connection held by a hedge that lost the race."""
+    if future.exception() is None:
+        future.result().close()
+
+
+class HttpClient:
+    def __init__(
+        self,
+        cache_path: Optional[Path] = None,
+        retries: int = 2,
+        backoff: float = 1.0,
+        pool_size: int = 8,
+        headers: Optional[Dict[str, str]] = None,
+        breaker=None,
+        hedge: bool = False,
+    ) -> None:
+        self.cache_path = cache_path
+        self.retries = retries
+        self.backoff = backoff
+        self.pool_size = pool_size
+        self.headers = headers or {}
+        self.breaker = breaker
+        self.hedge = hedge
+        self._sessions: Dict[str, requests.Session] = {}
+        self._stats: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._latencies: Dict[str, deque] = {}
+        self._hedge_tokens: Dict[str, float] = {}
+        self._hedge_pool: Optional[ThreadPoolExecutor] = None
+
+    # --- Sessions ---
+
+    def session_for(self, url: str) -> requests.Session:
+        """Return the pooled keep-alive session for this URL's host."""
+        parts = urlsplit(url)
+        host = f"{parts.scheme}://{parts.netloc}"
+        with self._lock:
+            session = self._sessions.get(host)
+            if session is None:
+                session = requests.Session()
+                session.headers.update(self.headers)
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+                session.mount(host, adapter)
+                self._sessions[host] = session
+            return session
+
+    def close(self) -> None:
+        self._save_latencies()
+        with self._lock:
+            if self._hedge_pool is not None:
+                self._hedge_pool.shutdown(wait=False)
+                self._hedge_pool = None
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    # --- Validator cache ---
+
+    def _cache(self) -> Optional[sqlite3.Connection]:
+        if self.cache_path is None:
+            return None
+        with self._lock:
+            if self._conn is None:
+                self._conn = init_cache(self.cache_path)
+            return self._conn
+
+    def _cache_get(self, key: str) -> Optional[tuple]:
+        conn = self._cache()
+        if conn is None:
+            return None
+        with self._lock:
+            return conn.execute(
+                "SELECT etag, last_modified, body, encoding FROM http_cache WHERE url = ?", (key,)
+            ).fetchone()
+
+    def _cache_set(self, key: str, resp: requests.Response) -> None:
+        conn = self._cache()
+        etag = resp.headers.get("ETag")
+        last_modified = resp.headers.get("Last-Modified")
+        if conn is None or not (etag or last_modified):
+            return
+        now = datetime.now(timezone.utc).isoformat()
+        with self._lock:
+            conn.execute(
+                "INSERT OR REPLACE INTO http_cache (url, etag, last_modified, body, encoding, fetched_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, etag, last_modified, resp.content, resp.encoding, now),
+            )
+            conn.commit()
+
+    # --- Counters ---
+
+    def _record(self, source: str, **deltas: float) -> None:
+        with self._lock:
+            stats = self._stats.setdefault(
+                source,
+                {"requests": 0, "bytes": 0, "seconds": 0.0, "notModified": 0, "retries": 0, "errors": 0,
+                 "shortCircuits": 0, "hedges": 0, "hedgeWins": 0},
+            )
+            for key, value in deltas.items():
+                stats[key] += value
+
+    def stats(self, source: Optional[str] = None) -> Dict:
+        with self._lock:
+            if source is not None:
+                return dict(self._stats.get(source, {}))
+            return {name: dict(s) for name, s in self._stats.items()}
+
+    # --- Hedging ---
+
+    def _host_latencies(self, key: str) -> deque:
+        """Latency window for a host ("host" for whole responses, "host headers" for streamed ones)."""
+        with self._lock:
+            samples = self._latencies.get(key)
+        if samples is not None:
+            return samples
+        stored = []
+        conn = self._cache()
+        if conn is not None:
+            with self._lock:
+                row = conn.execute("SELECT samples FROM http_latency WHERE host = ?", (key,)).fetchone()
+            stored = json.loads(row[0]) if row else []
+        with self._lock:
+            return self._latencies.setdefault(key, deque(stored, maxlen=HEDGE_WINDOW))
+
+    def _save_latencies(self) -> None:
+        conn = self._cache()
+        if conn is None or not self.hedge:
+            return
+        with self._lock:
+            rows = [(host, json.dumps(list(samples))) for host, samples in self._latencies.items()]
+            conn.executemany("INSERT OR REPLACE INTO http_latency (host, samples) VALUES (?, ?)", rows)
+            conn.commit()
+
+    def hedge_delay(self, key: str) -> Optional[float]:
+        """The window's p95 latency, or None while fewer than HEDGE_MIN_SAMPLES are known."""
+        samples = self._host_latencies(key)
+        with self._lock:
+            if len(samples) < HEDGE_MIN_SAMPLES:
+                return None
+            ordered = sorted(samples)
+        index = min(len(ordered) - 1, len(ordered) * HEDGE_PERCENTILE // 100)
+        return max(ordered[index], HEDGE_MIN_DELAY)
+
+    def _earn_hedge(self, host: str) -> None:
+        """Add one completed request's share to the host's bucket, capped by how many latencies it has."""
+        known = len(self._host_latencies(host)) + len(self._host_latencies(f"{host} headers"))
+        with self._lock:
+            cap = max(1.0, HEDGE_BUDGET * known)
+            self._hedge_tokens[host] = min(cap, self._hedge_tokens.get(host, 0.0) + HEDGE_BUDGET)
+
+    def _take_hedge(self, host: str) -> bool:
+        with self._lock:
+            tokens = self._hedge_tokens.get(host, 0.0)
+            if tokens < 1:
+                return False
+            self._hedge_tokens[host] = tokens - 1
+            return True
+
+    def _timed(self, session: requests.Session, method: str, url: str, key: str, kwargs: dict) -> requests.Response:
+        start = time.monotonic()
+        resp = session.request(method, url, **kwargs)
+        samples = self._host_latencies(key)
+        with self._lock:
+            samples.append(round(time.monotonic() - start, 3))
+        return resp
+
+    def _send(self, session: requests.Session, method: str, url: str, source: str, hedge: bool, kwargs: dict) -> requests.Response:
+        """One attempt; hedged with a duplicate if it outlives the host's p95 and a hedge token is left.
+
+        A streamed request returns at its headers, so it is timed (and
+        hedged) on time-to-headers.
+        """
+        if not hedge:
+            return session.request(method, url, **kwargs)
+        host = urlsplit(url).netloc
+        key = f"{host} headers" if kwargs.get("stream") else host
+        with self._lock:
+            if self._hedge_pool is None:
+                self._hedge_pool = ThreadPoolExecutor(max_workers=HEDGE_WORKERS, thread_name_prefix="hedge")
+            pool = self._hedge_pool
+        delay = self.hedge_delay(key)
+        primary = pool.submit(self._timed, session, method, url, key, kwargs)
+        primary.add_done_callback(lambda future: future.exception() or self._earn_hedge(host))
+        if delay is None or wait([primary], timeout=delay).done or not self._take_hedge(host):
+            return primary.result()
+
+        self._record(source, hedges=1)
+        backup = pool.submit(self._timed, session, method, url, key, kwargs)
+        pending, error = {primary, backup}, None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is not None:
+                    error = error or future.exception()
+                    continue
+                for loser in pending:
+                    loser.add_done_callback(_close_response)
+                for extra in done - {future}:
+                    _close_response(extra)
+                if future is backup:
+                    self._record(source, hedgeWins=1)
+                return future.result()
+        raise error
+
+    # --- Requests ---
+
+    def _sleep_before_retry(self, attempt: int, resp: Optional[requests.Response]) -> None:
+        retry_after = resp.headers.get("Retry-After") if resp is not None else None
+        if retry_after and retry_after.isdigit():
+            time.sleep(min(int(retry_after), MAX_RETRY_AFTER))
+            return
+        # Full jitter: spread retries from concurrent workers apart
+        time.sleep(random.uniform(0, self.backoff * (2 ** attempt)))
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        *,
+        source: str,
+        conditional: bool = False,
+        retries: Optional[int] = None,
+        **kwargs,
+    ) -> requests.Response:
+        """Send a request through the pooled session for url's host.
+
+        With conditional=True the stored validators are sent and a 304 is
+        turned into a 200 carrying the cached body, flagged with
+        resp.not_modified = True. A streamed 200 is returned unread and is
+        not cached here (get_prefix caches what it read). Connection errors, timeouts and RETRY_STATUSES are retried;
+        the last response or exception wins.
+        The outcome (connection error, timeout or 5xx counts as a failure)
+        is reported to the host's circuit when a breaker is set.
+        """
+        session = self.session_for(url)
+        retries = self.retries if retries is None else retries
+        host = urlsplit(url).netloc
+        circuit = f"host:{host}"
+        probing = False
+        if self.breaker is not None:
+            if not self.breaker.allow(circuit):
+                self._record(source, shortCircuits=1)
+                raise CircuitOpenError(f"circuit open for {host}")
+            probing = self.breaker.probing(circuit)
+            if probing:
+                retries = 0
+
+        key = requests.Request(method, url, params=kwargs.get("params")).prepare().url
+        streamed = bool(kwargs.get("stream"))
+        cached = self._cache_get(key) if conditional else None
+        if cached:
+            etag, last_modified, _, _ = cached
+            headers = dict(kwargs.pop("headers", None) or {})
+            if etag:
+                headers["If-None-Match"] = etag
+            if last_modified:
+                headers["If-Modified-Since"] = last_modified
+            kwargs["headers"] = headers
+
+        # A probe is never duplicated; a streamed GET is hedged up to its headers
+        hedge = self.hedge and method == "GET" and not probing
+        attempt = 0
+        while True:
+            start = time.monotonic()
+            try:
+                resp = self._send(session, method, url, source, hedge, kwargs)
+            except Exception as exc:
+                elapsed = time.monotonic() - start
+                self._record(source, requests=1, seconds=elapsed, errors=1)
+                if attempt >= retries or not isinstance(exc, (requests.ConnectionError, requests.Timeout)):
+                    if self.breaker is not None:
+                        self.breaker.failure(circuit, f"{type(exc).__name__}: {exc}", elapsed)
+                    raise
+                self._record(source, retries=1)
+                self._sleep_before_retry(attempt, None)
+                attempt += 1
+                continue
+
+            elapsed = time.monotonic() - start
+            if resp.status_code in RETRY_STATUSES and attempt < retries:
+                # Release the connection (a streamed body is still on it) before trying again
+                resp.close()
+                self._record(source, requests=1, seconds=elapsed, errors=1, retries=1)
+                self._sleep_before_retry(attempt, resp)
+                attempt += 1
+                continue
+            break
+
+        if self.breaker is not None:
+            if resp.status_code >= 500:
+                self.breaker.failure(circuit, f"HTTP {resp.status_code}", elapsed)
+            else:
+                self.breaker.success(circuit, elapsed)
+
+        resp.not_modified = False
+        resp.streamed = streamed and not (resp.status_code == 304 and cached)
+        if resp.streamed:
+            # The caller reads the body; iter_lines() and get_prefix() count its bytes
+            self._record(source, requests=1, seconds=elapsed)
+            return resp
+        if resp.status_code == 304 and cached:
+            _, _, body, encoding = cached
+            resp.status_code = 200
+            resp._content = body
+            resp.encoding = encoding
+            resp.not_modified = True
+            self._record(source, requests=1, seconds=elapsed, notModified=1)
+            return resp
+
+        self._record(source, requests=1, seconds=elapsed, bytes=len(resp.content))
+        if conditional and resp.status_code == 200:
+            self._cache_set(key, resp)
+        return resp
+
+    def iter_lines(self, resp: requests.Response, *, source: str, chunk_size: int = 1 << 16) -> Iterator[str]:
+        """Decoded lines of resp's body, each with its trailing newline, read chunk by chunk.
+
+        Quoted newlines survive, so the lines can be fed straight to
+        csv.reader. The response is closed once the body is exhausted.
+        """
+        decoder = codecs.getincrementaldecoder(resp.encoding or "utf-8")(errors="replace")
+        pending = ""
+        try:
+            for chunk in resp.iter_content(chunk_size):
+                if resp.streamed:
+                    self._record(source, bytes=len(chunk))
+                pending += decoder.decode(chunk)
+                *lines, pending = pending.split("\n")
+                for line in lines:
+                    yield line + "\n"
+            pending += decoder.decode(b"", final=True)
+            if pending:
+                yield pending
+        finally:
+            resp.close()
+
+    def get_prefix(
+        self,
+        url: str,
+        *,
+        source: str,
+        done: Callable[[str], bool],
+        conditional: bool = False,
+        **kwargs,
+    ) -> requests.Response:
+        """GET url, but stop downloading once done(text so far) is true.
+
+        resp.content holds the bytes read and resp.truncated says whether the
+        rest was skipped. With conditional=True that prefix is what gets
+        cached, so a 304 hands the extractor the same prefix again.
+        """
+        resp = self.request("GET", url, source=source, conditional=conditional, stream=True, **kwargs)
+        resp.truncated = False
+        if resp.streamed:
+            resp.truncated = read_prefix(resp, done)
+            self._record(source, bytes=len(resp.content))
+            if conditional and resp.status_code == 200:
+                self._cache_set(requests.Request("GET", url, params=kwargs.get("params")).prepare().url, resp)
+        return resp
+
+    def get(self, url: str, *, source: str, **kwargs) -> requests.Response:
+        return self.request("GET", url, source=source, **kwargs)
+
+    def post(self, url: str, *, source: str, **kwargs) -> requests.Response:
+        return self.request("POST", url, source=source, **kwargs)
@@ -0,0 +1,198 @@
+"""
+Persistent circuit breakers for scraper sources and hosts.
+
+SourceHealth keeps, per key ("source:csx", "host:www.csx.com"), the number
+of consecutive failures, a smoothed latency and the last error. It loads
+them from SQLite at first use and writes them back with save(). The
+scrapers use these rows to skip upstreams that are known to be down:
+
+  closed     calls go through
+  open       FAILURE_THRESHOLD consecutive failures; calls are refused at
+             once (counted as short circuits) until the cooldown passes
+  half-open  after the cooldown exactly one call goes through as a probe;
+             success closes the circuit, failure re-opens it, and
+             concurrent callers are refused meanwhile
+
+The cooldown doubles with every failure past the threshold, up to
+MAX_COOLDOWN_SECONDS, so a source that stays dead is probed less and less
+often.
+
+With db_path=None nothing is read or written. Cassette runs use this so
+replayed failures never trip the real breakers.
+
+Usage:
+    health = SourceHealth(Path("scripts/.industry_cache.db"))
+    if health.allow("source:csx"):
+        ...  # run it, then health.success(...) / health.failure(...)
+    health.save()
+"""
+
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+FAILURE_THRESHOLD = 3
+COOLDOWN_SECONDS = 1800
+MAX_COOLDOWN_SECONDS = 24 * 3600
+LATENCY_ALPHA = 0.3  # weight of the newest sample in the smoothed latency
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an upstream whose circuit is open."""
+
+
+def init_health_store(db_path: Path) -> sqlite3.Connection:
+    conn = sqlite3.connect(db_path)
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS source_health "
+        "(key TEXT PRIMARY KEY, state TEXT, consecutive_failures INTEGER, opened_at REAL, "
+        "latency REAL, last_latency REAL, last_error TEXT, last_success TEXT, last_failure TEXT)"
+    )
+    conn.commit()
+    return conn
+
+
+def _now_iso() -> str:
+    return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+
+
+class SourceHealth:
+    def __init__(
+        self,
+        db_path: Optional[Path],
+        threshold: int = FAILURE_THRESHOLD,
+        cooldown: float = COOLDOWN_SECONDS,
+    ) -> None:
+        self.db_path = db_path
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self._rows: Optional[Dict[str, dict]] = None
+        self._probing = set()
+        self._short_circuits: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    # --- Storage ---
+
+    def _load(self) -> Dict[str, dict]:
+        # Called with the lock held
+        if self._rows is None:
+            self._rows = {}
+            if self.db_path is not None:
+                conn = init_health_store(self.db_path)
+                try:
+                    cursor = conn.execute("SELECT * FROM source_health")
+                    columns = [c[0] for c in cursor.description]
+                    for values in cursor:
+                        row = dict(zip(columns, values))
+                        self._rows[row["key"]] = row
+                finally:
+                    conn.close()
+        return self._rows
+
+    def _row(self, key: str) -> dict:
+        return self._load().setdefault(key, {
+            "key": key, "state": "closed", "consecutive_failures": 0, "opened_at": None,
+            "latency": None, "last_latency": None, "last_error": None,
+            "last_success": None, "last_failure": None,
+        })
+
+    def save(self) -> None:
+        if self.db_path is None:
+            return
+        with self._lock:
+            rows = list(self._load().values())
+        conn = init_health_store(self.db_path)
+        try:
+            conn.executemany(
+                "INSERT OR REPLACE INTO source_health (key, state, consecutive_failures, opened_at, latency, "
+                "last_latency, last_error, last_success, last_failure) VALUES "
+                "(:key, :state, :consecutive_failures, :opened_at, :latency, :last_latency, :last_error, "
+                ":last_success, :last_failure)",
+                rows,
+            )
+            conn.commit()
+        finally:
+            conn.close()
+
+    # --- Breaker ---
+
+    def _cooled_down(self, row: dict) -> bool:
+        extra = max(0, row["consecutive_failures"] - self.threshold)
+        cooldown = min(self.cooldown * 2 ** extra, MAX_COOLDOWN_SECONDS)
+        return time.time() - (row["opened_at"] or 0) >= cooldown
+
+    def state(self, key: str) -> str:
+        with self._lock:
+            row = self._row(key)
+            if row["state"] == "open" and self._cooled_down(row):
+                return "half-open"
+            return row["state"]
+
+    def allow(self, key: str) -> bool:
+        """True if a call may go out now; the first call after the cooldown is the probe."""
+        with self._lock:
+            row = self._row(key)
+            if row["state"] == "closed":
+                return True
+            if self._cooled_down(row) and key not in self._probing:
+                self._probing.add(key)
+                return True
+            self._short_circuits[key] = self._short_circuits.get(key, 0) + 1
+            return False
+
+    def probing(self, key: str) -> bool:
+        with self._lock:
+            return key in self._probing
+
+    def _observe(self, row: dict, seconds: Optional[float]) -> None:
+        if seconds is None:
+            return
+        row["last_latency"] = round(seconds, 3)
+        previous = row["latency"]
+        smoothed = seconds if previous is None else LATENCY_ALPHA * seconds + (1 - LATENCY_ALPHA) * previous
+        row["latency"] = round(smoothed, 3)
+
+    def success(self, key: str, seconds: Optional[float] = None) -> None:
+        with self._lock:
+            row = self._row(key)
+            self._observe(row, seconds)
+            row.update(state="closed", consecutive_failures=0, opened_at=None, last_success=_now_iso())
+            self._probing.discard(key)
+
+    def failure(self, key: str, error: str, seconds: Optional[float] = None) -> None:
+        with self._lock:
+            row = self._row(key)
+            self._observe(row, seconds)
+            row["consecutive_failures"] += 1
+            row.update(last_error=error[:500], last_failure=_now_iso())
+            if key in self._probing or row["consecutive_failures"] >= self.threshold:
+                row.update(state="open", opened_at=time.time())
+            self._probing.discard(key)
+
+    # --- Reporting ---
+
+    def short_circuits(self, key: str) -> int:
+        with self._lock:
+            return self._short_circuits.get(key, 0)
+
+    def snapshot(self, key: str) -> dict:
+        """State, failure streak, smoothed latency and this run's short circuits for one key."""
+        state = self.state(key)
+        with self._lock:
+            row = self._row(key)
+            return {
+                "state": state,
+                "consecutiveFailures": row["consecutive_failures"],
+                "latency": row["latency"],
+                "lastError": row["last_error"],
+                "lastSuccess": row["last_success"],
+                "shortCircuits": self._short_circuits.get(key, 0),
+            }
+
+    def hosts(self) -> Dict[str, dict]:
+        """Snapshots of every host key seen so far, keyed by host."""
+        with self._lock:
+            keys = [k for k in self._load() if k.startswith("host:")]
+        return {k[len("host:"):]: self.snapshot(k) for k in sorted(keys)}
@@ -0,0 +1,91 @@
+"""
+Spatial lookups for joining advisories to facilities.
+
+GridIndex buckets points into fixed lat/lon cells. A radius query visits
+only the cells overlapping the query's bounding box, then checks haversine
+distance. StatePolygons answers point-in-state from
+public/data/us-states.geojson, with a bounding-box check before the ray cast.
+
+Usage:
+    grid = GridIndex()
+    grid.insert("fac-1", 41.88, -87.63)
+    grid.within(41.85, -87.65, miles=25)    # [("fac-1", 2.3)]
+    StatePolygons(Path("public/data/us-states.geojson")).state_at(41.88, -87.63)   # "IL"
+"""
+
+import json
+import math
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from geotagger import NAME_TO_CODE
+
+EARTH_RADIUS_MILES = 3958.8
+MILES_PER_DEGREE_LAT = 69.0
+
+
+def haversine_miles(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    dp, dl = p2 - p1, math.radians(lon2 - lon1)
+    a = math.sin(dp / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(dl / 2) ** 2
+    return 2 * EARTH_RADIUS_MILES * math.asin(math.sqrt(a))
+
+
+class GridIndex:
+    def __init__(self, cell_degrees: float = 0.5) -> None:
+        self.cell_degrees = cell_degrees
+        self.cells: Dict[Tuple[int, int], List[tuple]] = {}
+
+    def _cell(self, lat: float, lon: float) -> Tuple[int, int]:
+        return int(math.floor(lat / self.cell_degrees)), int(math.floor(lon / self.cell_degrees))
+
+    def insert(self, key, lat: float, lon: float) -> None:
+        self.cells.setdefault(self._cell(lat, lon), []).append((key, lat, lon))
+
+    def within(self, lat: float, lon: float, miles: float) -> List[Tuple[object, float]]:
+        """Keys within miles of (lat, lon), nearest first, with their distances."""
+        dlat = miles / MILES_PER_DEGREE_LAT
+        dlon = miles / (MILES_PER_DEGREE_LAT * max(math.cos(math.radians(lat)), 0.01))
+        lat0, lon0 = self._cell(lat - dlat, lon - dlon)
+        lat1, lon1 = self._cell(lat + dlat, lon + dlon)
+        found = []
+        for i in range(lat0, lat1 + 1):
+            for j in range(lon0, lon1 + 1):
+                for key, plat, plon in self.cells.get((i, j), ()):
+                    distance = haversine_miles(lat, lon, plat, plon)
+                    if distance <= miles:
+                        found.append((key, round(distance, 1)))
+        found.sort(key=lambda f: f[1])
+        return found
+
+
+def _in_ring(lat: float, lon: float, ring: list) -> bool:
+    inside = False
+    for (x0, y0), (x1, y1) in zip(ring, ring[1:]):
+        if (y0 > lat) != (y1 > lat) and lon < x0 + (lat - y0) * (x1 - x0) / (y1 - y0):
+            inside = not inside
+    return inside
+
+
+class StatePolygons:
+    def __init__(self, geojson_path: Path) -> None:
+        # (code, bbox, polygons) where each polygon is [outer ring, *holes]
+        self.states = []
+        for feature in json.loads(geojson_path.read_text(encoding="utf-8"))["features"]:
+            code = NAME_TO_CODE.get(feature["properties"].get("name", "").lower())
+            geometry = feature.get("geometry") or {}
+            if not code or not geometry:
+                continue
+            polygons = geometry["coordinates"] if geometry["type"] == "MultiPolygon" else [geometry["coordinates"]]
+            xs = [x for polygon in polygons for x, _ in polygon[0]]
+            ys = [y for polygon in polygons for _, y in polygon[0]]
+            self.states.append((code, (min(xs), min(ys), max(xs), max(ys)), polygons))
+
+    def state_at(self, lat: float, lon: float) -> Optional[str]:
+        for code, (minx, miny, maxx, maxy), polygons in self.states:
+            if not (minx <= lon <= maxx and miny <= lat <= maxy):
+                continue
+            for polygon in polygons:
+                if _in_ring(lat, lon, polygon[0]) and not any(_in_ring(lat, lon, hole) for hole in polygon[1:]):
+                    return code
+        return None